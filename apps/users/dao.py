@@ -4,6 +4,10 @@ from .models import User
 
 
 class UserDAO(Dao):
+    CACHE_ENABLED = True
+    CACHE_ALIASES = ('email',)
+    COUNTED_FILTERS = ({'deleted': False},)
+
     @property
     def model_cls(self):
         return User
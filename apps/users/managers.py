@@ -1,5 +1,6 @@
 from django.contrib.auth.base_user import BaseUserManager
 from django.utils.translation import gettext_lazy as _
+from core.models import SoftDeleteManager
 
 
 class CustomUserManager(BaseUserManager):
@@ -7,7 +8,11 @@ class CustomUserManager(BaseUserManager):
     https://krakensystems.co/blog/2020/custom-users-using-django-rest-framework
     Custom user model manager where email is the unique identifiers
     for authentication instead of usernames.
+    Sees every user, soft-deleted ones included (User.all_objects), which is
+    what data migrations get.
     """
+    use_in_migrations = True
+
     def create_user(self, email, password, **extra_fields):
         """
         Create and save a User with the given email and password.
@@ -32,4 +37,13 @@ class CustomUserManager(BaseUserManager):
             raise ValueError(_('Superuser must have is_staff=True.'))
         if extra_fields.get('is_superuser') is not True:
             raise ValueError(_('Superuser must have is_superuser=True.'))
-        return self.create_user(email, password, **extra_fields)
\ No newline at end of file
+        return self.create_user(email, password, **extra_fields)
+
+
+class LiveUserManager(SoftDeleteManager, CustomUserManager):
+    """
+    Default user manager (User.objects): soft-deleted users are hidden, so
+    they can no longer log in. Left out of migrations, where a filtered
+    default manager would make data migrations skip deleted users.
+    """
+    use_in_migrations = False
@@ -0,0 +1,63 @@
+# Generated by Django 4.2.24 on 2026-10-18 03:10
+
+import apps.users.managers
+import datetime
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='User',
+            fields=[
+                ('password', models.CharField(max_length=128, verbose_name='password')),
+                ('last_login', models.DateTimeField(blank=True, null=True, verbose_name='last login')),
+                ('is_superuser', models.BooleanField(default=False, help_text='Designates that this user has all permissions without explicitly assigning them.', verbose_name='superuser status')),
+                ('first_name', models.CharField(blank=True, max_length=150, verbose_name='first name')),
+                ('last_name', models.CharField(blank=True, max_length=150, verbose_name='last name')),
+                ('is_staff', models.BooleanField(default=False, help_text='Designates whether the user can log into this admin site.', verbose_name='staff status')),
+                ('is_active', models.BooleanField(default=True, help_text='Designates whether this user should be treated as active. Unselect this instead of deleting accounts.', verbose_name='active')),
+                ('date_joined', models.DateTimeField(default=django.utils.timezone.now, verbose_name='date joined')),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('inactive', models.BooleanField(default=False, null=True)),
+                ('deleted', models.BooleanField(default=False, null=True)),
+                ('created_at', models.DateTimeField(auto_now=True)),
+                ('updated_at', models.DateTimeField(auto_now_add=True)),
+                ('deleted_at', models.DateTimeField(blank=True, null=True)),
+                ('username', models.UUIDField(default=uuid.uuid4, editable=False)),
+                ('email', models.EmailField(help_text='User personal unique email', max_length=254, unique=True, verbose_name='email address')),
+                ('last_pass_change', models.DateTimeField(default=datetime.datetime.now)),
+                ('forgot_password', models.BooleanField(default=False)),
+                ('user_ip', models.CharField(default='', max_length=128)),
+                ('auth_token', models.CharField(max_length=64, null=True)),
+                ('two_factor', models.BooleanField(default=False, help_text='Activates two factor auth')),
+                ('access_expiration_delta', models.PositiveSmallIntegerField(default=600, help_text='Auto logout on activity.', validators=[django.core.validators.MaxValueValidator(3600), django.core.validators.MinValueValidator(300)])),
+                ('profile_picture', models.ImageField(blank=True, null=True, upload_to='profile_pictures/')),
+                ('is_authority', models.BooleanField(default=False, help_text='Ture If user has authority power else False')),
+                ('created_by', models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(class)s_created', to=settings.AUTH_USER_MODEL)),
+                ('deleted_by', models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(class)s_deleted', to=settings.AUTH_USER_MODEL)),
+                ('groups', models.ManyToManyField(blank=True, help_text='The groups this user belongs to. A user will get all permissions granted to each of their groups.', related_name='user_set', related_query_name='user', to='auth.group', verbose_name='groups')),
+                ('updated_by', models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(class)s_updated', to=settings.AUTH_USER_MODEL)),
+                ('user_permissions', models.ManyToManyField(blank=True, help_text='Specific permissions for this user.', related_name='user_set', related_query_name='user', to='auth.permission', verbose_name='user permissions')),
+            ],
+            options={
+                'db_table': 'users',
+                'indexes': [models.Index(condition=models.Q(('deleted', False)), fields=['username'], name='users_username_alive_idx'), models.Index(condition=models.Q(('deleted', False)), fields=['email'], name='users_email_alive_idx')],
+            },
+            managers=[
+                ('objects', apps.users.managers.CustomUserManager()),
+            ],
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.24 on 2026-10-18 03:42
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_fix_timestamps'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='user',
+            name='users_email_alive_idx',
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.24 on 2026-10-18 04:04
+
+import apps.users.managers
+from django.db import migrations
+import django.db.models.manager
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_remove_users_email_alive_idx'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='user',
+            managers=[
+                ('objects', django.db.models.manager.Manager()),
+                ('all_objects', apps.users.managers.CustomUserManager()),
+            ],
+        ),
+    ]
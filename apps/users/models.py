@@ -3,10 +3,11 @@ import uuid
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db import models
 from django.contrib.auth.models import AbstractUser, Group, Permission
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from datetime import datetime
 from core.models import BaseModel
-from .managers import CustomUserManager
+from .managers import CustomUserManager, LiveUserManager
 
 
 class User(BaseModel, AbstractUser):
@@ -35,16 +36,25 @@ class User(BaseModel, AbstractUser):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = []
 
-    objects = CustomUserManager()
+    objects = LiveUserManager()
+    all_objects = CustomUserManager()
 
     def __str__(self):
         return self.email
 
+    def set_password(self, raw_password):
+        super().set_password(raw_password)
+        # Tokens carry the time of the last change (core.auth.tokens), so older ones stop authenticating
+        self.last_pass_change = timezone.now()
+
     class Meta:
         db_table = 'users'
+        # Lookups only touch live rows (the default manager filters deleted=False).
+        # email needs none: its unique index already serves every email lookup.
         indexes = [
-            models.Index(fields=["username"]),
-            models.Index(fields=["email"]),
+            models.Index(fields=["username"], condition=models.Q(deleted=False), name="users_username_alive_idx"),
+            # Covers Dao.get_version's MAX(updated_at) / COUNT(*) over live rows
+            models.Index(fields=["updated_at"], condition=models.Q(deleted=False), name="users_updated_at_alive_idx"),
         ]
 
     @property
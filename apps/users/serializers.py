@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from apps.users.services import UserReadService
+from core.serializers.compiled import CompiledListSerializer, fast_method
 from core.serializers.service_serializer import ServiceSerializer
 
 
@@ -20,12 +21,15 @@ class UserSerializer(ServiceSerializer):
 
     class Meta:
         fields = '__all__'
+        extra_kwargs = {'password': {'write_only': True}}
+        # Columns read by SerializerMethodFields, so the list query can be projected
+        method_sources = {'name': ('first_name', 'last_name')}
+        list_serializer_class = CompiledListSerializer
 
     name = serializers.SerializerMethodField()
 
+    @fast_method
     def get_name(self, obj):
-        test = self.service_class()
-
         return "{0} {1}".format(obj.first_name, obj.last_name)
 
 
@@ -1,16 +1,23 @@
 # Add your service code here
 from __future__ import annotations
-from typing import Optional
+from typing import Optional, Iterator, AsyncIterator, List
+
+from asgiref.sync import sync_to_async
 
 from django.db.models import QuerySet, Model
 from rest_framework_simplejwt.tokens import RefreshToken
+from core.dao import Page, QueryPlan
 from core.service import ReadService, WriteService
 from .dao import UserDAO
-from django.contrib.auth.hashers import check_password
 from django.contrib.auth.models import User
+from django.utils.functional import cached_property
+from core.auth import PasswordCheck, verify_password, averify_password, stamp_token_version
 
 
 class UserReadService(ReadService):
+    # email is unique and indexed, so the keyset seek is a single index range scan
+    LIST_ORDERING = ['email']
+
     @property
     def dao_cls(self):
         return UserDAO
@@ -21,6 +28,23 @@ class UserReadService(ReadService):
     def get_all_users(self) -> QuerySet[Model]:
         return self.dao.all()
 
+    def get_users_page(self, after: Optional[str] = None, before: Optional[str] = None,
+                       limit: Optional[int] = None, plan: Optional[QueryPlan] = None) -> Page:
+        return self.find_page(order_bys=self.LIST_ORDERING, after=after, before=before, limit=limit, plan=plan)
+
+    def iter_user_chunks(self, chunk_size: Optional[int] = None,
+                         plan: Optional[QueryPlan] = None) -> Iterator[List[User]]:
+        return self.find_chunks(order_bys=self.LIST_ORDERING, chunk_size=chunk_size, plan=plan)
+
+    async def aget_users_page(self, after: Optional[str] = None, before: Optional[str] = None,
+                              limit: Optional[int] = None, plan: Optional[QueryPlan] = None) -> Page:
+        return await self.afind_page(order_bys=self.LIST_ORDERING, after=after, before=before, limit=limit,
+                                     plan=plan)
+
+    def aiter_user_chunks(self, chunk_size: Optional[int] = None,
+                          plan: Optional[QueryPlan] = None) -> AsyncIterator[List[User]]:
+        return self.afind_chunks(order_bys=self.LIST_ORDERING, chunk_size=chunk_size, plan=plan)
+
 
 class UserWriteService(WriteService):
     @property
@@ -31,20 +55,50 @@ class UserWriteService(WriteService):
 class AuthService(ReadService):
     """Handles authentication / token generation"""
 
+    # Columns a login needs: the pk and credentials version for the tokens, the hash and the active flag
+    LOGIN_PLAN = QueryPlan(only=('id', 'password', 'is_active', 'last_pass_change'))
+
     @property
     def dao_cls(self):
         return UserDAO
 
+    @cached_property
+    def user_write_service(self) -> UserWriteService:
+        return UserWriteService()
+
     @staticmethod
     def get_tokens_for_user(user: User) -> dict:
-        refresh = RefreshToken.for_user(user)
+        refresh = stamp_token_version(RefreshToken.for_user(user), user)
         return {
             'access_token': str(refresh.access_token),
             'refresh_token': str(refresh)
         }
 
+    def get_login_candidate(self, email: str) -> Optional[User]:
+        """Active user with ``email``, loading only LOGIN_PLAN's columns"""
+        user = self.find_queryset({'email': email}, plan=self.LOGIN_PLAN).first()
+        return user if user is not None and user.is_active else None
+
+    def accept_login(self, user: User, check: PasswordCheck) -> Optional[User]:
+        """``user`` when the password matched, storing the upgraded hash if there is one"""
+        if not check.valid:
+            return None
+        if check.rehashed:
+            self.user_write_service.update(user, {'password': check.rehashed})
+        return user
+
     def validate_user(self, email: str, password: str) -> Optional[User]:
-        user = self.dao.find_one({'email': email})
-        if user and check_password(password, user.password):
-            return user
-        return None
+        user = self.get_login_candidate(email)
+        if user is None:
+            return None
+        return self.accept_login(user, verify_password(password, user.password))
+
+    async def avalidate_user(self, email: str, password: str) -> Optional[User]:
+        """validate_user with the hash check in the hashing pool, off the event loop and the sync thread"""
+        user = await sync_to_async(self.get_login_candidate)(email)
+        if user is None:
+            return None
+        check = await averify_password(password, user.password)
+        if check.rehashed:
+            return await sync_to_async(self.accept_login)(user, check)
+        return self.accept_login(user, check)
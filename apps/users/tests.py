@@ -1,3 +1,135 @@
-from django.test import TestCase
+import datetime
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from core.auth import CachedJWTAuthentication, token_version
+from core.auth.authentication import auth_user_cache
+from core.tests import DaoTestCase, PASSWORD
+from .models import User
+from .services import AuthService, UserWriteService
 
-# Create your tests here.
+
+class TokenVersionTests(DaoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user, self.other = self.make_users(2)
+        self.service = AuthService()
+        auth_user_cache().clear()
+        self.addCleanup(auth_user_cache().clear)
+
+    def token_for(self, user):
+        return self.service.get_tokens_for_user(user)['access_token']
+
+    def authenticate(self, token):
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        return CachedJWTAuthentication().authenticate(request)[0]
+
+    def assertRefused(self, token, code):
+        with self.assertRaises(AuthenticationFailed) as raised:
+            self.authenticate(token)
+        self.assertEqual(raised.exception.detail['code'], code)
+
+    def test_tokens_carry_the_credentials_version(self):
+        self.assertEqual(AccessToken(self.token_for(self.user))['ver'], token_version(self.user))
+
+    def test_users_are_served_from_the_cache(self):
+        token = self.token_for(self.user)
+        self.assertEqual(self.authenticate(token), self.user)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.authenticate(token), self.user)
+        self.assertEqual(len(queries), 0)
+
+    def test_password_change_revokes_earlier_tokens(self):
+        old = self.token_for(self.user)
+        self.authenticate(old)  # cached
+        self.user.set_password('changed-password')
+        UserWriteService().update(self.user)
+        self.assertRefused(old, 'token_revoked')
+        self.assertEqual(self.authenticate(self.token_for(self.user)), self.user)
+
+    def test_revocation_is_per_user(self):
+        token = self.token_for(self.other)
+        self.user.set_password('changed-password')
+        UserWriteService().update(self.user)
+        self.assertEqual(self.authenticate(token), self.other)
+
+    def test_login_issues_tokens_of_the_current_version(self):
+        self.user.set_password('changed-password')
+        UserWriteService().update(self.user)
+        user = self.service.validate_user(self.user.email, 'changed-password')
+        self.assertEqual(self.authenticate(self.token_for(user)), self.user)
+        self.assertIsNone(self.service.validate_user(self.user.email, PASSWORD))
+
+    def test_deactivated_and_deleted_users_are_refused(self):
+        token, other_token = self.token_for(self.user), self.token_for(self.other)
+        self.authenticate(token)
+        UserWriteService().update(self.user, {'is_active': False})
+        self.assertRefused(token, 'user_inactive')
+        UserWriteService().soft_delete(self.other)
+        self.assertRefused(other_token, 'user_not_found')
+
+    def test_tokens_without_a_version_are_refused(self):
+        token = AccessToken.for_user(self.user)
+        self.assertNotIn('ver', token.payload)
+        self.assertRefused(str(token), 'token_not_versioned')
+        self.assertRefused(str(RefreshToken.for_user(self.user).access_token), 'token_not_versioned')
+
+    def test_tokens_without_a_version_are_accepted_during_the_transition(self):
+        token = str(AccessToken.for_user(self.user))
+        with self.settings(AUTH_UNVERSIONED_TOKENS_UNTIL=timezone.now() + datetime.timedelta(hours=1)):
+            self.assertEqual(self.authenticate(token), self.user)
+        with self.settings(AUTH_UNVERSIONED_TOKENS_UNTIL=timezone.now() - datetime.timedelta(seconds=1)):
+            self.assertRefused(token, 'token_not_versioned')
+
+    def test_refreshed_access_tokens_keep_the_version(self):
+        refresh = RefreshToken(self.service.get_tokens_for_user(self.user)['refresh_token'])
+        self.assertEqual(self.authenticate(str(refresh.access_token)), self.user)
+
+
+class UserManagerTests(DaoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.alive, self.deleted = self.make_users(2)
+        User.objects.filter(pk=self.deleted.pk).update(deleted=True)
+
+    def test_default_manager_hides_soft_deleted_users(self):
+        self.assertEqual(list(User.objects.all()), [self.alive])
+        self.assertEqual(User.all_objects.count(), 2)
+        self.assertEqual(User.all_objects.get_by_natural_key(self.deleted.email), self.deleted)
+
+    def test_migrations_see_soft_deleted_users(self):
+        # What a RunPython data migration gets from apps.get_model()
+        state = MigrationExecutor(connection).loader.project_state()
+        HistoricalUser = state.apps.get_model('users', 'User')
+        self.assertEqual(HistoricalUser._default_manager.count(), 2)
+        self.assertEqual(HistoricalUser.all_objects.count(), 2)
+        self.assertFalse(hasattr(HistoricalUser._default_manager, 'with_deleted'))
+
+
+class SchemaTests(DaoTestCase):
+
+    def test_cached_jwt_authentication_is_a_bearer_scheme(self):
+        from drf_spectacular.generators import SchemaGenerator
+        from core.http.schema import render_schema
+
+        render_schema()
+        schema = SchemaGenerator().get_schema(request=None, public=True)
+        self.assertEqual(schema['components']['securitySchemes']['jwtAuth'],
+                         {'type': 'http', 'scheme': 'bearer', 'bearerFormat': 'JWT'})
+        self.assertTrue(all({'jwtAuth': []} in operation['security']
+                            for path in schema['paths'].values() for operation in path.values()))
+
+    def test_operation_ids_are_unique(self):
+        from drf_spectacular.generators import SchemaGenerator
+
+        schema = SchemaGenerator().get_schema(request=None, public=True)
+        operation_ids = [operation['operationId'] for path in schema['paths'].values()
+                         for operation in path.values()]
+        self.assertEqual(len(operation_ids), len(set(operation_ids)))
+        self.assertEqual(schema['paths']['/api/auth/users/']['get']['operationId'], 'auth_users_list')
@@ -1,10 +1,16 @@
 from django.urls import path
 
-from apps.users.views import LoginAPIView, UsersListAPIView
+from apps.users.models import User
+from apps.users.views import (LoginAPIView, UsersListAPIView, UserDetailAPIView, AsyncLoginAPIView,
+                              AsyncUsersListAPIView)
+from core.http import cache_response
 
 # Add your URL patterns here
 urlpatterns = [
     path('login/', LoginAPIView.as_view(), name='login'),
-    path('users/', UsersListAPIView.as_view(), name='users'),
+    path('users/', cache_response(User)(UsersListAPIView.as_view()), name='users'),
+    path('users/<uuid:pk>/', cache_response(User)(UserDetailAPIView.as_view()), name='user-detail'),
+    path('async/login/', AsyncLoginAPIView.as_view(), name='login-async'),
+    path('async/users/', cache_response(User)(AsyncUsersListAPIView.as_view()), name='users-async'),
 
 ]
@@ -1,12 +1,38 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views import View
+from rest_framework.renderers import JSONRenderer
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from core.http import Conditional
+from core.serializers.streaming import StreamingSerializerResponse
 from .services import AuthService, UserReadService
 from .serializers import LoginSerializer, TokenSerializer, UserSerializer
 
 
 # Create your views here.
 
+STREAM_FORMATS = ('json', 'ndjson')
+
+
+def parse_page_params(params) -> dict:
+    """after/before/limit keyword arguments for a paginated read; raises ValueError on bad input"""
+    limit = params.get('limit')
+    if limit is not None and not limit.isdigit():
+        raise ValueError('limit must be a positive integer')
+    return {'after': params.get('after'), 'before': params.get('before'), 'limit': int(limit) if limit else None}
+
+
+def page_response_data(page, serializer_class) -> dict:
+    return {
+        'next': page.next_cursor,
+        'previous': page.previous_cursor,
+        'results': serializer_class(page.objects, many=True).data,
+    }
+
 
 class LoginAPIView(APIView):
     serializer_class = LoginSerializer
@@ -29,10 +55,127 @@ class LoginAPIView(APIView):
 
 class UsersListAPIView(APIView):
     serializer_class = UserSerializer
+    schema_operation_ids = {'get': 'auth_users_list'}  # see core.http.openapi
     user_read_service = UserReadService()
 
     def get(self, request):
-        users = self.user_read_service.get_all_users()
-        serialized_data = self.serializer_class(users, many=True)
-        return Response(serialized_data.data)
+        stream = request.query_params.get('stream')
+        plan = self.serializer_class.get_query_plan()
+        if stream and stream not in STREAM_FORMATS:
+            return Response({'detail': f"stream must be one of {', '.join(STREAM_FORMATS)}"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        conditional = Conditional.for_list(request, self.user_read_service.version())
+        not_modified = conditional.not_modified(request)
+        if not_modified is not None:
+            return not_modified
+
+        if stream:
+            return conditional.apply(StreamingSerializerResponse(
+                self.user_read_service.iter_user_chunks(plan=plan), self.serializer_class,
+                ndjson=stream == 'ndjson', context={'request': request}))
+
+        try:
+            page = self.user_read_service.get_users_page(plan=plan, **parse_page_params(request.query_params))
+        except ValueError as e:  # includes InvalidCursor
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return conditional.apply(Response(page_response_data(page, self.serializer_class)))
+
+
+class UserDetailAPIView(APIView):
+    serializer_class = UserSerializer
+    user_read_service = UserReadService()
+
+    def get(self, request, pk):
+        conditional = Conditional.for_object(request, self.user_read_service.object_version(pk))
+        not_modified = conditional.not_modified(request)
+        if not_modified is not None:
+            return not_modified
+
+        user = self.user_read_service.get(pk)
+        if user is None:
+            return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+        return conditional.apply(Response(self.serializer_class(user).data))
+
+
+class AsyncAPIView(View):
+    """
+    Minimal async counterpart of APIView for the ASGI deployment: JSON in, DRF-rendered
+    JSON out, CSRF exempt. DRF's APIView cannot dispatch to async handlers.
+    """
+    renderer = JSONRenderer()
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        view.csrf_exempt = True
+        return view
+
+    def render(self, data, status_code=status.HTTP_200_OK) -> HttpResponse:
+        return HttpResponse(self.renderer.render(data), status=status_code, content_type='application/json')
+
+    @staticmethod
+    def parse_json(request) -> dict:
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            raise ValueError('JSON parse error')
+        if not isinstance(data, dict):
+            raise ValueError('Expected a JSON object')
+        return data
+
+
+class AsyncLoginAPIView(AsyncAPIView):
+    serializer_class = LoginSerializer
+    auth_service = AuthService()
+
+    async def post(self, request):
+        try:
+            serialized_data = self.serializer_class(data=self.parse_json(request))
+        except ValueError as e:
+            return self.render({'detail': str(e)}, status.HTTP_400_BAD_REQUEST)
+        if not serialized_data.is_valid():
+            return self.render(serialized_data.errors, status.HTTP_400_BAD_REQUEST)
+
+        email = serialized_data.validated_data['email']
+        password = serialized_data.validated_data['password']
+
+        user = await self.auth_service.avalidate_user(email, password)
+        if not user:
+            return self.render({'detail': 'Invalid credentials'}, status.HTTP_401_UNAUTHORIZED)
+
+        tokens = self.auth_service.get_tokens_for_user(user)
+        return self.render(TokenSerializer(tokens).data)
+
+
+class AsyncUsersListAPIView(AsyncAPIView):
+    serializer_class = UserSerializer
+    user_read_service = UserReadService()
+
+    async def get(self, request):
+        stream = request.GET.get('stream')
+        plan = self.serializer_class.get_query_plan()
+        if stream and stream not in STREAM_FORMATS:
+            return self.render({'detail': f"stream must be one of {', '.join(STREAM_FORMATS)}"},
+                               status.HTTP_400_BAD_REQUEST)
+
+        conditional = Conditional.for_list(request, await self.user_read_service.aversion())
+        not_modified = conditional.not_modified(request)
+        if not_modified is not None:
+            return not_modified
+
+        if stream:
+            return conditional.apply(StreamingSerializerResponse(
+                self.user_read_service.aiter_user_chunks(plan=plan), self.serializer_class,
+                ndjson=stream == 'ndjson', context={'request': request}))
+
+        try:
+            page = await self.user_read_service.aget_users_page(plan=plan, **parse_page_params(request.GET))
+        except ValueError as e:  # includes InvalidCursor
+            return self.render({'detail': str(e)}, status.HTTP_400_BAD_REQUEST)
+
+        # Related fields may query the database, which is only allowed from sync code
+        data = await sync_to_async(page_response_data)(page, self.serializer_class)
+        return conditional.apply(self.render(data))
 
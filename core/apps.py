@@ -1,5 +1,22 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from core.instrumentation import install_query_counter
+        connection_created.connect(install_query_counter, dispatch_uid='core-query-counter')
+
+        from core.dao.version import stamp_relation_changes
+        from core.models import BaseModel
+        for model in self.apps.get_models():
+            if issubclass(model, BaseModel) and model._meta.many_to_many:
+                # Serialized relations are part of a row's version, see core.dao.version
+                stamp_relation_changes(model)
+
+        if getattr(settings, 'API_DOCS_ENABLED', False):
+            # The docs load drf_spectacular anyway; `manage.py spectacular` needs the extensions too
+            import core.auth.schema  # noqa: F401
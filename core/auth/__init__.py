@@ -0,0 +1,3 @@
+from .passwords import PasswordCheck, verify_password, averify_password, hashing_executor
+from .tokens import token_version, stamp_token_version
+from .authentication import CachedJWTAuthentication
@@ -0,0 +1,83 @@
+import functools
+from typing import Any
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.utils.module_loading import import_string
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import Token
+from rest_framework_simplejwt.utils import get_md5_hash_password
+from core.dao import Dao, ObjectCache
+from .tokens import token_version, token_version_claim, unversioned_tokens_accepted
+
+"""
+Module: authentication.py
+Description: simplejwt authentication that resolves users through a cache.
+
+JWTAuthentication loads the token's user with one query per request.
+CachedJWTAuthentication keeps the loaded users in an ObjectCache scoped
+'auth' on the user model: per process, LRU bounded by AUTH_USER_CACHE_SIZE
+(default 10000) and expiring after AUTH_USER_CACHE_TTL seconds (default 30).
+Misses load the live row from the primary through AUTH_USER_DAO (a Dao
+class path). Every Dao write to a user (WriteService update, soft delete,
+by-query updates, ...) and post_save / post_delete drop its entry in the
+writing process; elsewhere a change to is_active, the password or the
+token version (see core.auth.tokens) takes effect within the TTL, which is
+therefore the bound on revocation.
+
+The checks run on every request, cached or not: the user must be active
+(CHECK_USER_IS_ACTIVE), the token's version claim must be present (see
+core.auth.tokens for the transition window) and match the user's, and with
+CHECK_REVOKE_TOKEN the password hash claim too.
+
+    REST_FRAMEWORK = {
+        'DEFAULT_AUTHENTICATION_CLASSES': ['core.auth.authentication.CachedJWTAuthentication', ...],
+    }
+"""
+
+
+@functools.lru_cache(maxsize=None)
+def auth_user_dao() -> Dao:
+    return import_string(settings.AUTH_USER_DAO)()
+
+
+def auth_user_cache() -> ObjectCache:
+    return ObjectCache.for_model(auth_user_dao().model, scope='auth',
+                                 ttl=getattr(settings, 'AUTH_USER_CACHE_TTL', 30),
+                                 max_size=getattr(settings, 'AUTH_USER_CACHE_SIZE', 10000))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+
+    def get_user(self, validated_token: Token) -> Any:
+        dao = auth_user_dao()
+        pk_field = dao.model._meta.pk
+        if api_settings.USER_ID_FIELD not in (pk_field.name, pk_field.attname):
+            return super().get_user(validated_token)
+        try:
+            pk = pk_field.to_python(validated_token[api_settings.USER_ID_CLAIM])
+        except (KeyError, ValidationError) as e:
+            raise InvalidToken(_('Token contained no recognizable user identification')) from e
+
+        cache = auth_user_cache()
+        user = cache.get('pk', pk)
+        if user is None:
+            user = dao.find_queryset({'pk': pk}).first()
+            if user is None:
+                raise AuthenticationFailed(_('User not found'), code='user_not_found')
+            cache.set(user)
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        version, current = validated_token.get(token_version_claim()), token_version(user)
+        if current is not None:
+            if version is None and not unversioned_tokens_accepted():
+                raise AuthenticationFailed(_('Token has no credentials version'), code='token_not_versioned')
+            if version is not None and version != current:
+                raise AuthenticationFailed(_('Token has been revoked'), code='token_revoked')
+        if api_settings.CHECK_REVOKE_TOKEN and \
+                validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+        return user
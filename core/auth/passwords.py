@@ -0,0 +1,62 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional, Tuple
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+
+"""
+Module: passwords.py
+Description: Password verification off the request thread / event loop.
+
+Hashers are CPU bound by design (PBKDF2 at 600k iterations is ~0.3 s). Run
+inline they stall a WSGI worker, and behind sync_to_async's shared thread
+they stall every other async view's database work too. averify_password runs
+them in a bounded per-process thread pool instead: hashlib's PBKDF2 and the
+argon2/bcrypt bindings release the GIL, so the pool uses every core while
+the event loop keeps serving. PASSWORD_HASHING_WORKERS sets its size
+(default: one thread per CPU); more threads than cores only adds latency.
+
+A successful check against a hash from an older hasher or cost (anything
+but the first of PASSWORD_HASHERS with its current work factor) returns the
+password re-hashed with the preferred one, computed in the same worker, for
+the caller to store.
+"""
+
+_executor: Optional[Tuple[int, ThreadPoolExecutor]] = None
+_executor_lock = threading.Lock()
+
+
+def hashing_executor() -> ThreadPoolExecutor:
+    """The process's hashing pool, created on first use (and again in forked children)"""
+    global _executor
+    pid = os.getpid()
+    if _executor is None or _executor[0] != pid:
+        with _executor_lock:
+            if _executor is None or _executor[0] != pid:
+                workers = getattr(settings, 'PASSWORD_HASHING_WORKERS', None) or os.cpu_count() or 1
+                _executor = (pid, ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hashing'))
+    return _executor[1]
+
+
+@dataclass(frozen=True)
+class PasswordCheck:
+    valid: bool
+    # The password hashed with the preferred hasher and cost when the stored hash is outdated
+    rehashed: Optional[str] = None
+
+
+def verify_password(password: str, encoded: Optional[str]) -> PasswordCheck:
+    """Check ``password`` against ``encoded`` on the calling thread"""
+    if encoded is None:  # Django's identify_hasher fails on None rather than rejecting it
+        return PasswordCheck(False)
+    rehashed = []
+    valid = check_password(password, encoded, setter=lambda raw: rehashed.append(make_password(raw)))
+    return PasswordCheck(valid, rehashed[0] if valid and rehashed else None)
+
+
+async def averify_password(password: str, encoded: Optional[str]) -> PasswordCheck:
+    """verify_password in the hashing pool"""
+    return await asyncio.get_running_loop().run_in_executor(hashing_executor(), verify_password, password, encoded)
@@ -0,0 +1,18 @@
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+
+"""
+Module: schema.py
+Description: OpenAPI (drf_spectacular) description of the core.auth backends.
+
+drf_spectacular matches authentication extensions on the exact class, so
+CachedJWTAuthentication needs its own: the same bearer JWT scheme
+('jwtAuth') as simplejwt's JWTAuthentication. Extensions register on
+import; this module is imported where schemas are generated
+(core.http.schema.render_schema, and CoreConfig.ready() with
+API_DOCS_ENABLED for drf_spectacular's own command), keeping drf_spectacular
+out of processes that only serve exported schemas.
+"""
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    target_class = 'core.auth.authentication.CachedJWTAuthentication'
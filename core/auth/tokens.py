@@ -0,0 +1,45 @@
+import datetime
+from typing import Any, Optional
+from django.conf import settings
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import Token
+
+"""
+Module: tokens.py
+Description: Token version claim.
+
+Tokens are stamped with a version of their user's credentials: the value of
+AUTH_TOKEN_VERSION_FIELD (default 'last_pass_change') when they were issued,
+under the AUTH_TOKEN_VERSION_CLAIM claim (default 'ver'). Once the field
+changes, CachedJWTAuthentication refuses tokens carrying the old version, so
+changing a password revokes every token issued before it. Tokens without the
+claim (minted by simplejwt's own views or RefreshToken.for_user) are refused,
+except until AUTH_UNVERSIONED_TOKENS_UNTIL (an aware datetime, default None):
+a transition window for tokens issued before versioning was deployed.
+"""
+
+
+def token_version_claim() -> str:
+    return getattr(settings, 'AUTH_TOKEN_VERSION_CLAIM', 'ver')
+
+
+def token_version(user: Any) -> Optional[int]:
+    """The user's current credentials version, None when the model has no version field"""
+    value = getattr(user, getattr(settings, 'AUTH_TOKEN_VERSION_FIELD', 'last_pass_change'), None)
+    if isinstance(value, datetime.datetime):
+        return round(value.timestamp() * 1_000_000)
+    return value
+
+
+def unversioned_tokens_accepted() -> bool:
+    """Whether tokens without the version claim still authenticate (AUTH_UNVERSIONED_TOKENS_UNTIL)"""
+    until = getattr(settings, 'AUTH_UNVERSIONED_TOKENS_UNTIL', None)
+    return until is not None and timezone.now() < until
+
+
+def stamp_token_version(token: Token, user: Any) -> Token:
+    """Add the version claim to ``token`` (before deriving access tokens from a refresh token)"""
+    version = token_version(user)
+    if version is not None:
+        token[token_version_claim()] = version
+    return token
@@ -1 +1,10 @@
 from .base_dao import Dao
+from .pagination import Page, InvalidCursor
+from .cache import ObjectCache
+from .identity_map import IdentityMap, identity_map_scope
+from .loader import DataLoader
+from .query_plan import QueryPlan
+from .rows import row_class
+from .counts import CountCache
+from .version import Version
+from .generations import get_generations, bump_generation
@@ -1,8 +1,27 @@
+import contextlib
+import dataclasses
 import functools
+import itertools
+from collections import defaultdict
 from abc import ABC, abstractmethod
-from typing import Optional, List, Dict, Type, Any
-from django.db.models import Model, QuerySet
+from typing import Optional, List, Dict, Type, Any, Iterable, Iterator, AsyncIterator, Set, Union, Callable
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.db import connections, router, transaction
+from django.db.models import Model, QuerySet, Manager, Max, Count
+from django.utils import timezone
 from django.utils.functional import cached_property
+from core.db.routing import choose_read_database, record_write
+from core.instrumentation import instrument_methods
+from .cache import ObjectCache
+from .generations import bump_generation
+from .counts import CountCache, filter_signature, persisted_values, COUNT_EXACT, COUNT_CACHED, COUNT_ESTIMATED
+from .identity_map import IdentityMap
+from .query_plan import QueryPlan
+from core.models.managers import SoftDeleteManager, ALIVE
+from .rows import row_fields, row_class
+from .pagination import Page, resolve_ordering, encode_cursor, decode_cursor, seek_filter
+from .version import Version
 
 """
 Module: base_dao.py
@@ -25,8 +44,51 @@ class Dao(ABC):
     """
 
     SAVE_BATCH_SIZE = 1000
+    UPDATE_BATCH_SIZE = 500
+    DELETE_BATCH_SIZE = 900
+    GET_MANY_BATCH_SIZE = 900
+    PAGE_SIZE = 50
+    MAX_PAGE_SIZE = 500
+    ITERATOR_CHUNK_SIZE = 2000
     VALIDATOR_CLASS = None
 
+    # Transaction modes of save_batch / upsert_batch: one transaction for the
+    # whole run, or one per chunk (earlier chunks stay committed on failure)
+    TRANSACTION_RUN = 'run'
+    TRANSACTION_CHUNK = 'chunk'
+
+    # Opt-in read-through object cache for get() / single-key find_one().
+    # CACHE_ALIASES are unique fields also used as keys by the request identity map.
+    CACHE_ENABLED = False
+    CACHE_TTL = 60
+    CACHE_MAX_SIZE = 10000
+    CACHE_ALIASES: tuple = ()
+    CACHE_BACKEND: Optional[str] = None
+
+    # get_count modes, see core.dao.counts. COUNTED_FILTERS are exact-match
+    # filter dicts (e.g. {'deleted': False}) whose counts are kept as counters
+    # maintained by writes; COUNT_CACHE_TTL applies to 'cached' counts.
+    COUNT_EXACT = COUNT_EXACT
+    COUNT_CACHED = COUNT_CACHED
+    COUNT_ESTIMATED = COUNT_ESTIMATED
+    COUNTED_FILTERS: tuple = ()
+    COUNT_CACHE_TTL = 30
+    COUNT_CACHE_ALIAS = 'default'
+
+    # Timestamp bumped by every write, used by get_version for conditional GETs
+    VERSION_FIELD = 'updated_at'
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        instrument_methods(cls, 'dao')
+
+    def __init__(self, read_replica: bool = False):
+        # Set for DAOs owned by a ReadService: reads may then be served by a replica
+        self.read_replica = read_replica
+        if self.COUNTED_FILTERS:
+            # Register the counters' write hooks before this DAO writes anything
+            self.count_cache
+
     @property
     @abstractmethod
     def model_cls(self) -> Type[Model]:
@@ -38,16 +100,151 @@ class Dao(ABC):
         """Cached access to model_cls"""
         return self.model_cls
 
+    @property
+    def read_objects(self) -> Manager:
+        """Manager for read queries, bound to a replica when this DAO serves reads and one is available"""
+        if self.read_replica:
+            return self.model.objects.db_manager(choose_read_database())
+        return self.model.objects
+
+    @property
+    def write_objects(self) -> Manager:
+        """Manager for writes: the base manager, which also sees soft-deleted rows"""
+        return self.model._base_manager
+
+    @cached_property
+    def hides_deleted(self) -> bool:
+        """Whether reads go through a soft-delete aware manager (BaseModel)"""
+        return isinstance(self.model._default_manager, SoftDeleteManager)
+
+    @cached_property
+    def object_cache(self) -> Optional[ObjectCache]:
+        if not self.CACHE_ENABLED:
+            return None
+        return ObjectCache.for_model(self.model, ttl=self.CACHE_TTL, max_size=self.CACHE_MAX_SIZE,
+                                     aliases=self.CACHE_ALIASES, backend=self.CACHE_BACKEND)
+
+    @cached_property
+    def count_cache(self) -> CountCache:
+        return CountCache.for_model(self.model, ttl=self.COUNT_CACHE_TTL, counted_filters=self.COUNTED_FILTERS,
+                                    alias=self.COUNT_CACHE_ALIAS)
+
+    def _lookup_key(self, filter_kwargs: Optional[Dict[str, Any]]) -> Optional[tuple]:
+        """(field, normalized value) when ``filter_kwargs`` is a single pk or alias lookup"""
+        if not filter_kwargs or len(filter_kwargs) != 1:
+            return None
+        (name, value), = filter_kwargs.items()
+        pk_name = self.model._meta.pk.name
+        if name in ('pk', pk_name):
+            name, field = 'pk', self.model._meta.pk
+        elif name in self.CACHE_ALIASES:
+            field = self.model._meta.get_field(name)
+        else:
+            return None
+        try:
+            return name, field.to_python(value)
+        except ValidationError:
+            return None
+
+    def _lookup_first(self, filter_kwargs: Dict[str, Any]) -> Optional[Model]:
+        """First match, going through the request identity map and object cache for pk/alias lookups"""
+        key = self._lookup_key(filter_kwargs)
+        identity_map = IdentityMap.current() if key else None
+        if identity_map is not None:
+            obj = identity_map.get(self.model, *key)
+            if obj is not None:
+                return obj
+
+        obj = self.object_cache.get(*key) if key and self.object_cache else None
+        if obj is None:
+            obj = self.read_objects.filter(**filter_kwargs).first()
+            if obj is not None and key and self.object_cache:
+                self.object_cache.set(obj)
+        if obj is not None and identity_map is not None:
+            identity_map.add(obj, self.CACHE_ALIASES)
+        return obj
+
+    def _invalidate(self, objs: Optional[List[Any]] = None) -> None:
+        """
+        Drop cached objects (pks or instances), or the model's whole caches when
+        ``objs`` is None, and bump the model's data generation so responses
+        cached from it go stale. Repeated on commit so readers racing the
+        transaction cannot re-populate stale rows. Called after every write,
+        it also records the write for replica stickiness.
+        """
+        using = router.db_for_write(self.model)
+        record_write(using)
+        identity_map = IdentityMap.current()
+        if identity_map is not None and objs is None:
+            identity_map.clear(self.model)
+        elif identity_map is not None:
+            # Written instances stay mapped, unless the write soft-deleted them out of view
+            identity_map.discard(self.model, [
+                obj.pk if self.hides_deleted and isinstance(obj, Model) and getattr(obj, 'deleted', False) else obj
+                for obj in objs
+            ])
+        bump = functools.partial(bump_generation, self.model)
+        bump()
+        transaction.on_commit(bump, using=using)
+        caches = ObjectCache.all_for_model(self.model)
+        if not caches:
+            return
+        if objs is None:
+            actions = [cache.clear for cache in caches]
+        else:
+            pks = [obj.pk if isinstance(obj, Model) else obj for obj in objs]
+            actions = [functools.partial(cache.invalidate, pks) for cache in caches]
+        for action in actions:
+            action()
+            transaction.on_commit(action, using=using)
+
     def get(self, pk: int) -> Optional[Model]:
         if not pk:
             return None
-        return self.model_cls.objects.filter(id=pk).first()
+        return self._lookup_first({'pk': pk})
+
+    def get_many(self, pks: Iterable[Any], batch_size: Optional[int] = None) -> List[Optional[Model]]:
+        """
+        Objects for ``pks`` in input order, None where no live row matches.
+        Like get(), hits come from the identity map and object cache; the rest
+        load with one pk IN query per chunk of ``batch_size``.
+        """
+        pk_field = self.model._meta.pk
+        keys = []
+        for pk in pks:
+            try:
+                keys.append(pk_field.to_python(pk) if pk else None)
+            except ValidationError:
+                keys.append(None)
+
+        identity_map = IdentityMap.current()
+        found: Dict[Any, Model] = {}
+        missing = []
+        for key in dict.fromkeys(key for key in keys if key is not None):
+            obj = identity_map.get(self.model, 'pk', key) if identity_map is not None else None
+            if obj is None and self.object_cache:
+                obj = self.object_cache.get('pk', key)
+            if obj is None:
+                missing.append(key)
+            else:
+                found[key] = obj
+
+        qs = self.all()
+        for chunk in self._key_chunks(missing, batch_size or self.GET_MANY_BATCH_SIZE, qs.db):
+            for obj in qs.filter(pk__in=chunk):
+                found[obj.pk] = obj
+                if self.object_cache:
+                    self.object_cache.set(obj)
+        if identity_map is not None:
+            for obj in found.values():
+                identity_map.add(obj, self.CACHE_ALIASES)
+        return [found.get(key) if key is not None else None for key in keys]
 
     def all(self, include_deleted: bool = False) -> QuerySet[Model]:
-        qs = self.model.objects.all()
-        if hasattr(self.model, 'is_deleted') and not include_deleted:
-            qs = qs.filter(is_deleted=False)
-        return qs
+        """Every live row; soft-deleted rows too with ``include_deleted``"""
+        if include_deleted and self.hides_deleted:
+            return self.read_objects.with_deleted()
+        return self.read_objects.all()
 
     def save(self, data: Dict[str, Any]) -> Optional[Model]:
         """Insert one object"""
@@ -55,67 +252,246 @@ class Dao(ABC):
             return None
         obj = self.model_cls(**data)
         obj.save()
+        self._invalidate([obj])
         return obj
 
-    def save_batch(self, objs: List[Model], batch_size: Optional[int] = None) -> bool:
-        """Insert multiple objects"""
-        if not objs:
-            return False
+    def save_batch(self, objs: Iterable[Model], batch_size: Optional[int] = None,
+                   transaction_mode: str = TRANSACTION_RUN) -> bool:
+        """
+        Insert objects from any iterable, consumed ``batch_size`` at a time so
+        generators are never materialized as a whole
+        """
+        return self._write_chunks(objs, batch_size, transaction_mode, self._insert_chunk)
+
+    def _insert_chunk(self, chunk: List[Model]) -> None:
+        self.write_objects.bulk_create(chunk)
+        # bulk_create skips save(), so record the inserted state here
+        for obj in chunk:
+            if hasattr(obj, 'mark_clean'):
+                obj.mark_clean()
+
+    def upsert_batch(self, objs: Iterable[Model], unique_fields: List[str],
+                     update_fields: Optional[List[str]] = None, batch_size: Optional[int] = None,
+                     transaction_mode: str = TRANSACTION_RUN) -> bool:
+        """
+        Insert objects, updating ``update_fields`` (default: every other concrete
+        column) of rows that conflict on ``unique_fields``. Conflicts are resolved
+        by the database (INSERT ... ON CONFLICT DO UPDATE); in-memory pks of
+        conflicting objects are not refreshed.
+        """
+        opts = self.model._meta
+        if update_fields is None:
+            update_fields = [field.name for field in opts.concrete_fields
+                             if not field.primary_key and field.name not in unique_fields]
+        # Stamp auto_now columns on conflict too, as update() does
+        update_fields = list(dict.fromkeys([*update_fields, *(
+            field.name for field in opts.concrete_fields if getattr(field, 'auto_now', False))]))
+        return self._write_chunks(objs, batch_size, transaction_mode,
+                                  lambda chunk: self.write_objects.bulk_create(
+                                      chunk, update_conflicts=True, unique_fields=unique_fields,
+                                      update_fields=update_fields),
+                                  upsert=True)
+
+    def _write_chunks(self, objs: Iterable[Model], batch_size: Optional[int], transaction_mode: str,
+                      write: Callable[[List[Model]], Any], upsert: bool = False) -> bool:
+        if transaction_mode not in (self.TRANSACTION_RUN, self.TRANSACTION_CHUNK):
+            raise ValueError(f'Unknown transaction mode {transaction_mode!r}')
         batch_size = batch_size or self.SAVE_BATCH_SIZE
-        self.model.objects.bulk_create(objs, batch_size=batch_size)
-        return True
+        using = router.db_for_write(self.model)
+        iterator = iter(objs)
+        chunks = iter(lambda: list(itertools.islice(iterator, batch_size)), [])
+        per_chunk = transaction_mode == self.TRANSACTION_CHUNK
+        chunk_count, last_chunk = 0, None
+        try:
+            with contextlib.nullcontext() if per_chunk else transaction.atomic(using=using):
+                for chunk in chunks:
+                    with transaction.atomic(using=using) if per_chunk else contextlib.nullcontext():
+                        write(chunk)
+                        if upsert:
+                            self.count_cache.reset(using)
+                        else:
+                            self.count_cache.track_inserts(chunk, using)
+                    chunk_count, last_chunk = chunk_count + 1, chunk
+        finally:
+            # Tracking every pk of a multi-chunk run would defeat bounded memory,
+            # and upserted rows may carry pks other than the objects', so drop
+            # the model's cache instead
+            if chunk_count == 1 and not upsert:
+                self._invalidate(last_chunk)
+            elif chunk_count:
+                self._invalidate()
+        return chunk_count > 0
+
+    def _dirty_fields(self, obj: Model) -> Optional[Set[str]]:
+        """
+        Fields changed on ``obj`` plus its auto_now fields (stamped here so bulk
+        updates get them too). None when the model does not track changes.
+        """
+        get_dirty_fields = getattr(obj, 'get_dirty_fields', None)
+        fields = get_dirty_fields() if get_dirty_fields else None
+        if fields:
+            for field in self.model._meta.concrete_fields:
+                if getattr(field, 'auto_now', False):
+                    field.pre_save(obj, add=False)
+                    fields.add(field.name)
+        return fields
 
     def update(self, obj: Optional[Model]) -> bool:
+        """Update one object, writing only the changed columns when they are tracked"""
         if not obj:
             return False
-        obj.save()
+        fields = self._dirty_fields(obj)
+        if fields is None:
+            obj.save()
+        elif fields:
+            obj.save(update_fields=fields)
+        self._invalidate([obj])
         return True
 
-    def update_batch(self, objs: List[Model]) -> bool:
+    def update_batch(self, objs: List[Model], batch_size: Optional[int] = None) -> bool:
+        """
+        Update many objects with bulk_update, one statement group per distinct
+        set of changed fields. Objects without change tracking write every column.
+        """
         if not objs:
             return False
+        batch_size = batch_size or self.UPDATE_BATCH_SIZE
+        all_fields = frozenset(field.name for field in self.model._meta.concrete_fields if not field.primary_key)
+        groups = defaultdict(list)
         for obj in objs:
-            self.update(obj)
+            fields = self._dirty_fields(obj)
+            if fields is None:
+                groups[all_fields].append(obj)
+            elif fields:
+                groups[frozenset(fields)].append(obj)
+
+        for fields, group in groups.items():
+            befores = [persisted_values(obj) for obj in group]
+            self.write_objects.bulk_update(group, sorted(fields), batch_size=batch_size)
+            self.count_cache.track_updates(befores, group)
+            for obj in group:
+                if hasattr(obj, 'mark_clean'):
+                    obj.mark_clean(fields)
+        self._invalidate(objs)
         return True
 
     def update_batch_by_query(self, query_kwargs: Dict[str, Any], exclude_kwargs: Dict[str, Any],
                               new_kwargs: Dict[str, Any]) -> bool:
-        self.model.objects.filter(**query_kwargs).exclude(**exclude_kwargs).update(**new_kwargs)
+        # QuerySet.update() skips auto_now, which would hide the change from get_version
+        now = timezone.now()
+        new_kwargs = {**{field.name: now for field in self.model._meta.concrete_fields
+                         if getattr(field, 'auto_now', False)}, **new_kwargs}
+        self.write_objects.filter(**query_kwargs).exclude(**exclude_kwargs).update(**new_kwargs)
+        self.count_cache.reset()
+        self._invalidate()
         return True
 
     def delete(self, obj: Optional[Model]) -> bool:
         if not obj:
             return False
+        pk = obj.pk
         obj.delete()
+        self._invalidate([pk])
         return True
 
-    def delete_batch(self, objs: List[Model]) -> bool:
+    def _pk_chunks(self, objs: List[Model], batch_size: Optional[int] = None) -> Iterator[List[Any]]:
+        """Primary keys of ``objs`` in chunks that fit the database's parameter limit"""
+        pks = [obj.pk for obj in objs if obj is not None and obj.pk is not None]
+        return self._key_chunks(pks, batch_size or self.DELETE_BATCH_SIZE, router.db_for_write(self.model))
+
+    @staticmethod
+    def _key_chunks(keys: List[Any], batch_size: int, using: str) -> Iterator[List[Any]]:
+        max_params = connections[using].features.max_query_params
+        if max_params:
+            batch_size = min(batch_size, max_params)
+        for start in range(0, len(keys), batch_size):
+            yield keys[start:start + batch_size]
+
+    def delete_batch(self, objs: List[Model], batch_size: Optional[int] = None) -> bool:
+        """Delete many objects with one pk IN delete per chunk"""
         if not objs:
             return False
-        for obj in objs:
-            self.delete(obj)
+        for pks in self._pk_chunks(objs, batch_size):
+            self.write_objects.filter(pk__in=pks).delete()
+            self._invalidate(pks)
         return True
 
     def delete_batch_by_query(self, filter_kwargs: Dict[str, Any], exclude_kwargs: Dict[str, Any] = None) -> bool:
-        qs = self.model.objects.filter(**filter_kwargs)
+        qs = self.write_objects.filter(**filter_kwargs)
         if exclude_kwargs:
             qs = qs.exclude(**exclude_kwargs)
         qs.delete()
+        self._invalidate()
         return True
 
-    def soft_delete(self, obj: Optional[Model]) -> bool:
-        """Soft-delete (requires model to have 'is_deleted' boolean field)"""
-        if not obj or not hasattr(obj, 'is_deleted'):
+    @cached_property
+    def supports_soft_delete(self) -> bool:
+        """Whether the model has BaseModel's deleted/deleted_at/deleted_by fields"""
+        names = {field.name for field in self.model._meta.concrete_fields}
+        return {'deleted', 'deleted_at', 'deleted_by'} <= names
+
+    def _soft_delete_values(self, by_user: Optional[Model]) -> Dict[str, Any]:
+        now = timezone.now()
+        values = {field.name: now for field in self.model._meta.concrete_fields if getattr(field, 'auto_now', False)}
+        values.update(deleted=True, deleted_at=now, deleted_by=by_user)
+        return values
+
+    def mark_soft_deleted(self, obj: Optional[Model], by_user: Optional[Model] = None) -> bool:
+        """Set the soft-delete fields on ``obj`` without writing it"""
+        if not obj or not self.supports_soft_delete:
             return False
-        obj.is_deleted = True
-        obj.save()
+        for key, value in self._soft_delete_values(by_user).items():
+            setattr(obj, key, value)
+        return True
+
+    def soft_delete(self, obj: Optional[Model], by_user: Optional[Model] = None) -> bool:
+        """Soft-delete (requires model to have 'deleted', 'deleted_at' and 'deleted_by' fields)"""
+        return self.mark_soft_deleted(obj, by_user) and self.update(obj)
+
+    def soft_delete_batch(self, objs_or_filter: Union[List[Model], Dict[str, Any]],
+                          by_user: Optional[Model] = None, batch_size: Optional[int] = None) -> bool:
+        """
+        Soft-delete a list of objects or every row matching a filter dict with a
+        single UPDATE (one per pk chunk for lists). Rows already deleted keep
+        their original deleted_at/deleted_by.
+        """
+        if not objs_or_filter or not self.supports_soft_delete:
+            return False
+        values = self._soft_delete_values(by_user)
+        qs = self.write_objects.exclude(deleted=True)
+        if isinstance(objs_or_filter, dict):
+            qs.filter(**objs_or_filter).update(**values)
+            self.count_cache.reset()
+            self._invalidate()
+            return True
+
+        alive = [obj for obj in objs_or_filter if obj is not None and not obj.deleted]
+        befores = [persisted_values(obj) for obj in alive]
+
+        updated = 0
+        for pks in self._pk_chunks(objs_or_filter, batch_size):
+            updated += qs.filter(pk__in=pks).update(**values)
+            self._invalidate(pks)
+        for obj in alive:
+            for key, value in values.items():
+                setattr(obj, key, value)
+        if updated == len(alive):
+            self.count_cache.track_updates(befores, alive)
+        else:
+            # Instances disagreed with their rows (stale, or left deleted by a rolled-back call)
+            self.count_cache.reset()
+        for obj in alive:
+            if hasattr(obj, 'mark_clean'):
+                obj.mark_clean(values.keys())
         return True
 
     def find_one(self,
                  filter_kwargs: Optional[Dict[str, Any]] = None,
                  exclude_kwargs: Optional[Dict[str, Any]] = None,
                  order_bys: Optional[List[str]] = None) -> Optional[Model]:
-        qs = self.model.objects.all()
+        if not exclude_kwargs and not order_bys and self._lookup_key(filter_kwargs):
+            return self._lookup_first(filter_kwargs)
+        qs = self.all()
         if filter_kwargs:
             qs = qs.filter(**filter_kwargs)
         if exclude_kwargs:
@@ -127,26 +503,115 @@ class Dao(ABC):
     def find_queryset(self,
                       filter_kwargs: Optional[Dict[str, Any]] = None,
                       exclude_kwargs: Optional[Dict[str, Any]] = None,
-                      order_bys: Optional[List[str]] = None) -> QuerySet[Model]:
-        qs = self.model.objects.all()
+                      order_bys: Optional[List[str]] = None,
+                      plan: Optional[QueryPlan] = None) -> QuerySet[Model]:
+        qs = self.all()
         if filter_kwargs:
             qs = qs.filter(**filter_kwargs)
         if exclude_kwargs:
             qs = qs.exclude(**exclude_kwargs)
         if order_bys:
             qs = qs.order_by(*order_bys)
+        if plan:
+            qs = plan.apply(qs)
         return qs
 
+    def find_page(self,
+                  filter_kwargs: Optional[Dict[str, Any]] = None,
+                  exclude_kwargs: Optional[Dict[str, Any]] = None,
+                  order_bys: Optional[List[str]] = None,
+                  after: Optional[str] = None,
+                  before: Optional[str] = None,
+                  limit: Optional[int] = None,
+                  plan: Optional[QueryPlan] = None) -> Page:
+        """
+        Keyset-paginate find_queryset. Pass a previous page's next_cursor as
+        ``after`` or its previous_cursor as ``before``; rows are located with an
+        indexed seek instead of OFFSET, so deep pages cost the same as the first.
+        """
+        if after and before:
+            raise ValueError("Pass either 'after' or 'before', not both")
+        limit = max(1, min(limit or self.PAGE_SIZE, self.MAX_PAGE_SIZE))
+        keys = resolve_ordering(self.model, order_bys)
+        backwards = bool(before)
+        ordering = [('-' if descending != backwards else '') + name for name, descending in keys]
+
+        qs = self.find_queryset(filter_kwargs, exclude_kwargs, ordering)
+        if plan:
+            # Ordering keys are needed to build the cursors even when not projected
+            qs = plan.apply(qs, required=[name for name, _ in keys])
+        if after or before:
+            values = decode_cursor(self.model, after or before, keys)
+            qs = qs.filter(seek_filter(keys, values, backwards=backwards))
+
+        objs = list(qs[:limit + 1])
+        has_more = len(objs) > limit
+        objs = objs[:limit]
+        if backwards:
+            objs.reverse()
+        has_next = True if backwards else has_more
+        has_previous = has_more if backwards else bool(after)
+
+        return Page(objects=objs,
+                    next_cursor=encode_cursor(objs[-1], keys) if objs and has_next else None,
+                    previous_cursor=encode_cursor(objs[0], keys) if objs and has_previous else None)
+
+    def find_chunks(self,
+                    filter_kwargs: Optional[Dict[str, Any]] = None,
+                    exclude_kwargs: Optional[Dict[str, Any]] = None,
+                    order_bys: Optional[List[str]] = None,
+                    chunk_size: Optional[int] = None,
+                    plan: Optional[QueryPlan] = None) -> Iterator[List[Model]]:
+        """
+        Stream find_queryset from the database cursor in lists of ``chunk_size``.
+        Rows are not cached on the queryset, so memory is bounded by one chunk.
+        The plan's prefetches run once per chunk.
+        """
+        chunk_size = chunk_size or self.ITERATOR_CHUNK_SIZE
+        qs = self.find_queryset(filter_kwargs, exclude_kwargs, order_bys, self._chunk_plan(plan))
+        chunk = []
+        for obj in qs.iterator(chunk_size=chunk_size):
+            chunk.append(obj)
+            if len(chunk) >= chunk_size:
+                if plan:
+                    plan.prefetch(chunk)
+                yield chunk
+                chunk = []
+        if chunk:
+            if plan:
+                plan.prefetch(chunk)
+            yield chunk
+
+    @staticmethod
+    def _chunk_plan(plan: Optional[QueryPlan]) -> Optional[QueryPlan]:
+        return dataclasses.replace(plan, prefetch_related=()) if plan else None
+
     def find_all_model_objs(self,
                             filter_kwargs: Optional[Dict[str, Any]] = None,
                             exclude_kwargs: Optional[Dict[str, Any]] = None,
-                            order_bys: Optional[List[str]] = None) -> List[Model]:
-        return list(self.find_queryset(filter_kwargs, exclude_kwargs, order_bys))
+                            order_bys: Optional[List[str]] = None,
+                            plan: Optional[QueryPlan] = None) -> List[Model]:
+        return list(self.find_queryset(filter_kwargs, exclude_kwargs, order_bys, plan))
+
+    def find_rows(self,
+                  filter_kwargs: Optional[Dict[str, Any]] = None,
+                  exclude_kwargs: Optional[Dict[str, Any]] = None,
+                  order_bys: Optional[List[str]] = None,
+                  fields: Optional[List[str]] = None) -> List[tuple]:
+        """
+        Like find_all_model_objs, but returns immutable row records built from
+        values_list instead of model instances. ``fields`` (names or attnames)
+        narrows the columns; the pk is always included. See core.dao.rows.
+        """
+        attnames = row_fields(self.model, fields)
+        make_row = row_class(self.model, attnames)._make
+        qs = self.find_queryset(filter_kwargs, exclude_kwargs, order_bys)
+        return list(map(make_row, qs.values_list(*attnames)))
 
     def does_exist(self,
                    filter_kwargs: Optional[Dict[str, Any]] = None,
                    exclude_kwargs: Optional[Dict[str, Any]] = None) -> bool:
-        qs = self.model.objects.all()
+        qs = self.all()
         if filter_kwargs:
             qs = qs.filter(**filter_kwargs)
         if exclude_kwargs:
@@ -155,10 +620,169 @@ class Dao(ABC):
 
     def get_count(self,
                   filter_kwargs: Optional[Dict[str, Any]] = None,
-                  exclude_kwargs: Optional[Dict[str, Any]] = None) -> int:
-        qs = self.model.objects.all()
-        if filter_kwargs:
-            qs = qs.filter(**filter_kwargs)
-        if exclude_kwargs:
-            qs = qs.exclude(**exclude_kwargs)
-        return qs.count()
+                  exclude_kwargs: Optional[Dict[str, Any]] = None,
+                  mode: str = COUNT_EXACT) -> int:
+        """
+        Row count in ``mode``: COUNT_EXACT, COUNT_CACHED (TTL) or COUNT_ESTIMATED.
+        COUNTED_FILTERS are answered from their maintained counters in every mode.
+        """
+        # Reads only see live rows, so an unfiltered count shares the {'deleted': False} counter
+        visible = {**ALIVE, **(filter_kwargs or {})} if self.hides_deleted else filter_kwargs
+        signature = filter_signature(visible, exclude_kwargs)
+        if signature in self.count_cache.counters:
+            # Primed from the primary: a lagging replica would bake its lag into the counter
+            return self.count_cache.counter(self.model.objects.filter(**(filter_kwargs or {})), signature)
+        return self.count_cache.count(self.find_queryset(filter_kwargs, exclude_kwargs), signature, mode)
+
+    @cached_property
+    def supports_versions(self) -> bool:
+        return any(field.name == self.VERSION_FIELD for field in self.model._meta.concrete_fields)
+
+    def get_version(self,
+                    filter_kwargs: Optional[Dict[str, Any]] = None,
+                    exclude_kwargs: Optional[Dict[str, Any]] = None) -> Optional[Version]:
+        """
+        Newest VERSION_FIELD and row count of find_queryset in one aggregate
+        query; None when the model has no VERSION_FIELD
+        """
+        if not self.supports_versions:
+            return None
+        result = self.find_queryset(filter_kwargs, exclude_kwargs).aggregate(
+            last_modified=Max(self.VERSION_FIELD), count=Count('*'))
+        return Version(**result)
+
+    def get_object_version(self, pk: Any) -> Optional[Version]:
+        """VERSION_FIELD of one live row; None when it does not exist or is not versioned"""
+        if not pk or not self.supports_versions:
+            return None
+        try:
+            last_modified = self.all().filter(pk=pk).values_list(self.VERSION_FIELD, flat=True).first()
+        except ValidationError:
+            return None
+        return Version(last_modified) if last_modified is not None else None
+
+    # Async counterparts, mirroring Django's own async ORM API: Django 4.2 has no
+    # async database driver or async transactions, so each call makes a single
+    # thread hop into its sync sibling (keeping cache and identity map handling
+    # in one place), while iteration streams through QuerySet.aiterator.
+
+    async def aget(self, pk: int) -> Optional[Model]:
+        return await sync_to_async(self.get)(pk)
+
+    async def aget_many(self, pks: Iterable[Any], batch_size: Optional[int] = None) -> List[Optional[Model]]:
+        return await sync_to_async(self.get_many)(pks, batch_size=batch_size)
+
+    async def aget_version(self,
+                           filter_kwargs: Optional[Dict[str, Any]] = None,
+                           exclude_kwargs: Optional[Dict[str, Any]] = None) -> Optional[Version]:
+        return await sync_to_async(self.get_version)(filter_kwargs, exclude_kwargs)
+
+    async def aget_object_version(self, pk: Any) -> Optional[Version]:
+        return await sync_to_async(self.get_object_version)(pk)
+
+    async def asave(self, data: Dict[str, Any]) -> Optional[Model]:
+        return await sync_to_async(self.save)(data)
+
+    async def asave_batch(self, objs: Iterable[Model], batch_size: Optional[int] = None,
+                          transaction_mode: str = TRANSACTION_RUN) -> bool:
+        return await sync_to_async(self.save_batch)(objs, batch_size=batch_size, transaction_mode=transaction_mode)
+
+    async def aupsert_batch(self, objs: Iterable[Model], unique_fields: List[str],
+                            update_fields: Optional[List[str]] = None, batch_size: Optional[int] = None,
+                            transaction_mode: str = TRANSACTION_RUN) -> bool:
+        return await sync_to_async(self.upsert_batch)(objs, unique_fields, update_fields, batch_size=batch_size,
+                                                      transaction_mode=transaction_mode)
+
+    async def aupdate(self, obj: Optional[Model]) -> bool:
+        return await sync_to_async(self.update)(obj)
+
+    async def aupdate_batch(self, objs: List[Model], batch_size: Optional[int] = None) -> bool:
+        return await sync_to_async(self.update_batch)(objs, batch_size=batch_size)
+
+    async def aupdate_batch_by_query(self, query_kwargs: Dict[str, Any], exclude_kwargs: Dict[str, Any],
+                                     new_kwargs: Dict[str, Any]) -> bool:
+        return await sync_to_async(self.update_batch_by_query)(query_kwargs, exclude_kwargs, new_kwargs)
+
+    async def adelete(self, obj: Optional[Model]) -> bool:
+        return await sync_to_async(self.delete)(obj)
+
+    async def adelete_batch(self, objs: List[Model], batch_size: Optional[int] = None) -> bool:
+        return await sync_to_async(self.delete_batch)(objs, batch_size=batch_size)
+
+    async def adelete_batch_by_query(self, filter_kwargs: Dict[str, Any],
+                                     exclude_kwargs: Dict[str, Any] = None) -> bool:
+        return await sync_to_async(self.delete_batch_by_query)(filter_kwargs, exclude_kwargs)
+
+    async def asoft_delete(self, obj: Optional[Model], by_user: Optional[Model] = None) -> bool:
+        return await sync_to_async(self.soft_delete)(obj, by_user=by_user)
+
+    async def asoft_delete_batch(self, objs_or_filter: Union[List[Model], Dict[str, Any]],
+                                 by_user: Optional[Model] = None, batch_size: Optional[int] = None) -> bool:
+        return await sync_to_async(self.soft_delete_batch)(objs_or_filter, by_user=by_user, batch_size=batch_size)
+
+    async def afind_one(self,
+                        filter_kwargs: Optional[Dict[str, Any]] = None,
+                        exclude_kwargs: Optional[Dict[str, Any]] = None,
+                        order_bys: Optional[List[str]] = None) -> Optional[Model]:
+        return await sync_to_async(self.find_one)(filter_kwargs, exclude_kwargs, order_bys)
+
+    async def afind_page(self,
+                         filter_kwargs: Optional[Dict[str, Any]] = None,
+                         exclude_kwargs: Optional[Dict[str, Any]] = None,
+                         order_bys: Optional[List[str]] = None,
+                         after: Optional[str] = None,
+                         before: Optional[str] = None,
+                         limit: Optional[int] = None,
+                         plan: Optional[QueryPlan] = None) -> Page:
+        return await sync_to_async(self.find_page)(filter_kwargs, exclude_kwargs, order_bys,
+                                                   after=after, before=before, limit=limit, plan=plan)
+
+    async def afind_chunks(self,
+                           filter_kwargs: Optional[Dict[str, Any]] = None,
+                           exclude_kwargs: Optional[Dict[str, Any]] = None,
+                           order_bys: Optional[List[str]] = None,
+                           chunk_size: Optional[int] = None,
+                           plan: Optional[QueryPlan] = None) -> AsyncIterator[List[Model]]:
+        """Async find_chunks, reading through QuerySet.aiterator (which cannot prefetch itself)"""
+        chunk_size = chunk_size or self.ITERATOR_CHUNK_SIZE
+        qs = self.find_queryset(filter_kwargs, exclude_kwargs, order_bys, self._chunk_plan(plan))
+        chunk = []
+        async for obj in qs.aiterator(chunk_size=chunk_size):
+            chunk.append(obj)
+            if len(chunk) >= chunk_size:
+                if plan:
+                    await sync_to_async(plan.prefetch)(chunk)
+                yield chunk
+                chunk = []
+        if chunk:
+            if plan:
+                await sync_to_async(plan.prefetch)(chunk)
+            yield chunk
+
+    async def afind_all_model_objs(self,
+                                   filter_kwargs: Optional[Dict[str, Any]] = None,
+                                   exclude_kwargs: Optional[Dict[str, Any]] = None,
+                                   order_bys: Optional[List[str]] = None,
+                                   plan: Optional[QueryPlan] = None) -> List[Model]:
+        return await sync_to_async(self.find_all_model_objs)(filter_kwargs, exclude_kwargs, order_bys, plan)
+
+    async def afind_rows(self,
+                         filter_kwargs: Optional[Dict[str, Any]] = None,
+                         exclude_kwargs: Optional[Dict[str, Any]] = None,
+                         order_bys: Optional[List[str]] = None,
+                         fields: Optional[List[str]] = None) -> List[tuple]:
+        return await sync_to_async(self.find_rows)(filter_kwargs, exclude_kwargs, order_bys, fields)
+
+    async def adoes_exist(self,
+                          filter_kwargs: Optional[Dict[str, Any]] = None,
+                          exclude_kwargs: Optional[Dict[str, Any]] = None) -> bool:
+        return await sync_to_async(self.does_exist)(filter_kwargs, exclude_kwargs)
+
+    async def aget_count(self,
+                         filter_kwargs: Optional[Dict[str, Any]] = None,
+                         exclude_kwargs: Optional[Dict[str, Any]] = None,
+                         mode: str = COUNT_EXACT) -> int:
+        return await sync_to_async(self.get_count)(filter_kwargs, exclude_kwargs, mode)
+
+
+instrument_methods(Dao, 'dao')
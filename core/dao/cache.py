@@ -0,0 +1,170 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Iterable, List, Type
+from django.core.cache import caches
+from django.db.models import Model
+from django.db.models.signals import post_save, post_delete
+
+"""
+Module: cache.py
+Description: Read-through object cache used by Dao.get / Dao.find_one.
+
+Objects are stored under ``pk:<pk>``; unique lookups such as ``email:<value>``
+are aliases holding only the pk, so invalidating a pk is enough to retire
+every way of reaching the object. The first level is a per-process LRU with
+TTL; an optional Django cache alias can sit behind it as a shared second
+level. Across processes, staleness of the local level is bounded by its TTL.
+
+A model can have several caches: the DAO's own, plus scoped ones with their
+own TTL and size (for_model(model, scope='auth', ...)). Every write that
+invalidates one invalidates all of them.
+"""
+
+
+class ObjectCache:
+    """Per-model LRU + TTL cache of model instances"""
+
+    _registry: Dict[str, 'ObjectCache'] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, label: str, ttl: float = 60, max_size: int = 10000,
+                 aliases: Iterable[str] = (), backend: Optional[str] = None):
+        self.label = label
+        self.ttl = ttl
+        self.max_size = max_size
+        self.aliases = tuple(aliases)
+        self.backend = backend
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _label(model: Type[Model], scope: str = '') -> str:
+        return f'{model._meta.label_lower}:{scope}' if scope else model._meta.label_lower
+
+    @classmethod
+    def for_model(cls, model: Type[Model], scope: str = '', **options) -> 'ObjectCache':
+        """Return the cache registered for ``model`` (and ``scope``), creating it on first use"""
+        label = cls._label(model, scope)
+        with cls._registry_lock:
+            if label not in cls._registry:
+                cls._registry[label] = cls(label, **options)
+                # Catch writes that bypass the DAO (admin, direct obj.save())
+                model_label = model._meta.label_lower
+                post_save.connect(cls._on_change, sender=model, weak=False,
+                                  dispatch_uid=f'object-cache-{model_label}')
+                post_delete.connect(cls._on_change, sender=model, weak=False,
+                                    dispatch_uid=f'object-cache-{model_label}')
+            return cls._registry[label]
+
+    @classmethod
+    def registered(cls, model: Type[Model], scope: str = '') -> Optional['ObjectCache']:
+        return cls._registry.get(cls._label(model, scope))
+
+    @classmethod
+    def all_for_model(cls, model: Type[Model]) -> List['ObjectCache']:
+        """Every cache of ``model``, scoped ones included"""
+        label = model._meta.label_lower
+        return [cache for name, cache in list(cls._registry.items())
+                if name == label or name.startswith(f'{label}:')]
+
+    @classmethod
+    def all_stats(cls) -> Dict[str, Dict[str, Any]]:
+        return {label: cache.stats() for label, cache in cls._registry.items()}
+
+    @classmethod
+    def _on_change(cls, sender, instance, **kwargs):
+        for cache in cls.all_for_model(sender):
+            cache.invalidate([instance.pk])
+
+    def get(self, field: str, value: Any) -> Optional[Model]:
+        """Cached object whose ``field`` equals ``value`` (``field`` is 'pk' or an alias)"""
+        obj = None
+        if field == 'pk':
+            obj = self._lookup(f'pk:{value}')
+        else:
+            pk = self._lookup(f'{field}:{value}')
+            if pk is not None:
+                obj = self._lookup(f'pk:{pk}')
+                # The alias may predate a change of the aliased field
+                if obj is not None and getattr(obj, field) != value:
+                    obj = None
+
+        if obj is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return copy.copy(obj)
+
+    def set(self, obj: Model) -> None:
+        if obj.pk is None or obj.get_deferred_fields():
+            return
+        entries = {f'pk:{obj.pk}': copy.copy(obj)}
+        for alias in self.aliases:
+            entries[f'{alias}:{getattr(obj, alias)}'] = obj.pk
+        for key, value in entries.items():
+            self._store(key, value)
+
+    def invalidate(self, pks: Iterable[Any]) -> None:
+        keys = [f'pk:{pk}' for pk in pks if pk is not None]
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+        if self.backend:
+            caches[self.backend].delete_many([self._backend_key(key) for key in keys])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        if self.backend:
+            backend = caches[self.backend]
+            generation_key = f'dao:{self.label}:generation'
+            # Bumping the generation orphans every shared entry in O(1)
+            if not backend.add(generation_key, 1, timeout=None):
+                backend.incr(generation_key)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+        }
+
+    def _lookup(self, key: str) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    return entry[1]
+                del self._entries[key]
+
+        if not self.backend:
+            return None
+        value = caches[self.backend].get(self._backend_key(key))
+        if value is not None:
+            self._store(key, value, shared=False)
+        return value
+
+    def _store(self, key: str, value: Any, shared: bool = True) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        if shared and self.backend:
+            caches[self.backend].set(self._backend_key(key), value, timeout=self.ttl)
+
+    def _backend_key(self, key: str) -> str:
+        generation = caches[self.backend].get(f'dao:{self.label}:generation', 0)
+        return f'dao:{self.label}:{generation}:{key}'
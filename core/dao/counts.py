@@ -0,0 +1,233 @@
+import hashlib
+import json
+import threading
+from typing import Optional, Dict, Any, Callable, Iterable, List, Tuple, Type
+from django.core.cache import caches
+from django.db import connections, router, transaction
+from django.db.models import Model, QuerySet
+from django.db.models.signals import post_save, post_delete
+
+"""
+Module: counts.py
+Description: Cheap row counts for Dao.get_count.
+
+Three modes:
+    exact      COUNT(*), except for the DAO's COUNTED_FILTERS, whose exact
+               counters are kept in a Django cache and moved by +/- deltas as
+               rows are written (post_save / post_delete for single-object and
+               queryset deletes, the DAO's bulk paths for everything else).
+               Writes the DAO cannot attribute (update/delete by query,
+               upserts) reset the counters, and the next read re-primes them
+               from COUNT(*), stored when the reading transaction commits.
+    cached     COUNT(*) results cached per filter signature for COUNT_CACHE_TTL
+               seconds; staleness is bounded by the TTL.
+    estimated  The database's planner estimate (PostgreSQL EXPLAIN, SQLite
+               sqlite_stat1 for unfiltered tables), falling back to cached.
+
+Counters are shared through the cache alias, so use a shared backend (Redis,
+Memcached) when several processes write. Counters also expire after
+COUNTER_TTL seconds, which bounds drift from writes made with raw SQL.
+"""
+
+COUNT_EXACT = 'exact'
+COUNT_CACHED = 'cached'
+COUNT_ESTIMATED = 'estimated'
+COUNT_MODES = (COUNT_EXACT, COUNT_CACHED, COUNT_ESTIMATED)
+
+
+def filter_signature(filter_kwargs: Optional[Dict[str, Any]], exclude_kwargs: Optional[Dict[str, Any]]) -> str:
+    """Stable short key for a filter/exclude pair"""
+    parts = [sorted((filter_kwargs or {}).items()), sorted((exclude_kwargs or {}).items())]
+    return hashlib.md5(json.dumps(parts, default=str).encode()).hexdigest()
+
+
+class CountCache:
+    """Per-model cached counts and incrementally maintained counters"""
+
+    COUNTER_TTL = 3600
+
+    _registry: Dict[str, 'CountCache'] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, model: Type[Model], ttl: float = 30, counted_filters: Iterable[Dict[str, Any]] = (),
+                 alias: str = 'default'):
+        self.model = model
+        self.label = model._meta.label_lower
+        self.ttl = ttl
+        self.alias = alias
+        # signature -> ((attname, value), ...) compared against instances
+        self.counters: Dict[str, Tuple[Tuple[str, Any], ...]] = {}
+        for filter_kwargs in counted_filters:
+            self.counters[filter_signature(filter_kwargs, None)] = self._conditions(filter_kwargs)
+
+    @classmethod
+    def for_model(cls, model: Type[Model], **options) -> 'CountCache':
+        """Return the count cache registered for ``model``, creating it on first use"""
+        label = model._meta.label_lower
+        with cls._registry_lock:
+            if label not in cls._registry:
+                counts = cls._registry[label] = cls(model, **options)
+                if counts.counters:
+                    post_save.connect(cls._on_save, sender=model, weak=False, dispatch_uid=f'dao-counts-{label}')
+                    post_delete.connect(cls._on_delete, sender=model, weak=False,
+                                        dispatch_uid=f'dao-counts-{label}')
+            return cls._registry[label]
+
+    @classmethod
+    def registered(cls, model: Type[Model]) -> Optional['CountCache']:
+        return cls._registry.get(model._meta.label_lower)
+
+    def _conditions(self, filter_kwargs: Dict[str, Any]) -> Tuple[Tuple[str, Any], ...]:
+        conditions = []
+        for name, value in filter_kwargs.items():
+            field = self.model._meta.get_field(name)
+            if '__' in name or not field.concrete:
+                raise ValueError(f'Counted filters take exact matches on concrete fields, got {name!r}')
+            if isinstance(value, Model):
+                value = value.pk
+            conditions.append((field.attname, field.to_python(value) if value is not None else None))
+        return tuple(conditions)
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    def _key(self, kind: str, signature: str) -> str:
+        return f'dao-count:{self.label}:{kind}:{signature}'
+
+    # Reads
+
+    def count(self, qs: QuerySet, signature: str, mode: str) -> int:
+        """Count of ``qs`` (not a counted filter) in ``mode``"""
+        if mode not in COUNT_MODES:
+            raise ValueError(f'Unknown count mode {mode!r}, expected one of {", ".join(COUNT_MODES)}')
+        if mode == COUNT_ESTIMATED:
+            estimate = estimate_count(qs)
+            if estimate is not None:
+                return estimate
+        if mode == COUNT_EXACT:
+            return qs.count()
+        return self.cached(qs, signature)
+
+    def cached(self, qs: QuerySet, signature: str) -> int:
+        key = self._key('ttl', signature)
+        value = self.backend.get(key)
+        if value is None:
+            value = qs.count()
+            self.backend.set(key, value, timeout=self.ttl)
+        return value
+
+    def counter(self, qs: QuerySet, signature: str) -> int:
+        key = self._key('counter', signature)
+        value = self.backend.get(key)
+        if value is None:
+            value = qs.count()
+            # Stored once the reading transaction commits (now, outside one): a rollback must not
+            # leave its rows in the counter, and the deltas of writes made earlier in the
+            # transaction, which the count already includes, run before this and find it unprimed.
+            # add() so a counter primed (and moved) meanwhile by another process wins.
+            transaction.on_commit(lambda: self.backend.add(key, value, timeout=self.COUNTER_TTL),
+                                  using=router.db_for_write(self.model))
+        return value
+
+    # Writes
+
+    def _matches(self, values: Callable[[str], Any], conditions: Tuple[Tuple[str, Any], ...]) -> bool:
+        return all(values(attname) == value for attname, value in conditions)
+
+    def track(self, before: Iterable[Optional[Callable[[str], Any]]],
+              after: Iterable[Optional[Callable[[str], Any]]], using: Optional[str] = None) -> None:
+        """
+        Move the counters by the rows whose match changed. ``before`` / ``after``
+        hold one attribute getter per row, None meaning the row did not exist.
+        Deltas are applied when the surrounding transaction commits.
+        """
+        if not self.counters:
+            return
+        deltas = {}
+        for old, new in zip(before, after):
+            for signature, conditions in self.counters.items():
+                delta = ((new is not None and self._matches(new, conditions))
+                         - (old is not None and self._matches(old, conditions)))
+                if delta:
+                    deltas[signature] = deltas.get(signature, 0) + delta
+        if deltas:
+            transaction.on_commit(lambda: self._apply(deltas), using=using or router.db_for_write(self.model))
+
+    def track_inserts(self, objs: List[Model], using: Optional[str] = None) -> None:
+        self.track([None] * len(objs), [obj_values(obj) for obj in objs], using)
+
+    def track_updates(self, befores: List[Optional[Callable[[str], Any]]], objs: List[Model],
+                      using: Optional[str] = None) -> None:
+        """``befores`` from persisted_values(); rows without a snapshot reset the counters"""
+        if any(before is None for before in befores):
+            self.reset(using)
+            return
+        self.track(befores, [obj_values(obj) for obj in objs], using)
+
+    def _apply(self, deltas: Dict[str, int]) -> None:
+        for signature, delta in deltas.items():
+            try:
+                self.backend.incr(self._key('counter', signature), delta)
+            except ValueError:
+                pass  # Not primed; the next read counts from the database
+
+    def reset(self, using: Optional[str] = None) -> None:
+        """Forget the counters after a write whose effect on them is unknown"""
+        if not self.counters:
+            return
+        keys = [self._key('counter', signature) for signature in self.counters]
+        self.backend.delete_many(keys)
+        transaction.on_commit(lambda: self.backend.delete_many(keys), using=using or router.db_for_write(self.model))
+
+    @classmethod
+    def _on_save(cls, sender, instance, created, raw=False, using=None, **kwargs):
+        counts = cls.registered(sender)
+        if counts is None or raw:
+            return
+        if created:
+            counts.track_inserts([instance], using)
+        else:
+            counts.track_updates([persisted_values(instance)], [instance], using)
+
+    @classmethod
+    def _on_delete(cls, sender, instance, using=None, **kwargs):
+        counts = cls.registered(sender)
+        if counts is not None:
+            counts.track([persisted_values(instance) or obj_values(instance)], [None], using)
+
+
+def obj_values(obj: Model) -> Callable[[str], Any]:
+    return lambda attname: getattr(obj, attname)
+
+
+def persisted_values(obj: Model) -> Optional[Callable[[str], Any]]:
+    """Getter over the values ``obj`` was loaded with (BaseModel snapshot), None when unknown"""
+    loaded = getattr(obj, '_loaded_values', None)
+    if loaded is None:
+        return None
+    loaded = dict(loaded)
+    return lambda attname: loaded[attname] if attname in loaded else getattr(obj, attname)
+
+
+def estimate_count(qs: QuerySet) -> Optional[int]:
+    """Planner row estimate for ``qs``, or None when the backend offers none"""
+    connection = connections[qs.db]
+    if connection.vendor == 'postgresql':
+        sql, params = qs.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+    if connection.vendor == 'sqlite' and not qs.query.where:
+        # Populated by ANALYZE: the first number of an index's stat is the table's row count
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+            if cursor.fetchone() is None:
+                return None
+            cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1', [qs.model._meta.db_table])
+            row = cursor.fetchone()
+        return int(row[0].split()[0]) if row else None
+    return None
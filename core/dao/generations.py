@@ -0,0 +1,80 @@
+import threading
+import time
+from typing import Dict, Iterable, Set, Type
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Model
+from django.db.models.signals import post_save, post_delete, m2m_changed
+
+"""
+Module: generations.py
+Description: Per-model data generations for caches of derived data.
+
+A generation is a counter kept in a Django cache (alias DAO_GENERATION_CACHE,
+default 'default') under ``dao:<app_label.model>:data-generation``. Dao
+writes bump it, so anything cached together with the generations it was
+computed at can tell it is stale by comparing them against the current ones:
+invalidation is one increment, however many entries depend on the model.
+
+Counters start at a time-based value rather than 0, so a counter lost to
+eviction or a cache restart never matches an entry recorded before the loss.
+Writes that bypass the DAO are caught by post_save / post_delete, and
+changes to the model's many-to-many relations by m2m_changed, once a
+consumer watch()es the model; queryset.update() and raw SQL are not.
+"""
+
+
+def _backend():
+    return caches[getattr(settings, 'DAO_GENERATION_CACHE', 'default')]
+
+
+def _key(model: Type[Model]) -> str:
+    return f'dao:{model._meta.label_lower}:data-generation'
+
+
+def get_generations(models: Iterable[Type[Model]]) -> Dict[str, int]:
+    """Current generation of each model, by label, in one cache round trip"""
+    keys = {_key(model): model._meta.label_lower for model in models}
+    backend = _backend()
+    found = backend.get_many(list(keys))
+    for key in keys.keys() - found.keys():
+        backend.add(key, time.time_ns(), timeout=None)
+        found[key] = backend.get(key)
+    return {label: found[key] for key, label in keys.items()}
+
+
+def bump_generation(model: Type[Model]) -> None:
+    """Retire everything recorded at the model's current generation"""
+    backend = _backend()
+    try:
+        backend.incr(_key(model))
+    except ValueError:
+        backend.add(_key(model), time.time_ns(), timeout=None)
+
+
+_watched: Set[str] = set()
+_watched_lock = threading.Lock()
+
+
+def _on_change(sender, **kwargs):
+    bump_generation(sender)
+
+
+def _on_m2m_change(sender, instance, action, reverse, model, **kwargs):
+    if action.startswith('post_'):
+        # Forward changes come from the watched model's side, reverse ones name it as ``model``
+        bump_generation(model if reverse else type(instance))
+
+
+def watch(model: Type[Model]) -> None:
+    """Also bump on saves and deletes that bypass the DAO (admin, direct obj.save())"""
+    label = model._meta.label_lower
+    with _watched_lock:
+        if label in _watched:
+            return
+        _watched.add(label)
+        post_save.connect(_on_change, sender=model, weak=False, dispatch_uid=f'dao-generation-{label}')
+        post_delete.connect(_on_change, sender=model, weak=False, dispatch_uid=f'dao-generation-{label}')
+        for field in model._meta.many_to_many:
+            m2m_changed.connect(_on_m2m_change, sender=field.remote_field.through, weak=False,
+                                dispatch_uid=f'dao-generation-{label}-{field.name}')
@@ -0,0 +1,75 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Dict, Any, Iterable, Type
+from django.db.models import Model
+
+"""
+Module: identity_map.py
+Description: Request-scoped identity map consulted by Dao.get / Dao.find_one.
+
+Within one scope (normally one request, opened by IdentityMapMiddleware) a
+row looked up by pk or unique alias is loaded once and the same instance is
+handed back on later lookups. The scope also holds the request's
+DataLoaders (core.dao.loader), which are invalidated along with it.
+Ref:
+    1. https://martinfowler.com/eaaCatalog/identityMap.html
+"""
+
+_current: ContextVar[Optional['IdentityMap']] = ContextVar('identity_map', default=None)
+
+
+class IdentityMap:
+    """Instances keyed by (model, 'pk' or alias field, value)"""
+
+    def __init__(self):
+        self._objects: Dict[tuple, Model] = {}
+        # model label -> DataLoader
+        self.loaders: Dict[str, Any] = {}
+
+    @staticmethod
+    def current() -> Optional['IdentityMap']:
+        return _current.get()
+
+    def get(self, model: Type[Model], field: str, value: Any) -> Optional[Model]:
+        obj = self._objects.get((model._meta.label_lower, field, value))
+        # An alias entry goes stale once the aliased field changes on the instance
+        if obj is not None and field != 'pk' and getattr(obj, field) != value:
+            return None
+        return obj
+
+    def add(self, obj: Model, aliases: Iterable[str] = ()) -> None:
+        label = obj._meta.label_lower
+        self._objects[(label, 'pk', obj.pk)] = obj
+        for alias in aliases:
+            self._objects[(label, alias, getattr(obj, alias))] = obj
+
+    def discard(self, model: Type[Model], objs: Iterable[Any]) -> None:
+        """Forget pks or instances, keeping entries that are the very instance written"""
+        label = model._meta.label_lower
+        written = {id(obj) for obj in objs if isinstance(obj, Model)}
+        pks = {obj.pk if isinstance(obj, Model) else obj for obj in objs}
+        for key, obj in list(self._objects.items()):
+            if key[0] == label and obj.pk in pks and id(obj) not in written:
+                del self._objects[key]
+        if label in self.loaders:
+            self.loaders[label].forget(pks)
+
+    def clear(self, model: Optional[Type[Model]] = None) -> None:
+        if model is None:
+            self._objects.clear()
+            self.loaders.clear()
+            return
+        label = model._meta.label_lower
+        for key in [key for key in self._objects if key[0] == label]:
+            del self._objects[key]
+        self.loaders.pop(label, None)
+
+
+@contextmanager
+def identity_map_scope():
+    """Open a fresh identity map for the duration of the block"""
+    token = _current.set(IdentityMap())
+    try:
+        yield _current.get()
+    finally:
+        _current.reset(token)
@@ -0,0 +1,90 @@
+from typing import Any, Dict, Iterable, List, Optional
+from django.db.models import Model
+from .identity_map import IdentityMap
+
+"""
+Module: loader.py
+Description: Dataloader-style batching of pk lookups on top of Dao.get_many.
+
+load(pk) only queues the key and returns a handle; the first handle to be
+read resolves every queued key of that model with one get_many (one pk IN
+query per chunk), and results, misses included, are memoized. Code that
+walks many rows can therefore queue all their keys up front (as
+LoadedRelatedField does for a list serializer) and read them one by one
+afterwards without a query per row.
+
+DataLoader.for_dao() returns the loader of the current identity map scope,
+so the memo lives for one request and is dropped whenever the DAO
+invalidates the model's rows.
+Ref:
+    1. https://github.com/graphql/dataloader
+"""
+
+
+class Deferred:
+    """A queued load; get() resolves it (and every key queued alongside it)"""
+
+    __slots__ = ('loader', 'key')
+
+    def __init__(self, loader: 'DataLoader', key: Any):
+        self.loader = loader
+        self.key = key
+
+    def get(self) -> Optional[Model]:
+        return self.loader.get(self.key)
+
+
+class DataLoader:
+    """Coalesces pk lookups of one DAO into batched get_many calls"""
+
+    def __init__(self, dao):
+        self.dao = dao
+        self._pending: Dict[Any, None] = {}
+        self._resolved: Dict[Any, Optional[Model]] = {}
+        self.batches = 0
+
+    @classmethod
+    def for_dao(cls, dao) -> 'DataLoader':
+        """The current scope's loader for ``dao``'s model, or a new unscoped loader outside a scope"""
+        identity_map = IdentityMap.current()
+        if identity_map is None:
+            return cls(dao)
+        label = dao.model._meta.label_lower
+        loader = identity_map.loaders.get(label)
+        if loader is None:
+            loader = identity_map.loaders[label] = cls(dao)
+        return loader
+
+    def load(self, pk: Any) -> Deferred:
+        if pk is not None and pk not in self._resolved:
+            self._pending[pk] = None
+        return Deferred(self, pk)
+
+    def load_many(self, pks: Iterable[Any]) -> List[Deferred]:
+        return [self.load(pk) for pk in pks]
+
+    def get(self, pk: Any) -> Optional[Model]:
+        if pk is None:
+            return None
+        if pk not in self._resolved:
+            self._pending[pk] = None
+            self.dispatch()
+        return self._resolved[pk]
+
+    def get_many(self, pks: Iterable[Any]) -> List[Optional[Model]]:
+        pks = list(pks)
+        self.load_many(pks)
+        return [self.get(pk) for pk in pks]
+
+    def dispatch(self) -> None:
+        """Resolve every queued key with one get_many"""
+        if not self._pending:
+            return
+        keys = list(self._pending)
+        self._pending.clear()
+        self._resolved.update(zip(keys, self.dao.get_many(keys)))
+        self.batches += 1
+
+    def forget(self, pks: Iterable[Any]) -> None:
+        for pk in pks:
+            self._resolved.pop(pk, None)
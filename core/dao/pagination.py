@@ -0,0 +1,121 @@
+import base64
+import binascii
+import datetime
+import decimal
+import json
+import uuid
+from dataclasses import dataclass, field
+from typing import Optional, List, Tuple, Any, Type
+from django.db.models import Model, Q
+
+"""
+Module: pagination.py
+Description: Keyset (cursor) pagination helpers used by Dao.find_page.
+
+A cursor is an opaque, url-safe token holding the ordering keys and the
+values of the row it points at. Pages are fetched with an indexed seek
+``WHERE (k1, k2, ...) > (v1, v2, ...)`` instead of OFFSET, so page 10,000
+costs the same as page 1.
+Ref:
+    1. https://use-the-index-luke.com/no-offset
+"""
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor token cannot be decoded or does not match the ordering"""
+
+
+@dataclass
+class Page:
+    """One page of a keyset-paginated result"""
+    objects: List[Model] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+    previous_cursor: Optional[str] = None
+
+    def __iter__(self):
+        return iter(self.objects)
+
+    def __len__(self):
+        return len(self.objects)
+
+
+def _json_default(value: Any) -> Any:
+    # Full precision on purpose: DjangoJSONEncoder truncates microseconds,
+    # which would make the seek skip or repeat rows.
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (uuid.UUID, decimal.Decimal)):
+        return str(value)
+    raise TypeError(f"Cannot encode {type(value).__name__} in a cursor")
+
+
+def resolve_ordering(model: Type[Model], order_bys: Optional[List[str]]) -> List[Tuple[str, bool]]:
+    """
+    Turn ``order_bys`` into ``[(field_name, descending), ...]``.
+    A primary key tie-breaker is appended unless the last key is already unique.
+    Nullable fields are refused: NULL never compares greater or less than a
+    cursor value, so the seek would silently skip those rows.
+    """
+    keys = []
+    for order_by in order_bys or []:
+        descending = order_by.startswith('-')
+        name = order_by.lstrip('-+')
+        if '__' in name or '?' in name:
+            raise ValueError(f"Keyset pagination only supports local fields, got '{order_by}'")
+        if name == 'pk':
+            name = model._meta.pk.name
+        if model._meta.get_field(name).null:
+            raise ValueError(f"Keyset pagination cannot order by nullable field '{name}'")
+        keys.append((name, descending))
+
+    if not keys or not model._meta.get_field(keys[-1][0]).unique:
+        descending = keys[-1][1] if keys else False
+        keys.append((model._meta.pk.name, descending))
+    return keys
+
+
+def encode_cursor(obj: Model, keys: List[Tuple[str, bool]]) -> str:
+    """Build an opaque cursor pointing at ``obj``"""
+    values = [getattr(obj, obj._meta.get_field(name).attname) for name, _ in keys]
+    payload = {'k': [name for name, _ in keys], 'v': values}
+    raw = json.dumps(payload, default=_json_default, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(model: Type[Model], token: str, keys: List[Tuple[str, bool]]) -> List[Any]:
+    """Decode a cursor built for the same ordering and return its key values"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        payload = json.loads(raw)
+        names, values = payload['k'], payload['v']
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise InvalidCursor('Malformed cursor')
+
+    if names != [name for name, _ in keys] or len(values) != len(keys):
+        raise InvalidCursor('Cursor does not match the requested ordering')
+    try:
+        return [model._meta.get_field(name).to_python(value) for name, value in zip(names, values)]
+    except Exception:
+        raise InvalidCursor('Malformed cursor')
+
+
+def seek_filter(keys: List[Tuple[str, bool]], values: List[Any], backwards: bool = False) -> Q:
+    """
+    Expand the row-value comparison ``(k1, k2, ...) > (v1, v2, ...)`` into
+    ``k1 > v1 OR (k1 = v1 AND k2 > v2) OR ...`` honouring each key's direction.
+    A redundant ``k1 >= v1`` bound is added so the planner can range-scan
+    the index on the leading key.
+    """
+    def lookup(name, descending):
+        after = descending == backwards
+        return f'{name}__gt' if after else f'{name}__lt'
+
+    condition = Q()
+    equal = Q()
+    for (name, descending), value in zip(keys, values):
+        condition |= equal & Q(**{lookup(name, descending): value})
+        equal &= Q(**{name: value})
+
+    (lead_name, lead_desc), lead_value = keys[0], values[0]
+    bound = f'{lead_name}__gte' if lead_desc == backwards else f'{lead_name}__lte'
+    return Q(**{bound: lead_value}) & condition
@@ -0,0 +1,44 @@
+from dataclasses import dataclass
+from typing import Optional, Tuple, Iterable, Any
+from django.db.models import QuerySet, Model, prefetch_related_objects
+
+"""
+Module: query_plan.py
+Description: Column projection and relation loading hints passed to Dao finders.
+
+A QueryPlan is normally derived from a ServiceSerializer's declared fields
+(ServiceSerializer.get_query_plan) so the DAO loads only the columns the
+serializer renders and fetches relations in a constant number of queries.
+"""
+
+
+@dataclass(frozen=True)
+class QueryPlan:
+    # Fields to load with only(); None loads every column
+    only: Optional[Tuple[str, ...]] = None
+    select_related: Tuple[str, ...] = ()
+    prefetch_related: Tuple[str, ...] = ()
+
+    def apply(self, qs: QuerySet, required: Iterable[str] = ()) -> QuerySet:
+        """Apply the plan to ``qs``; ``required`` fields are loaded even when not projected"""
+        if self.select_related:
+            qs = qs.select_related(*self.select_related)
+        if self.prefetch_related:
+            qs = qs.prefetch_related(*self.prefetch_related)
+        if self.only is not None:
+            qs = qs.only(*self.only, *required)
+        return qs
+
+    def prefetch(self, objs: Iterable[Model]) -> None:
+        """Prefetch the plan's relations onto already loaded objects"""
+        if self.prefetch_related:
+            prefetch_related_objects(list(objs), *self.prefetch_related)
+
+    def prepare(self, instance: Any) -> Any:
+        """Optimize a serializer's many=True instance: plan unevaluated querysets, prefetch lists"""
+        if isinstance(instance, QuerySet):
+            return self.apply(instance) if instance._result_cache is None else instance
+        if isinstance(instance, (list, tuple)) and instance and isinstance(instance[0], Model):
+            # Loaded rows missed the join too, so forward relations are fetched one query each as well
+            prefetch_related_objects(list(instance), *self.select_related, *self.prefetch_related)
+        return instance
@@ -0,0 +1,64 @@
+import threading
+from collections import namedtuple
+from operator import itemgetter
+from typing import Dict, Optional, Sequence, Tuple, Type
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Model
+
+"""
+Module: rows.py
+Description: Compact, immutable row records for read-only consumers (Dao.find_rows).
+
+A row class is generated once per model and column projection. Rows are
+namedtuples (tuple storage, no per-instance __dict__) keyed by the fields'
+attnames, so ``row.email`` and ``row.created_by_id`` read like they do on a
+model instance, and ``pk`` / ``serializable_value`` cover what DRF's
+serializers need from an instance. Rows carry concrete columns only: no
+related objects, many-to-many managers, signals or save().
+"""
+
+_row_classes: Dict[Tuple[str, Tuple[str, ...]], type] = {}
+_lock = threading.Lock()
+
+
+def row_fields(model: Type[Model], fields: Optional[Sequence[str]] = None) -> Tuple[str, ...]:
+    """Attnames to select for ``fields`` (names or attnames), every concrete column by default"""
+    opts = model._meta
+    if fields is None:
+        return tuple(field.attname for field in opts.concrete_fields)
+    attnames = [opts.get_field(name).attname for name in fields]
+    if opts.pk.attname not in attnames:
+        attnames.insert(0, opts.pk.attname)
+    return tuple(dict.fromkeys(attnames))
+
+
+def row_class(model: Type[Model], attnames: Tuple[str, ...]) -> type:
+    """The row record class for ``model`` restricted to ``attnames``"""
+    key = (model._meta.label_lower, attnames)
+    cls = _row_classes.get(key)
+    if cls is None:
+        with _lock:
+            cls = _row_classes.get(key)
+            if cls is None:
+                cls = _row_classes[key] = _build_row_class(model, attnames)
+    return cls
+
+
+def _build_row_class(model: Type[Model], attnames: Tuple[str, ...]) -> type:
+    opts = model._meta
+    base = namedtuple(f'{model.__name__}Row', attnames)
+
+    def serializable_value(self, field_name: str):
+        try:
+            field = opts.get_field(field_name)
+        except FieldDoesNotExist:
+            return getattr(self, field_name)
+        return getattr(self, field.attname)
+
+    return type(base.__name__, (base,), {
+        '__slots__': (),
+        '__module__': __name__,
+        'model': model,
+        'pk': property(itemgetter(attnames.index(opts.pk.attname))),
+        'serializable_value': serializable_value,
+    })
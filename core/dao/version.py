@@ -0,0 +1,98 @@
+import datetime
+import functools
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Optional, Any, Set, Type
+from django.db import router, transaction
+from django.db.models import Model
+from django.db.models.signals import m2m_changed
+from django.utils import timezone
+from .cache import ObjectCache
+from .generations import bump_generation
+from .identity_map import IdentityMap
+
+"""
+Module: version.py
+Description: Cheap change validators for conditional GETs (Dao.get_version).
+
+A result set's version is the newest VERSION_FIELD (BaseModel.updated_at,
+stamped on every DAO write) together with the row count. The count catches
+what the timestamp cannot: rows leaving the set through a hard delete or
+through a filter column changing, e.g. a soft delete.
+
+Many-to-many changes (user.groups.add(group), group.user_set.clear(), ...)
+write the through table only, yet serializers render the relations, so
+stamp_relation_changes() also stamps VERSION_FIELD on the rows whose
+relations changed. CoreConfig.ready() installs it for every BaseModel with
+many-to-many fields, in every process. Writes straight to a through model's
+table are not seen.
+"""
+
+
+@dataclass(frozen=True)
+class Version:
+    last_modified: Optional[datetime.datetime]
+    count: int = 1
+
+    def etag(self, *scope: Any) -> str:
+        """Weak entity tag for this version of the representation identified by ``scope``"""
+        stamp = self.last_modified.isoformat() if self.last_modified else ''
+        digest = hashlib.md5(repr((stamp, self.count) + scope).encode()).hexdigest()
+        return f'W/"{digest}"'
+
+
+_stamped: Set[str] = set()
+_stamped_lock = threading.Lock()
+
+
+def stamp_relation_changes(model: Type[Model], version_field: str = 'updated_at') -> None:
+    """Stamp ``version_field`` on ``model`` rows whose many-to-many fields change"""
+    label = model._meta.label_lower
+    with _stamped_lock:
+        if label in _stamped:
+            return
+        _stamped.add(label)
+        for field in model._meta.many_to_many:
+            m2m_changed.connect(functools.partial(_on_m2m_change, field, version_field),
+                                sender=field.remote_field.through, weak=False,
+                                dispatch_uid=f'dao-version-{label}-{field.name}')
+
+
+def _on_m2m_change(field, version_field: str, sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == 'pre_clear':
+        # clear() from the other side names no rows: note them while the relations exist
+        instance.__dict__.setdefault('_cleared_relations', {})[sender] = list(
+            sender._base_manager.filter(**{field.m2m_reverse_field_name(): instance.pk})
+            .values_list(field.m2m_field_name(), flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        pks = [instance.pk] if pk_set or action == 'post_clear' else []
+    elif action == 'post_clear':
+        pks = instance.__dict__.get('_cleared_relations', {}).pop(sender, [])
+    else:
+        pks = list(pk_set)
+    if not pks:
+        return
+
+    model, now = field.model, timezone.now()
+    for start in range(0, len(pks), 900):
+        model._base_manager.filter(pk__in=pks[start:start + 900]).update(**{version_field: now})
+    if not reverse:
+        setattr(instance, version_field, now)
+        if hasattr(instance, 'mark_clean'):
+            instance.mark_clean([version_field])
+
+    identity_map = IdentityMap.current()
+    if identity_map is not None:
+        identity_map.discard(model, [instance] if not reverse else pks)
+
+    def invalidate():
+        for cache in ObjectCache.all_for_model(model):
+            cache.invalidate(pks)
+        bump_generation(model)
+
+    invalidate()
+    transaction.on_commit(invalidate, using=router.db_for_write(model))
@@ -0,0 +1 @@
+from .routing import ReplicaRouter, choose_read_database, pin_primary, routing_scope
@@ -0,0 +1,152 @@
+import os
+import queue
+import threading
+from typing import Dict, Tuple, Any
+from django.db import OperationalError
+from django.db.backends.sqlite3.base import DatabaseWrapper as SQLiteDatabaseWrapper
+from .write_queue import WriteQueue
+
+"""
+Module: base.py
+Description: SQLite backend tuned for serving requests from one database file.
+
+ENGINE 'core.db.backends.sqlite3' behaves like Django's sqlite3 backend plus:
+
+    PRAGMAs    applied to every new connection: WAL journaling (readers never
+               block the writer), synchronous=NORMAL (durable at checkpoints,
+               safe under WAL), a 256 MB mmap, a 64 MB page cache, in-memory
+               temp tables and a 5 s busy_timeout. OPTIONS['pragmas'] adds to
+               or overrides them.
+    pool       closed connections go back to a per-process pool instead of
+               being torn down, so threads that come and go (ASGI's sync
+               thread pool, threaded servers) reuse warm connections with
+               their page cache and mmap. OPTIONS['pool_size'], 0 disables.
+    write queue
+               transactions start with BEGIN IMMEDIATE after taking a FIFO
+               write lock shared by the process's threads, and autocommit
+               writes take the same lock, so writers queue in Python instead
+               of spinning in busy_timeout or failing to upgrade a read lock.
+               Writers in other processes still meet in SQLite, where
+               BEGIN IMMEDIATE plus busy_timeout keep them from deadlocking.
+               OPTIONS['write_queue'] = False disables it.
+
+Every atomic block takes the write lock, read-only ones included; keep
+read paths outside transaction.atomic to let them run concurrently.
+"""
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 268435456,
+    'cache_size': -64000,
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000,
+}
+DEFAULT_POOL_SIZE = 10
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+# (pid, database name) -> idle raw connections; keyed by pid so forked children never share a parent's
+_pools: Dict[Tuple[int, str], queue.LifoQueue] = {}
+_pools_lock = threading.Lock()
+
+
+def connection_pool(name: str, size: int) -> queue.LifoQueue:
+    key = (os.getpid(), name)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.setdefault(key, queue.LifoQueue(maxsize=size))
+    return pool
+
+
+class DatabaseWrapper(SQLiteDatabaseWrapper):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        options = self.settings_dict['OPTIONS']
+        self.pragmas: Dict[str, Any] = {**DEFAULT_PRAGMAS, **options.get('pragmas', {})}
+        self.pool_size: int = options.get('pool_size', DEFAULT_POOL_SIZE)
+        self.write_queue = WriteQueue.for_database(str(self.settings_dict['NAME'])) \
+            if options.get('write_queue', True) else None
+        self.holds_write_lock = False
+        if self.write_queue is not None:
+            self.execute_wrappers.append(self._serialize_autocommit_write)
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        for option in ('pragmas', 'pool_size', 'write_queue'):
+            kwargs.pop(option, None)
+        return kwargs
+
+    def _pool(self) -> queue.LifoQueue:
+        return connection_pool(str(self.settings_dict['NAME']), self.pool_size)
+
+    def _poolable(self) -> bool:
+        return self.pool_size > 0 and not self.is_in_memory_db()
+
+    def get_new_connection(self, conn_params):
+        if self._poolable():
+            try:
+                return self._pool().get_nowait()
+            except queue.Empty:
+                pass
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _close(self):
+        self._release_write_lock()
+        if self.connection is not None and self._poolable() and not self.errors_occurred:
+            try:
+                if self.connection.in_transaction:
+                    self.connection.rollback()
+                self._pool().put_nowait(self.connection)
+                return
+            except (queue.Full, self.Database.Error):
+                pass
+        super()._close()
+
+    # Write queue
+
+    def _acquire_write_lock(self) -> None:
+        if not self.write_queue.acquire(timeout=int(self.pragmas['busy_timeout']) / 1000):
+            raise OperationalError('database is locked (timed out waiting for the write queue)')
+        self.holds_write_lock = True
+
+    def _release_write_lock(self) -> None:
+        if self.holds_write_lock:
+            self.holds_write_lock = False
+            self.write_queue.release()
+
+    def _start_transaction_under_autocommit(self):
+        if self.write_queue is None:
+            super()._start_transaction_under_autocommit()
+            return
+        self._acquire_write_lock()
+        try:
+            self.cursor().execute('BEGIN IMMEDIATE')
+        except Exception:
+            self._release_write_lock()
+            raise
+
+    def _commit(self):
+        super()._commit()
+        # A failed COMMIT leaves the transaction open until Django rolls it back
+        self._release_write_lock()
+
+    def _rollback(self):
+        try:
+            super()._rollback()
+        finally:
+            self._release_write_lock()
+
+    def _serialize_autocommit_write(self, execute, sql, params, many, context):
+        if self.in_atomic_block or self.holds_write_lock or not self.get_autocommit() \
+                or not sql.lstrip()[:7].upper().startswith(WRITE_STATEMENTS):
+            return execute(sql, params, many, context)
+        self._acquire_write_lock()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self._release_write_lock()
@@ -0,0 +1,58 @@
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+"""
+Module: write_queue.py
+Description: Process-wide FIFO lock that serializes SQLite writers.
+
+SQLite allows one writer per database file. Left alone, threads race for the
+file lock and the losers spin in busy_timeout (or fail with "database is
+locked" when a deferred transaction tries to upgrade). Queueing writers in
+the process hands the lock over in arrival order instead, so only writers
+from other processes ever contend in SQLite itself.
+"""
+
+
+class WriteQueue:
+    """FIFO write lock for one database file, shared by every thread in the process"""
+
+    _queues: Dict[str, 'WriteQueue'] = {}
+    _queues_lock = threading.Lock()
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._held = False
+        self._waiters = deque()
+
+    @classmethod
+    def for_database(cls, name: str) -> 'WriteQueue':
+        queue = cls._queues.get(name)
+        if queue is None:
+            with cls._queues_lock:
+                queue = cls._queues.setdefault(name, cls())
+        return queue
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the lock in arrival order; False when ``timeout`` seconds pass first"""
+        with self._lock:
+            if not self._held and not self._waiters:
+                self._held = True
+                return True
+            turn = threading.Event()
+            self._waiters.append(turn)
+        if turn.wait(timeout):
+            return True
+        with self._lock:
+            if turn.is_set():  # Handed over while timing out
+                return True
+            self._waiters.remove(turn)
+            return False
+
+    def release(self) -> None:
+        """Hand the lock to the longest waiting writer, if any"""
+        with self._lock:
+            if self._waiters:
+                self._waiters.popleft().set()
+            else:
+                self._held = False
@@ -0,0 +1,192 @@
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, List, Dict
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.utils.module_loading import import_string
+
+"""
+Module: routing.py
+Description: Read-replica routing with read-your-writes stickiness.
+
+ReadService DAOs ask choose_read_database() for an alias; WriteService and
+every other write goes to the primary through ReplicaRouter.db_for_write.
+Once a write commits, record_write() pins the current request (and, via
+ReplicaStickinessMiddleware, the client) to the primary for
+REPLICA_STICKY_SECONDS. Dao writes record themselves; ReplicaRouter records
+the saves, deletes and many-to-many changes that bypass the DAO. Asking
+for a write alias, as cache invalidation does, pins nothing.
+
+Settings:
+    REPLICA_DATABASES: aliases of the read replicas (default: none)
+    REPLICA_SELECTOR: 'round_robin' or 'least_outstanding', or a dotted path
+    REPLICA_STICKY_SECONDS: how long reads stay on the primary after a write
+"""
+
+
+class RoutingState:
+    """Mutable per-request routing state, shared with any threads the request hops into"""
+
+    def __init__(self, pinned_until: float = 0.0):
+        self.pinned_until = pinned_until
+
+
+_state: ContextVar[Optional[RoutingState]] = ContextVar('routing_state', default=None)
+
+
+def primary_database() -> str:
+    return DEFAULT_DB_ALIAS
+
+
+def replica_databases() -> List[str]:
+    return list(getattr(settings, 'REPLICA_DATABASES', []))
+
+
+def sticky_seconds() -> float:
+    return getattr(settings, 'REPLICA_STICKY_SECONDS', 5)
+
+
+def current_state() -> RoutingState:
+    state = _state.get()
+    if state is None:
+        state = RoutingState()
+        _state.set(state)
+    return state
+
+
+@contextmanager
+def routing_scope(pinned_until: float = 0.0):
+    """Fresh routing state for the duration of the block (normally one request)"""
+    token = _state.set(RoutingState(pinned_until))
+    try:
+        yield _state.get()
+    finally:
+        _state.reset(token)
+
+
+def pin_primary(seconds: Optional[float] = None) -> None:
+    """Send reads of the current request/context to the primary for ``seconds``"""
+    state = current_state()
+    state.pinned_until = max(state.pinned_until, time.time() + (sticky_seconds() if seconds is None else seconds))
+
+
+def record_write(using: Optional[str] = None) -> None:
+    """Pin the current request to the primary once the write on ``using`` commits (now, outside a transaction)"""
+    if replica_databases():
+        transaction.on_commit(pin_primary, using=using or primary_database())
+
+
+def is_pinned() -> bool:
+    return current_state().pinned_until > time.time()
+
+
+class RoundRobinSelector:
+    def __init__(self, aliases: List[str]):
+        self._cycle = itertools.cycle(aliases)
+        self._lock = threading.Lock()
+
+    def choose(self) -> str:
+        with self._lock:
+            return next(self._cycle)
+
+
+class LeastOutstandingSelector:
+    """Picks the replica with the fewest queries in flight, counted by a connection execute wrapper"""
+
+    def __init__(self, aliases: List[str]):
+        self.aliases = aliases
+        self.outstanding: Dict[str, int] = {alias: 0 for alias in aliases}
+        self._lock = threading.Lock()
+        connection_created.connect(self._install_wrapper, weak=False, dispatch_uid='least-outstanding-selector')
+        for connection in connections.all(initialized_only=True):
+            self._install_wrapper(sender=type(connection), connection=connection)
+
+    def choose(self) -> str:
+        with self._lock:
+            return min(self.aliases, key=self.outstanding.__getitem__)
+
+    def _install_wrapper(self, sender, connection, **kwargs):
+        if connection.alias in self.outstanding and self._count not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self._count)
+
+    def _count(self, execute, sql, params, many, context):
+        alias = context['connection'].alias
+        with self._lock:
+            self.outstanding[alias] += 1
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            with self._lock:
+                self.outstanding[alias] -= 1
+
+
+SELECTORS = {
+    'round_robin': RoundRobinSelector,
+    'least_outstanding': LeastOutstandingSelector,
+}
+
+_selector = None
+_selector_lock = threading.Lock()
+
+
+def get_selector():
+    global _selector
+    if _selector is None:
+        with _selector_lock:
+            if _selector is None:
+                name = getattr(settings, 'REPLICA_SELECTOR', 'round_robin')
+                selector_cls = SELECTORS[name] if name in SELECTORS else import_string(name)
+                _selector = selector_cls(replica_databases())
+    return _selector
+
+
+def choose_read_database() -> str:
+    """
+    Alias for a ReadService read: a replica, unless none are configured, the
+    request is pinned after a write, or a transaction is open on the primary.
+    """
+    primary = primary_database()
+    if not replica_databases() or is_pinned() or connections[primary].in_atomic_block:
+        return primary
+    return get_selector().choose()
+
+
+def _on_write(sender, using, **kwargs):
+    record_write(using)
+
+
+def _on_m2m_write(sender, action, using, **kwargs):
+    if action.startswith('post_'):
+        record_write(using)
+
+
+class ReplicaRouter:
+    """
+    Database router: every write goes to the primary, and committed saves and
+    deletes pin subsequent reads to it. Reads outside ReadService stay on the
+    primary while pinned, otherwise Django's default applies.
+    """
+
+    def __init__(self):
+        post_save.connect(_on_write, weak=False, dispatch_uid='replica-router-write')
+        post_delete.connect(_on_write, weak=False, dispatch_uid='replica-router-write')
+        m2m_changed.connect(_on_m2m_write, weak=False, dispatch_uid='replica-router-write')
+
+    def db_for_read(self, model, **hints):
+        if is_pinned():
+            return primary_database()
+        return None
+
+    def db_for_write(self, model, **hints):
+        return primary_database()
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {primary_database(), *replica_databases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
@@ -0,0 +1,3 @@
+from .conditional import Conditional
+from .response_cache import ResponseCache, cache_response
+from .schema import SchemaView, load_schema
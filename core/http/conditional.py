@@ -0,0 +1,74 @@
+import datetime
+from typing import Any, Optional
+from django.http import HttpRequest, HttpResponseBase
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from core.dao import Version
+
+"""
+Module: conditional.py
+Description: Conditional GET (ETag / Last-Modified) for service-backed views.
+
+Views ask the read service for a Version (one aggregate query for a list,
+one indexed column read for a detail row) before touching the page, answer
+304 Not Modified when the client's validators still match, and otherwise
+stamp the validators on the full response:
+
+    conditional = Conditional.for_list(request, service.version(filter_kwargs))
+    not_modified = conditional.not_modified(request)
+    if not_modified is not None:
+        return not_modified
+    ...
+    return conditional.apply(Response(data))
+
+List ETags cover the path, the query string (cursor, limit, ...) and the
+Accept header. Lists carry no Last-Modified: a newest timestamp cannot
+reveal rows that left the set, which the ETag's row count does.
+"""
+
+
+class Conditional:
+    """Validators of one GET response"""
+
+    def __init__(self, etag: Optional[str] = None, last_modified: Optional[datetime.datetime] = None):
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @staticmethod
+    def _scope(request: HttpRequest, *scope: Any) -> tuple:
+        return (request.get_full_path(), request.META.get('HTTP_ACCEPT', '')) + scope
+
+    @classmethod
+    def for_list(cls, request: HttpRequest, version: Optional[Version], *scope: Any) -> 'Conditional':
+        """``scope`` adds anything else the representation depends on"""
+        if version is None:
+            return cls()
+        return cls(etag=version.etag(*cls._scope(request, *scope)))
+
+    @classmethod
+    def for_object(cls, request: HttpRequest, version: Optional[Version], *scope: Any) -> 'Conditional':
+        if version is None:
+            return cls()
+        return cls(etag=version.etag(*cls._scope(request, *scope)), last_modified=version.last_modified)
+
+    @property
+    def timestamp(self) -> Optional[int]:
+        return int(self.last_modified.timestamp()) if self.last_modified else None
+
+    def not_modified(self, request: HttpRequest) -> Optional[HttpResponseBase]:
+        """304 (or 412 for a failed If-Match) when the request's preconditions say so, else None"""
+        if request.method not in ('GET', 'HEAD') or (self.etag is None and self.last_modified is None):
+            return None
+        response = get_conditional_response(request, etag=self.etag, last_modified=self.timestamp)
+        return self.apply(response) if response is not None else None
+
+    def apply(self, response: HttpResponseBase) -> HttpResponseBase:
+        """Stamp the validators on ``response`` and make clients revalidate before reuse"""
+        if response.status_code not in (200, 304) or (self.etag is None and self.last_modified is None):
+            return response
+        if self.etag is not None:
+            response['ETag'] = self.etag
+        if self.last_modified is not None:
+            response['Last-Modified'] = http_date(self.timestamp)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
@@ -0,0 +1,23 @@
+from drf_spectacular.openapi import AutoSchema as SpectacularAutoSchema
+
+"""
+Module: openapi.py
+Description: drf_spectacular AutoSchema with per-view operationIds.
+
+drf_spectacular cannot tell a plain APIView listing objects from one that
+retrieves a single object, so both get '<path>_retrieve' ids and collide.
+Views name their operations instead:
+
+    class UsersListAPIView(APIView):
+        schema_operation_ids = {'get': 'auth_users_list'}
+
+Referenced from REST_FRAMEWORK['DEFAULT_SCHEMA_CLASS'], which DRF imports
+only when a schema is generated.
+"""
+
+
+class AutoSchema(SpectacularAutoSchema):
+
+    def get_operation_id(self) -> str:
+        operation_ids = getattr(self.view, 'schema_operation_ids', {})
+        return operation_ids.get(self.method.lower()) or super().get_operation_id()
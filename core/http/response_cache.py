@@ -0,0 +1,160 @@
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional, Type
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Model
+from django.http import HttpRequest, HttpResponseBase
+from django.utils.cache import get_cache_key, get_conditional_response, learn_cache_key
+from django.utils.http import parse_http_date_safe
+from core.dao import get_generations
+from core.dao.generations import watch
+
+"""
+Module: response_cache.py
+Description: Per-user full-response cache for expensive read views.
+
+    urlpatterns = [
+        path('users/', cache_response(User)(UsersListAPIView.as_view()), name='users'),
+    ]
+
+Entries are keyed like Django's cache_page (absolute URI with query string,
+the request headers the response Varies on) plus the caller's identity: the
+session user and a digest of the Authorization header, so one user never
+sees another's response. Each entry records the data generation (see
+core.dao.generations) of every model it was built from, read *before* the
+view runs; a hit needs the recorded generations to still be current. Dao
+writes bump their model's generation, which retires every dependent entry
+at once without finding or deleting them.
+
+Only 200 GET responses are stored, and not streaming ones, ones setting
+cookies or marked no-store. HEAD is answered from the GET entry, and a hit
+whose cached ETag / Last-Modified match the request's preconditions is
+answered 304 without running the view.
+
+Settings: RESPONSE_CACHE_ALIAS (default 'default') and RESPONSE_CACHE_TIMEOUT
+(seconds, default 300). Hit ratios are in ResponseCache.all_stats().
+"""
+
+
+class ResponseCache:
+    """Cache of one view's responses, with hit/miss counters"""
+
+    _registry: Dict[str, 'ResponseCache'] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, name: str, models: Iterable[Type[Model]] = (), timeout: Optional[float] = None,
+                 alias: Optional[str] = None):
+        self.name = name
+        self.models = tuple(models)
+        self.timeout = timeout if timeout is not None else getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300)
+        self.alias = alias or getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        for model in self.models:
+            watch(model)
+        with self._registry_lock:
+            self._registry[name] = self
+
+    @classmethod
+    def registered(cls, name: str) -> Optional['ResponseCache']:
+        return cls._registry.get(name)
+
+    @classmethod
+    def all_stats(cls) -> Dict[str, Dict[str, Any]]:
+        return {name: cache.stats() for name, cache in cls._registry.items()}
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'stores': self.stores,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+        }
+
+    def reset_stats(self) -> None:
+        self.hits = self.misses = self.stores = 0
+
+    def __call__(self, view: Callable) -> Callable:
+        if iscoroutinefunction(view):
+            async def cached_view(request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return await view(request, *args, **kwargs)
+                generations, response = await sync_to_async(self.lookup)(request)
+                if response is not None:
+                    return response
+                return await sync_to_async(self.store)(request, await view(request, *args, **kwargs), generations)
+            markcoroutinefunction(cached_view)
+        else:
+            def cached_view(request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return view(request, *args, **kwargs)
+                generations, response = self.lookup(request)
+                if response is not None:
+                    return response
+                return self.store(request, view(request, *args, **kwargs), generations)
+
+        # Keep what as_view() put on the function (csrf_exempt, view_class, ...)
+        cached_view.__dict__.update(view.__dict__)
+        cached_view.__name__ = getattr(view, '__name__', self.name)
+        cached_view.__doc__ = view.__doc__
+        cached_view.response_cache = self
+        return cached_view
+
+    def key_prefix(self, request: HttpRequest) -> str:
+        user = getattr(request, 'user', None)
+        identity = f"{user.pk if user is not None and user.is_authenticated else 'anon'}:" \
+                   f"{request.META.get('HTTP_AUTHORIZATION', '')}"
+        return f'response:{self.name}:{hashlib.sha256(identity.encode()).hexdigest()[:32]}'
+
+    def lookup(self, request: HttpRequest) -> tuple:
+        """(current generations, cached response or None)"""
+        generations = get_generations(self.models) if self.models else {}
+        key = get_cache_key(request, self.key_prefix(request), 'GET', self.cache)
+        entry = self.cache.get(key) if key else None
+        if entry is None or entry['models'] != generations:
+            self.misses += 1
+            return generations, None
+        self.hits += 1
+        response = entry['response']
+        not_modified = get_conditional_response(
+            request, etag=response.get('ETag'), last_modified=parse_http_date_safe(response.get('Last-Modified', '')),
+            response=response)
+        return generations, not_modified if not_modified is not None else response
+
+    def store(self, request: HttpRequest, response: HttpResponseBase, generations: Dict[str, int]) -> HttpResponseBase:
+        """Cache ``response`` against ``generations`` once rendered, when it is cacheable"""
+        if request.method != 'GET' or response.status_code != 200 or response.streaming or response.cookies \
+                or 'no-store' in response.get('Cache-Control', ''):
+            return response
+
+        def save(rendered: HttpResponseBase) -> None:
+            key = learn_cache_key(request, rendered, self.timeout, self.key_prefix(request), self.cache)
+            self.cache.set(key, {'models': generations, 'response': rendered}, self.timeout)
+            self.stores += 1
+
+        if callable(getattr(response, 'render', None)) and not response.is_rendered:
+            response.add_post_render_callback(save)
+        else:
+            save(response)
+        return response
+
+
+def cache_response(*models: Type[Model], name: Optional[str] = None, timeout: Optional[float] = None,
+                   alias: Optional[str] = None) -> Callable[[Callable], Callable]:
+    """
+    Decorate a view function (e.g. ``SomeAPIView.as_view()``) with a ResponseCache
+    invalidated by writes to ``models``; ``name`` defaults to the view class name.
+    """
+    def decorator(view: Callable) -> Callable:
+        view_class = getattr(view, 'view_class', None)
+        cache_name = name or (view_class.__name__ if view_class is not None else view.__qualname__)
+        return ResponseCache(cache_name, models, timeout=timeout, alias=alias)(view)
+    return decorator
@@ -0,0 +1,121 @@
+import gzip
+import hashlib
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse, HttpResponseBase
+from django.middleware.gzip import re_accepts_gzip
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.views import View
+
+"""
+Module: schema.py
+Description: OpenAPI schema served from precomputed files.
+
+Generating the schema walks every view and serializer, so it is done once:
+
+    python manage.py schema_export      # at build / deploy time
+
+writes openapi-<SPECTACULAR_SETTINGS['VERSION']>.json and .yaml, each with a
+gzipped twin, to SCHEMA_DIR. SchemaView reads the current version's files
+once per process and serves them with a strong ETag (304 on If-None-Match)
+and, when the client accepts it, the gzipped bytes. Without files for the
+current version the schema is generated on first request and memoized for
+the process lifetime. drf_spectacular is only imported to generate, so a
+process serving exported files never loads it.
+
+The format is YAML, like SpectacularAPIView, unless ?format=json or an Accept
+header asking for JSON selects JSON.
+"""
+
+FORMATS = {
+    'json': 'application/vnd.oai.openapi+json',
+    'yaml': 'application/vnd.oai.openapi',
+}
+
+
+@dataclass(frozen=True)
+class SchemaDocument:
+    content: bytes
+    gzipped: bytes
+    etag: str
+    content_type: str
+
+    @classmethod
+    def build(cls, fmt: str, content: bytes, gzipped: Optional[bytes] = None) -> 'SchemaDocument':
+        return cls(content=content, gzipped=gzipped if gzipped is not None else compress(content),
+                   etag=f'"{hashlib.sha256(content).hexdigest()[:32]}"', content_type=FORMATS[fmt])
+
+
+def compress(content: bytes) -> bytes:
+    # mtime=0 keeps the output byte-identical across builds
+    return gzip.compress(content, compresslevel=9, mtime=0)
+
+
+def schema_version() -> str:
+    return str(getattr(settings, 'SPECTACULAR_SETTINGS', {}).get('VERSION', '') or 'unversioned')
+
+
+def schema_path(fmt: str, directory: Optional[Path] = None) -> Path:
+    return Path(directory or settings.SCHEMA_DIR) / f'openapi-{schema_version()}.{fmt}'
+
+
+def render_schema() -> Dict[str, bytes]:
+    """Generate the public schema and render it in every format (imports drf_spectacular)"""
+    from drf_spectacular.generators import SchemaGenerator
+    from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+    import core.auth.schema  # noqa: F401 (registers the authentication extensions)
+
+    schema = SchemaGenerator().get_schema(request=None, public=True)
+    return {
+        'json': OpenApiJsonRenderer().render(schema, renderer_context={}),
+        'yaml': OpenApiYamlRenderer().render(schema, renderer_context={}),
+    }
+
+
+_documents: Dict[str, SchemaDocument] = {}
+_documents_lock = threading.Lock()
+
+
+def load_schema(fmt: str) -> SchemaDocument:
+    """The current version's document from SCHEMA_DIR, else generated; memoized per process"""
+    document = _documents.get(fmt)
+    if document is not None:
+        return document
+    with _documents_lock:
+        if fmt not in _documents:
+            path = schema_path(fmt)
+            if path.is_file():
+                gzipped_path = path.with_name(f'{path.name}.gz')
+                _documents[fmt] = SchemaDocument.build(
+                    fmt, path.read_bytes(), gzipped_path.read_bytes() if gzipped_path.is_file() else None)
+            else:
+                _documents.update({name: SchemaDocument.build(name, content)
+                                   for name, content in render_schema().items()})
+        return _documents[fmt]
+
+
+class SchemaView(View):
+    """Serves the OpenAPI schema, see the module docstring"""
+
+    def get(self, request: HttpRequest) -> HttpResponseBase:
+        fmt = request.GET.get('format')
+        if fmt not in FORMATS:
+            fmt = 'json' if 'json' in request.META.get('HTTP_ACCEPT', '') else 'yaml'
+        document = load_schema(fmt)
+        gzipped = bool(re_accepts_gzip.search(request.META.get('HTTP_ACCEPT_ENCODING', '')))
+        # Strong validators name one exact byte sequence, so each encoding gets its own
+        etag = f'{document.etag[:-1]}-gzip"' if gzipped else document.etag
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(document.gzipped if gzipped else document.content,
+                                    content_type=document.content_type)
+            if gzipped:
+                response['Content-Encoding'] = 'gzip'
+        response['ETag'] = etag
+        patch_vary_headers(response, ('Accept', 'Accept-Encoding'))
+        patch_cache_control(response, public=True, no_cache=True)
+        return response
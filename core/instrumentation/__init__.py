@@ -0,0 +1 @@
+from .profiler import RequestProfile, current_profile, profile_scope, instrument_methods, install_query_counter
@@ -0,0 +1,178 @@
+import functools
+import inspect
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Dict, List, Tuple, Any
+from django.db.models import Model
+
+"""
+Module: profiler.py
+Description: Per-request instrumentation of Dao / Service methods and SQL.
+
+Every public Dao and Service method is wrapped (see instrument_methods) to
+record wall time, SQL queries issued and rows returned under a
+``<dao|service>.<app.model>.<method>`` label. A permanent connection execute
+wrapper counts queries and groups them by SQL shape so repeated shapes (N+1
+patterns) can be flagged. Nothing is recorded outside a profile_scope, which
+QueryInstrumentationMiddleware opens per request.
+"""
+
+_profile: ContextVar[Optional['RequestProfile']] = ContextVar('request_profile', default=None)
+
+_IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def sql_shape(sql: str) -> str:
+    """SQL with parameter lists collapsed, so the same statement with different values matches"""
+    return _WHITESPACE.sub(' ', _IN_LIST.sub('IN (...)', sql)).strip()
+
+
+def count_rows(result: Any) -> int:
+    if result is None or isinstance(result, bool):
+        return 0
+    if isinstance(result, Model):
+        return 1
+    if isinstance(result, (list, tuple)) or hasattr(result, 'objects'):
+        return len(result)
+    # Lazy querysets are not evaluated just to count them
+    return 0
+
+
+class RequestProfile:
+    def __init__(self, n_plus_one_threshold: int = 10):
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.shapes: Counter = Counter()
+        # label -> [calls, seconds, queries, rows]
+        self.methods: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def record_query(self, sql: str, seconds: float) -> None:
+        shape = sql_shape(sql)
+        with self._lock:
+            self.queries += 1
+            self.sql_seconds += seconds
+            self.shapes[shape] += 1
+
+    def record_call(self, label: str, seconds: float, queries: int, rows: int) -> None:
+        with self._lock:
+            stats = self.methods.setdefault(label, [0, 0.0, 0, 0])
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] += queries
+            stats[3] += rows
+
+    def n_plus_one(self) -> List[Tuple[str, int]]:
+        """SQL shapes repeated more than the threshold, most frequent first"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > self.n_plus_one_threshold]
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'total_ms': (time.perf_counter() - self.started) * 1000,
+            'queries': self.queries,
+            'sql_ms': self.sql_seconds * 1000,
+            'methods': {label: {'calls': calls, 'ms': seconds * 1000, 'queries': queries, 'rows': rows}
+                        for label, (calls, seconds, queries, rows) in self.methods.items()},
+            'n_plus_one': [{'sql': shape, 'count': count} for shape, count in self.n_plus_one()],
+        }
+
+    def server_timing(self, limit: int = 10) -> str:
+        """Server-Timing header value: SQL totals plus the slowest instrumented methods"""
+        entries = [f'sql;dur={self.sql_seconds * 1000:.2f};desc="{self.queries} queries"']
+        slowest = sorted(self.methods.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+        for label, (calls, seconds, queries, rows) in slowest:
+            entries.append(f'{label};dur={seconds * 1000:.2f};desc="{calls} calls, {queries} queries, {rows} rows"')
+        repeated = self.n_plus_one()
+        if repeated:
+            entries.append(f'n-plus-one;desc="{len(repeated)} repeated shapes, max {repeated[0][1]}x"')
+        entries.append(f'total;dur={(time.perf_counter() - self.started) * 1000:.2f}')
+        return ', '.join(entries)
+
+
+def current_profile() -> Optional[RequestProfile]:
+    return _profile.get()
+
+
+@contextmanager
+def profile_scope(n_plus_one_threshold: int = 10):
+    token = _profile.set(RequestProfile(n_plus_one_threshold))
+    try:
+        yield _profile.get()
+    finally:
+        _profile.reset(token)
+
+
+def query_counter(execute, sql, params, many, context):
+    """Connection execute wrapper feeding the current profile, a no-op outside a scope"""
+    profile = _profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.record_query(sql, time.perf_counter() - started)
+
+
+def install_query_counter(sender, connection, **kwargs) -> None:
+    """connection_created receiver installing query_counter on every new connection"""
+    if query_counter not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_counter)
+
+
+def _label(kind: str, obj: Any, name: str) -> str:
+    dao = obj if kind == 'dao' else getattr(obj, 'dao', None)
+    model = getattr(dao, 'model', None)
+    model_label = model._meta.label_lower if model is not None else type(obj).__name__
+    return f'{kind}.{model_label}.{name}'
+
+
+def _instrument(kind: str, name: str, func):
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(self, *args, **kwargs):
+            profile = _profile.get()
+            if profile is None:
+                return await func(self, *args, **kwargs)
+            queries, started = profile.queries, time.perf_counter()
+            result = await func(self, *args, **kwargs)
+            profile.record_call(_label(kind, self, name), time.perf_counter() - started,
+                                profile.queries - queries, count_rows(result))
+            return result
+        async_wrapper.__instrumented__ = True
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        profile = _profile.get()
+        if profile is None:
+            return func(self, *args, **kwargs)
+        queries, started = profile.queries, time.perf_counter()
+        result = func(self, *args, **kwargs)
+        profile.record_call(_label(kind, self, name), time.perf_counter() - started,
+                            profile.queries - queries, count_rows(result))
+        return result
+    wrapper.__instrumented__ = True
+    return wrapper
+
+
+def instrument_methods(cls: type, kind: str) -> None:
+    """
+    Wrap the public methods defined on ``cls`` for profiling. Generators are
+    left alone since their work happens after the call returns.
+    """
+    for name, attr in list(vars(cls).items()):
+        if name.startswith('_') or not inspect.isfunction(attr) or getattr(attr, '__instrumented__', False):
+            continue
+        if inspect.isgeneratorfunction(attr) or inspect.isasyncgenfunction(attr):
+            continue
+        if getattr(attr, '__isabstractmethod__', False):
+            continue
+        setattr(cls, name, _instrument(kind, name, attr))
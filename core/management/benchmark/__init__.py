@@ -0,0 +1,154 @@
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from argparse import ArgumentParser
+from typing import Callable, Dict, List, Optional
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+"""
+Module: benchmark
+Description: Shared helpers for the bench management command: a throwaway
+database, user seeding and latency summaries, plus the base class of its
+suites. Each module of this package holds one suite, run as
+
+    python manage.py bench <suite> [options]
+"""
+
+
+class BenchmarkSuite:
+    """
+    One focused benchmark of ``manage.py bench``: ``name`` is its subcommand,
+    ``add_arguments`` declares its options and ``handle`` prints its table.
+    """
+    name: str = ''
+    help: str = ''
+
+    def __init__(self, command: BaseCommand):
+        self.stdout, self.stderr, self.style = command.stdout, command.stderr, command.style
+
+    @classmethod
+    def add_arguments(cls, parser: ArgumentParser) -> None:
+        pass
+
+    def handle(self, **kwargs) -> None:
+        raise NotImplementedError
+
+
+@contextmanager
+def throwaway_database(verbosity: int = 0):
+    """
+    Create a fresh test database for the duration of the block.
+    Tables are built straight from the current models, skipping migrations.
+    """
+    old_name = connection.settings_dict['NAME']
+    with override_settings(MIGRATION_MODULES={config.label: None for config in apps.get_app_configs()}):
+        connection.creation.create_test_db(verbosity=verbosity, autoclobber=True, serialize=False)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+
+
+@contextmanager
+def file_database(alias: str, engine: str, models: List[type], **settings_dict):
+    """
+    Register ``alias`` as an on-disk database in a temporary directory, with
+    tables for ``models``, for benchmarks that need a real file (WAL, locking).
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        connections.settings[alias] = connections.configure_settings({
+            'default': connections.settings['default'],
+            alias: {'ENGINE': engine, 'NAME': os.path.join(directory, f'{alias}.sqlite3'), **settings_dict},
+        })[alias]
+        try:
+            with connections[alias].schema_editor() as editor:
+                for model in models:
+                    editor.create_model(model)
+            yield connections[alias]
+        finally:
+            connections[alias].close()
+            del connections.settings[alias]
+
+
+@contextmanager
+def test_environment():
+    """Test-client friendly settings (ALLOWED_HOSTS, locmem email) for request benchmarks"""
+    setup_test_environment()
+    try:
+        yield
+    finally:
+        teardown_test_environment()
+
+
+def seed_users(count: int, batch_size: int = 5000, password: str = 'bench-password') -> None:
+    """Insert ``count`` users sharing one pre-computed password hash"""
+    user_model = get_user_model()
+    hashed = make_password(password)
+    now = timezone.now()
+    for start in range(0, count, batch_size):
+        user_model.objects.bulk_create([
+            user_model(email=f'user{i:08d}@bench.local', first_name='Bench', last_name=str(i),
+                       password=hashed, last_pass_change=now)
+            for i in range(start, min(start + batch_size, count))
+        ], batch_size=batch_size)
+
+
+def measure(fn: Callable, repeat: int, warmup: int = 1, setup: Optional[Callable[[], object]] = None) -> List[float]:
+    """
+    Call ``fn`` ``repeat`` times and return each duration in seconds. With
+    ``setup``, its (untimed) result is passed to ``fn`` on every call.
+    """
+    def run():
+        if setup is None:
+            started = time.perf_counter()
+            fn()
+        else:
+            arg = setup()
+            started = time.perf_counter()
+            fn(arg)
+        return time.perf_counter() - started
+
+    for _ in range(warmup):
+        run()
+    return [run() for _ in range(repeat)]
+
+
+def peak_memory(fn: Callable, setup: Optional[Callable[[], object]] = None) -> int:
+    """Peak bytes allocated by Python during one call of ``fn``"""
+    arg = setup() if setup is not None else None
+    tracemalloc.start()
+    try:
+        if setup is not None:
+            fn(arg)
+        else:
+            fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Latency percentiles in milliseconds plus throughput"""
+    mean = statistics.fmean(samples)
+    return {
+        'p50_ms': percentile(samples, 50) * 1000,
+        'p95_ms': percentile(samples, 95) * 1000,
+        'p99_ms': percentile(samples, 99) * 1000,
+        'mean_ms': mean * 1000,
+        'ops_per_sec': 1 / mean if mean else 0.0,
+    }
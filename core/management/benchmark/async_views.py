@@ -0,0 +1,92 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.db import connections
+from django.test import Client, AsyncClient
+from django.urls import reverse
+from apps.users.models import User
+from core.dao import bump_generation
+from core.management.benchmark import BenchmarkSuite, throwaway_database, seed_users, test_environment
+
+ENDPOINTS = {
+    # name: (sync url name, async url name, method, payload, response-cached model)
+    'users': ('users', 'users-async', 'get', {'limit': 50}, User),
+    'login': ('login', 'login-async', 'post', {'email': 'user00000001@bench.local', 'password': 'bench-password'},
+              None),
+}
+
+
+class AsyncViewsSuite(BenchmarkSuite):
+    name = 'async'
+    help = ('Compares requests/sec of the sync and async user endpoints under concurrency; response-cached '
+            'endpoints run cold (every request misses) and warm')
+
+    @classmethod
+    def add_arguments(cls, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Number of users to seed')
+        parser.add_argument('--requests', type=int, default=500, help='Requests per endpoint and stack')
+        parser.add_argument('--concurrency', type=int, default=16, help='Requests in flight')
+        parser.add_argument('--endpoint', choices=sorted(ENDPOINTS), action='append',
+                            help='Endpoint to run (repeatable, default: all)')
+
+    def handle(self, **kwargs):
+        total, concurrency = kwargs['requests'], kwargs['concurrency']
+        with test_environment(), throwaway_database():
+            seed_users(kwargs['rows'])
+            self.stdout.write(f"{'endpoint':>10} {'sync req/s':>12} {'async req/s':>12}")
+            for name in kwargs['endpoint'] or sorted(ENDPOINTS):
+                sync_name, async_name, method, payload, cached_model = ENDPOINTS[name]
+                if cached_model is None:
+                    variants = ((name, None),)
+                else:
+                    # Cold retires the cached responses before every request, as a write would
+                    variants = ((f'{name}:cold', lambda: bump_generation(cached_model)), (f'{name}:warm', None))
+                for label, before in variants:
+                    sync_rps = self.run_sync(reverse(sync_name), method, payload, total, concurrency, before)
+                    async_rps = asyncio.run(self.run_async(reverse(async_name), method, payload, total, concurrency,
+                                                           before))
+                    self.stdout.write(f'{label:>10} {sync_rps:>12.1f} {async_rps:>12.1f}')
+
+    @staticmethod
+    def request_kwargs(method, payload):
+        return {'data': payload} if method == 'get' else {'data': payload, 'content_type': 'application/json'}
+
+    def run_sync(self, url, method, payload, total, concurrency, before=None) -> float:
+        kwargs = self.request_kwargs(method, payload)
+
+        def call(_):
+            if before is not None:
+                before()
+            response = getattr(Client(), method)(url, **kwargs)
+            connections.close_all()
+            return response.status_code
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            statuses = list(pool.map(call, range(total)))
+        elapsed = time.perf_counter() - started
+        self.check_statuses(url, statuses)
+        return total / elapsed
+
+    async def run_async(self, url, method, payload, total, concurrency, before=None) -> float:
+        kwargs = self.request_kwargs(method, payload)
+        semaphore = asyncio.Semaphore(concurrency)
+        client = AsyncClient()
+
+        async def call():
+            async with semaphore:
+                if before is not None:
+                    before()
+                response = await getattr(client, method)(url, **kwargs)
+                return response.status_code
+
+        started = time.perf_counter()
+        statuses = await asyncio.gather(*(call() for _ in range(total)))
+        elapsed = time.perf_counter() - started
+        self.check_statuses(url, statuses)
+        return total / elapsed
+
+    def check_statuses(self, url, statuses):
+        failed = [code for code in statuses if code != 200]
+        if failed:
+            self.stdout.write(self.style.WARNING(f'{url}: {len(failed)} non-200 responses, e.g. {failed[0]}'))
@@ -0,0 +1,44 @@
+from django.db import connection
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from apps.users.services import AuthService
+from core.auth import CachedJWTAuthentication
+from core.auth.authentication import auth_user_cache
+from core.management.benchmark import BenchmarkSuite, throwaway_database, seed_users, measure, summarize
+
+
+class AuthSuite(BenchmarkSuite):
+    name = 'auth'
+    help = ("Authenticates JWT requests with simplejwt's JWTAuthentication and with CachedJWTAuthentication: "
+            "queries per request, latency and the user cache's hit ratio")
+
+    @classmethod
+    def add_arguments(cls, parser):
+        parser.add_argument('--users', type=int, default=100, help='Distinct users sending requests')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed passes over every user')
+
+    def handle(self, **kwargs):
+        factory = APIRequestFactory()
+        with throwaway_database():
+            seed_users(kwargs['users'])
+            service = AuthService()
+            requests = []
+            for index in range(kwargs['users']):
+                user = service.validate_user(f'user{index:08d}@bench.local', 'bench-password')
+                token = service.get_tokens_for_user(user)['access_token']
+                requests.append(factory.get('/', HTTP_AUTHORIZATION=f'Bearer {token}'))
+
+            self.stdout.write(f"{'backend':>26} {'queries/req':>12} {'p50 us/req':>11}")
+            for backend in (JWTAuthentication, CachedJWTAuthentication):
+                def run():
+                    for request in requests:
+                        backend().authenticate(request)
+
+                run()  # warm the cache, as a steady state would
+                queries = []
+                with connection.execute_wrapper(lambda execute, sql, *rest: queries.append(sql) or execute(sql, *rest)):
+                    run()
+                result = summarize(measure(run, kwargs['repeat']))
+                self.stdout.write(f"{backend.__name__:>26} {len(queries) / len(requests):>12.2f} "
+                                  f"{result['p50_ms'] * 1000 / len(requests):>11.1f}")
+            self.stdout.write(f"auth user cache: {auth_user_cache().stats()}")
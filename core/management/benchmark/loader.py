@@ -0,0 +1,85 @@
+from django.core.management.base import CommandError
+from django.db import connection
+from rest_framework import serializers
+from apps.users.dao import UserDAO
+from apps.users.services import UserReadService
+from core.dao import identity_map_scope
+from core.management.benchmark import BenchmarkSuite, throwaway_database, seed_users, measure, summarize
+from core.serializers.loaded import LoadedRelatedField
+from core.serializers.service_serializer import ServiceSerializer
+
+
+class AuthorSerializer(ServiceSerializer):
+    service_class = UserReadService
+
+    class Meta:
+        fields = ('id', 'email')
+
+
+class LoopSerializer(ServiceSerializer):
+    service_class = UserReadService
+
+    class Meta:
+        fields = ('id', 'email', 'created_by')
+
+    created_by = serializers.SerializerMethodField()
+
+    def get_created_by(self, obj):
+        author = self.service.get(obj.created_by_id)
+        return AuthorSerializer(author).data if author else None
+
+
+class LoadedSerializer(ServiceSerializer):
+    service_class = UserReadService
+
+    class Meta:
+        fields = ('id', 'email', 'created_by')
+
+    created_by = LoadedRelatedField(UserDAO, serializer=AuthorSerializer)
+
+
+class LoaderSuite(BenchmarkSuite):
+    name = 'loader'
+    help = ('Resolves the created_by author of every user one Dao.get at a time, with Dao.get_many, and '
+            'through serializers (per-row lookups vs LoadedRelatedField): queries and time')
+
+    @classmethod
+    def add_arguments(cls, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Users to render, each with a distinct author')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per variant')
+
+    def handle(self, **kwargs):
+        rows, repeat = kwargs['rows'], kwargs['repeat']
+        with throwaway_database():
+            seed_users(rows * 2)
+            dao = UserDAO()
+            users = dao.find_all_model_objs(order_bys=['email'])
+            readers, authors = users[:rows], users[rows:]
+            for reader, author in zip(readers, authors):
+                reader.created_by_id = author.pk
+            dao.update_batch(readers)
+            readers = dao.find_all_model_objs(filter_kwargs={'created_by__isnull': False}, order_bys=['email'])
+            author_ids = [reader.created_by_id for reader in readers]
+
+            variants = {
+                'Dao.get loop': lambda: [dao.get(pk) for pk in author_ids],
+                'Dao.get_many': lambda: dao.get_many(author_ids),
+                'serializer, get per row': lambda: LoopSerializer(readers, many=True).data,
+                'LoadedRelatedField': lambda: LoadedSerializer(readers, many=True).data,
+            }
+            if LoopSerializer(readers, many=True).data != LoadedSerializer(readers, many=True).data:
+                raise CommandError('LoadedRelatedField output differs from the per-row lookups')
+
+            self.stdout.write(f"{'variant':>24} {'queries':>8} {'p50 ms':>10}")
+            for name, fn in variants.items():
+                def run():
+                    # A cold object cache and a fresh request scope, as IdentityMapMiddleware opens
+                    dao.object_cache.clear()
+                    with identity_map_scope():
+                        return fn()
+
+                queries = []
+                with connection.execute_wrapper(lambda execute, sql, *rest: queries.append(sql) or execute(sql, *rest)):
+                    run()
+                result = summarize(measure(run, repeat))
+                self.stdout.write(f"{name:>24} {len(queries):>8} {result['p50_ms']:>10.1f}")
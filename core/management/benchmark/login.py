@@ -0,0 +1,96 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional
+from asgiref.sync import sync_to_async
+from django.contrib.auth.hashers import check_password
+from django.core.management.base import CommandError
+from apps.users.models import User
+from apps.users.services import AuthService, UserReadService
+from core.management.benchmark import BenchmarkSuite, throwaway_database, seed_users, percentile
+
+PASSWORD = 'bench-password'
+
+
+def legacy_validate_user(email: str, password: str) -> Optional[User]:
+    """The previous AuthService.validate_user: full row, hash checked inline"""
+    user = AuthService().dao.find_one({'email': email})
+    if user and check_password(password, user.password):
+        return user
+    return None
+
+
+class LoginSuite(BenchmarkSuite):
+    name = 'login'
+    help = ('Async login throughput and p99 at increasing concurrency, with list reads running alongside: '
+            'the previous validate_user (full row, hashing on the sync_to_async thread) against the login '
+            'pipeline (projected lookup, hashing pool)')
+
+    @classmethod
+    def add_arguments(cls, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Number of users to seed')
+        parser.add_argument('--logins', type=int, default=24, help='Logins per run')
+        parser.add_argument('--concurrency', type=int, action='append',
+                            help='Logins in flight (repeatable, default: 1, 4, 16)')
+        parser.add_argument('--read-rate', type=float, default=20, help='List reads per second offered alongside')
+        parser.add_argument('--p99-ms', type=float, default=2000, help='Login p99 budget for the summary')
+
+    def handle(self, **kwargs):
+        service = AuthService()
+        variants = {
+            'legacy': lambda email: sync_to_async(legacy_validate_user)(email, PASSWORD),
+            'pipeline': lambda email: service.avalidate_user(email, PASSWORD),
+        }
+        levels = kwargs['concurrency'] or [1, 4, 16]
+        with throwaway_database():
+            seed_users(kwargs['rows'])
+            self.stdout.write(f"{'variant':>10} {'in flight':>10} {'logins/s':>10} {'login p99 ms':>13} "
+                              f"{'reads/s':>9} {'read p99 ms':>12}")
+            best = {}
+            for name, login in variants.items():
+                for concurrency in levels:
+                    result = asyncio.run(self.run(login, kwargs['logins'], concurrency, kwargs['rows'],
+                                                  kwargs['read_rate']))
+                    self.stdout.write(f"{name:>10} {concurrency:>10} {result['logins_per_sec']:>10.2f} "
+                                      f"{result['login_p99_ms']:>13.0f} {result['reads_per_sec']:>9.0f} "
+                                      f"{result['read_p99_ms']:>12.1f}")
+                    if result['login_p99_ms'] <= kwargs['p99_ms']:
+                        best[name] = max(best.get(name, 0.0), result['logins_per_sec'])
+            for name in variants:
+                self.stdout.write(f"{name}: {best.get(name, 0.0):.2f} logins/s within a "
+                                  f"{kwargs['p99_ms']:g} ms p99")
+
+    @staticmethod
+    async def run(login: Callable[[str], Awaitable[Optional[User]]], total: int, concurrency: int,
+                  rows: int, read_rate: float) -> dict:
+        semaphore = asyncio.Semaphore(concurrency)
+        login_latencies, read_latencies = [], []
+        reader = UserReadService()
+        done = asyncio.Event()
+
+        async def one(index: int):
+            async with semaphore:
+                started = time.perf_counter()
+                if await login(f'user{index % rows:08d}@bench.local') is None:
+                    raise CommandError('Login failed')
+                login_latencies.append(time.perf_counter() - started)
+
+        async def reads():
+            # Another view's traffic: page reads at a fixed rate while the logins run
+            while not done.is_set():
+                started = time.perf_counter()
+                await reader.aget_users_page(limit=20)
+                read_latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(max(0.0, 1 / read_rate - (time.perf_counter() - started)))
+
+        read_task = asyncio.create_task(reads())
+        started = time.perf_counter()
+        await asyncio.gather(*(one(index) for index in range(total)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await read_task
+        return {
+            'logins_per_sec': total / elapsed,
+            'login_p99_ms': percentile(login_latencies, 99) * 1000,
+            'reads_per_sec': len(read_latencies) / elapsed,
+            'read_p99_ms': percentile(read_latencies, 99) * 1000,
+        }
@@ -0,0 +1,41 @@
+from apps.users.dao import UserDAO
+from apps.users.services import UserReadService
+from core.dao.pagination import resolve_ordering, encode_cursor
+from core.management.benchmark import BenchmarkSuite, throwaway_database, seed_users, measure, summarize
+
+
+class PaginationSuite(BenchmarkSuite):
+    name = 'pagination'
+    help = 'Compares keyset (cursor) pagination against OFFSET pagination at increasing page depths'
+
+    @classmethod
+    def add_arguments(cls, parser):
+        parser.add_argument('--rows', type=int, default=200000, help='Number of users to seed')
+        parser.add_argument('--limit', type=int, default=20, help='Page size')
+        parser.add_argument('--pages', type=str, default='1,100,1000,10000', help='Comma separated page numbers')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed runs per page')
+
+    def handle(self, **kwargs):
+        limit, repeat = kwargs['limit'], kwargs['repeat']
+        pages = [int(page) for page in kwargs['pages'].split(',')]
+        order_bys = UserReadService.LIST_ORDERING
+
+        with throwaway_database():
+            self.stdout.write(f"Seeding {kwargs['rows']} users ...")
+            seed_users(kwargs['rows'])
+            dao = UserDAO()
+            keys = resolve_ordering(dao.model, order_bys)
+            qs = dao.find_queryset(order_bys=[name if not desc else f'-{name}' for name, desc in keys])
+
+            self.stdout.write(f"{'page':>8} {'keyset p50 ms':>15} {'offset p50 ms':>15}")
+            for page in pages:
+                offset = (page - 1) * limit
+                if offset >= kwargs['rows']:
+                    self.stdout.write(self.style.WARNING(f'{page:>8} skipped: beyond seeded rows'))
+                    continue
+                cursor = encode_cursor(qs[offset - 1], keys) if offset else None
+
+                keyset = summarize(measure(lambda: dao.find_page(order_bys=order_bys, after=cursor, limit=limit),
+                                           repeat))
+                offset_based = summarize(measure(lambda: list(qs[offset:offset + limit]), repeat))
+                self.stdout.write(f"{page:>8} {keyset['p50_ms']:>15.3f} {offset_based['p50_ms']:>15.3f}")
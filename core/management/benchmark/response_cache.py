@@ -0,0 +1,53 @@
+import random
+from django.core.cache import caches
+from django.test import Client
+from django.urls import reverse
+from apps.users.dao import UserDAO
+from apps.users.services import UserWriteService
+from core.http import ResponseCache
+from core.management.benchmark import BenchmarkSuite, throwaway_database, seed_users, test_environment, measure, summarize
+
+
+class ResponseCacheSuite(BenchmarkSuite):
+    name = 'response-cache'
+    help = ('Requests the user list through the response cache, cold and warm, then under a read/write mix '
+            'where WriteService updates invalidate it: latency and hit ratios')
+
+    @classmethod
+    def add_arguments(cls, parser):
+        parser.add_argument('--rows', type=int, default=10000, help='Number of users to seed')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed runs per variant')
+        parser.add_argument('--requests', type=int, default=2000, help='Requests in the read/write mix')
+        parser.add_argument('--write-ratio', type=float, default=0.05, help='Share of the mix that writes')
+        parser.add_argument('--pages', type=int, default=5, help='Distinct page sizes requested in the mix')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for the mix')
+
+    def handle(self, **kwargs):
+        rng = random.Random(kwargs['seed'])
+        with test_environment(), throwaway_database():
+            seed_users(kwargs['rows'])
+            client = Client()
+            url = reverse('users')
+            response_cache = ResponseCache.registered('UsersListAPIView')
+            backend = caches[response_cache.alias]
+
+            def cold():
+                backend.clear()
+                return client.get(url)
+
+            self.stdout.write(f"{'variant':>12} {'p50 ms':>10} {'p95 ms':>10}")
+            for name, fn in (('cold', cold), ('warm', lambda: client.get(url))):
+                result = summarize(measure(fn, kwargs['repeat']))
+                self.stdout.write(f"{name:>12} {result['p50_ms']:>10.2f} {result['p95_ms']:>10.2f}")
+
+            backend.clear()
+            response_cache.reset_stats()
+            service, users = UserWriteService(), UserDAO().find_all_model_objs(order_bys=['email'])[:100]
+            for _ in range(kwargs['requests']):
+                if rng.random() < kwargs['write_ratio']:
+                    service.update(rng.choice(users), {'first_name': f'Bench{rng.randrange(1000)}'})
+                else:
+                    client.get(url, {'limit': 10 + rng.randrange(kwargs['pages'])})
+            stats = response_cache.stats()
+            self.stdout.write(f"{kwargs['write_ratio']:.0%} writes over {kwargs['pages']} pages: "
+                              f"{stats['hits']} hits, {stats['misses']} misses, hit ratio {stats['hit_ratio']:.1%}")
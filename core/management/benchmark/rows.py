@@ -0,0 +1,35 @@
+from apps.users.dao import UserDAO
+from core.management.benchmark import BenchmarkSuite, throwaway_database, seed_users, measure, peak_memory, summarize
+
+
+class RowsSuite(BenchmarkSuite):
+    name = 'rows'
+    help = 'Compares time and memory to materialize users as model instances and as Dao.find_rows records'
+
+    @classmethod
+    def add_arguments(cls, parser):
+        parser.add_argument('--rows', type=int, default=100000, help='Number of users to seed and load')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per variant')
+        parser.add_argument('--fields', type=str, help='Comma separated projection for the row variants')
+
+    def handle(self, **kwargs):
+        rows, repeat = kwargs['rows'], kwargs['repeat']
+        fields = kwargs['fields'].split(',') if kwargs['fields'] else ['email', 'first_name', 'last_name']
+
+        with throwaway_database():
+            self.stdout.write(f'Seeding {rows} users ...')
+            seed_users(rows)
+            dao = UserDAO()
+            variants = {
+                'models': dao.find_all_model_objs,
+                'models (only)': lambda: list(dao.find_queryset().only(*fields)),
+                'rows': dao.find_rows,
+                'rows (fields)': lambda: dao.find_rows(fields=fields),
+            }
+
+            self.stdout.write(f"{'variant':>14} {'p50 ms':>10} {'rows/sec':>12} {'peak MB':>10} {'bytes/row':>10}")
+            for name, fn in variants.items():
+                result = summarize(measure(fn, repeat))
+                peak = peak_memory(fn)
+                self.stdout.write(f"{name:>14} {result['p50_ms']:>10.1f} {rows / result['p50_ms'] * 1000:>12.0f} "
+                                  f"{peak / 2 ** 20:>10.1f} {peak / rows:>10.0f}")
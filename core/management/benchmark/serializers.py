@@ -0,0 +1,47 @@
+from django.core.management.base import CommandError
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from apps.users.serializers import UserSerializer
+from apps.users.services import UserReadService
+from core.management.benchmark import BenchmarkSuite, throwaway_database, seed_users, measure, peak_memory, summarize
+
+
+class SerializersSuite(BenchmarkSuite):
+    name = 'serializers'
+    help = ('Compares UserSerializer(many=True) through the compiled fast path against the stock '
+            'ListSerializer: rows/sec, peak allocations and byte-identical JSON')
+
+    @classmethod
+    def add_arguments(cls, parser):
+        parser.add_argument('--rows', type=int, default=5000, help='Number of users to seed and serialize')
+        parser.add_argument('--repeat', type=int, default=10, help='Timed runs per variant')
+
+    def handle(self, **kwargs):
+        rows, repeat = kwargs['rows'], kwargs['repeat']
+        stock_serializer = type('StockUserSerializer', (UserSerializer,), {
+            'Meta': type('Meta', (UserSerializer.Meta,), {'list_serializer_class': serializers.ListSerializer}),
+        })
+        variants = {'stock': stock_serializer, 'compiled': UserSerializer}
+        renderer = JSONRenderer()
+
+        with throwaway_database():
+            self.stdout.write(f'Seeding {rows} users ...')
+            seed_users(rows)
+            users = list(UserReadService().find_queryset(order_bys=UserReadService.LIST_ORDERING,
+                                                         plan=UserSerializer.get_query_plan()))
+
+            rendered = {name: renderer.render(serializer_class(users, many=True).data)
+                        for name, serializer_class in variants.items()}
+            if rendered['compiled'] != rendered['stock']:
+                raise CommandError('Compiled output differs from the stock ListSerializer output')
+
+            self.stdout.write(f"{'variant':>10} {'rows/sec':>12} {'p50 ms':>10} {'peak KB':>10}")
+            for name, serializer_class in variants.items():
+                def serialize():
+                    return serializer_class(users, many=True).data
+
+                result = summarize(measure(serialize, repeat))
+                peak_kb = peak_memory(serialize) / 1024
+                self.stdout.write(f"{name:>10} {rows * result['ops_per_sec']:>12.0f} "
+                                  f"{result['p50_ms']:>10.2f} {peak_kb:>10.0f}")
+        self.stdout.write(self.style.SUCCESS(f'JSON output is byte-identical ({len(rendered["stock"])} bytes)'))
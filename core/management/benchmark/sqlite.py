@@ -0,0 +1,96 @@
+import random
+import threading
+import time
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import OperationalError, connections, transaction
+from django.utils import timezone
+from core.management.benchmark import BenchmarkSuite, file_database, percentile
+
+
+class SqliteSuite(BenchmarkSuite):
+    name = 'sqlite'
+    help = ('Runs a concurrent read/write mix against on-disk SQLite databases: the stock Django backend '
+            'against core.db.backends.sqlite3 (tuned PRAGMAs, pool, write queue)')
+
+    @classmethod
+    def add_arguments(cls, parser):
+        parser.add_argument('--rows', type=int, default=20000, help='Number of users to seed')
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent client threads')
+        parser.add_argument('--seconds', type=float, default=5, help='Duration of each run')
+        parser.add_argument('--write-ratio', type=float, default=0.2, help='Share of operations that write')
+
+    def handle(self, **kwargs):
+        variants = {
+            'stock': ('django.db.backends.sqlite3', {}),
+            'tuned, pooled': ('core.db.backends.sqlite3', {}),
+            'tuned, persistent': ('core.db.backends.sqlite3', {'CONN_MAX_AGE': None}),
+        }
+        self.stdout.write(f"{kwargs['threads']} threads, {kwargs['write_ratio']:.0%} writes, "
+                          f"{kwargs['seconds']:g}s per run")
+        self.stdout.write(f"{'variant':>18} {'ops/sec':>10} {'reads/s':>10} {'writes/s':>10} "
+                          f"{'p99 ms':>9} {'locked':>8}")
+        for index, (name, (engine, settings_dict)) in enumerate(variants.items()):
+            alias = f'bench_sqlite_{index}'
+            with file_database(alias, engine, [get_user_model()], **settings_dict):
+                pks = self.seed(alias, kwargs['rows'])
+                result = self.run(alias, pks, kwargs['threads'], kwargs['seconds'], kwargs['write_ratio'])
+            seconds = kwargs['seconds']
+            self.stdout.write(f"{name:>18} {(result['reads'] + result['writes']) / seconds:>10.0f} "
+                              f"{result['reads'] / seconds:>10.0f} {result['writes'] / seconds:>10.0f} "
+                              f"{percentile(result['latencies'], 99) * 1000:>9.1f} {result['locked']:>8}")
+
+    def seed(self, alias: str, rows: int) -> list:
+        user_model = get_user_model()
+        hashed = make_password('bench-password')
+        now = timezone.now()
+        users = [user_model(email=f'user{i:08d}@bench.local', first_name='Bench', last_name=str(i),
+                            password=hashed, last_pass_change=now) for i in range(rows)]
+        user_model.objects.using(alias).bulk_create(users, batch_size=5000)
+        connections[alias].close()
+        return [user.pk for user in users]
+
+    def run(self, alias: str, pks: list, threads: int, seconds: float, write_ratio: float) -> dict:
+        """Each thread loops over request-shaped operations until the deadline"""
+        user_model = get_user_model()
+        totals = {'reads': 0, 'writes': 0, 'locked': 0, 'latencies': []}
+        lock = threading.Lock()
+        start = threading.Barrier(threads)
+
+        def client(seed: int):
+            rng = random.Random(seed)
+            counts = {'reads': 0, 'writes': 0, 'locked': 0, 'latencies': []}
+            start.wait()
+            deadline = time.perf_counter() + seconds
+            while True:
+                started = time.perf_counter()
+                if started >= deadline:
+                    break
+                try:
+                    if rng.random() < write_ratio:
+                        with transaction.atomic(using=alias):
+                            user_model.objects.using(alias).filter(pk=rng.choice(pks)).update(
+                                first_name=f'Bench{rng.randrange(1000)}', updated_at=timezone.now())
+                        counts['writes'] += 1
+                    else:
+                        user_model.objects.using(alias).get(pk=rng.choice(pks))
+                        list(user_model.objects.using(alias).filter(email__gte=f'user{rng.randrange(len(pks)):08d}')
+                             .order_by('email')[:20])
+                        counts['reads'] += 1
+                    counts['latencies'].append(time.perf_counter() - started)
+                except OperationalError:
+                    counts['locked'] += 1
+                # End of "request": closes unless the alias keeps persistent connections
+                connections[alias].close_if_unusable_or_obsolete()
+            connections[alias].close()
+            with lock:
+                for key in ('reads', 'writes', 'locked'):
+                    totals[key] += counts[key]
+                totals['latencies'].extend(counts['latencies'])
+
+        workers = [threading.Thread(target=client, args=(i,)) for i in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return totals
@@ -0,0 +1,79 @@
+import time
+from django.core.management.base import CommandError
+from django.db import connection
+from apps.users.dao import UserDAO
+from apps.users.services import UserWriteService
+from core.management.benchmark import BenchmarkSuite, throwaway_database, seed_users, percentile
+from core.service import unit_of_work
+
+
+class UnitOfWorkSuite(BenchmarkSuite):
+    name = 'unit-of-work'
+    help = ('Runs the same create/update/soft-delete/delete sequence of WriteService calls one by one and '
+            'inside a unit of work: statements, total time and time spent inside write transactions')
+
+    @classmethod
+    def add_arguments(cls, parser):
+        parser.add_argument('--rows', type=int, default=5000, help='Number of users to seed')
+        parser.add_argument('--objects', type=int, default=50, help='Objects touched per call kind')
+        parser.add_argument('--repeat', type=int, default=10, help='Timed runs per variant')
+
+    def handle(self, **kwargs):
+        count = kwargs['objects']
+        with throwaway_database():
+            seed_users(kwargs['rows'])
+            service, dao = UserWriteService(), UserDAO()
+
+            def sequence(run: int, existing: list) -> None:
+                """Creates, updates half of them twice, updates/soft-deletes/deletes existing rows"""
+                created = [service.create({'email': f'uow{run:04d}-{i:05d}@bench.local', 'first_name': 'New'})
+                           for i in range(count)]
+                for obj in created[:count // 2]:
+                    service.update(obj, {'first_name': 'Renamed'})
+                    service.update(obj, {'last_name': 'Twice'})
+                for obj in created[count // 2:count // 2 + count // 10]:
+                    service.delete(obj)
+                updated, soft_deleted, deleted = existing[:count], existing[count:2 * count], \
+                    existing[2 * count:3 * count]
+                for index, obj in enumerate(updated):
+                    service.update(obj, {'first_name': f'Bench{index % 3}'})
+                for obj in soft_deleted:
+                    service.soft_delete(obj)
+                for obj in deleted:
+                    service.delete(obj)
+
+            variants = {'one by one': None, 'unit of work': unit_of_work}
+            self.stdout.write(f"{'variant':>14} {'statements':>11} {'p50 ms':>10} {'in txn ms':>10}")
+            for offset, (name, scope) in enumerate(variants.items()):
+                statements, totals, in_transaction = [], [], []
+                for run in range(kwargs['repeat']):
+                    existing = dao.find_all_model_objs(filter_kwargs={'email__startswith': 'user'},
+                                                       order_bys=['email'])[:3 * count]
+                    if len(existing) < 3 * count:
+                        raise CommandError('Not enough seeded rows, raise --rows')
+                    timing = {'transaction': 0.0, 'opened': None}
+
+                    def observe(execute, sql, params, many, context):
+                        # Time from the first write statement to the end of its atomic block
+                        if timing['opened'] is None and connection.in_atomic_block:
+                            timing['opened'] = time.perf_counter()
+                            connection.on_commit(close_transaction)
+                        if run == 0:
+                            statements.append(sql)
+                        return execute(sql, params, many, context)
+
+                    def close_transaction():
+                        timing['transaction'] += time.perf_counter() - timing['opened']
+                        timing['opened'] = None
+
+                    started = time.perf_counter()
+                    with connection.execute_wrapper(observe):
+                        if scope is None:
+                            sequence(offset * kwargs['repeat'] + run, existing)
+                        else:
+                            with scope():
+                                sequence(offset * kwargs['repeat'] + run, existing)
+                    totals.append(time.perf_counter() - started)
+                    in_transaction.append(timing['transaction'])
+                self.stdout.write(f"{name:>14} {len(statements):>11} {percentile(totals, 50) * 1000:>10.1f} "
+                                  f"{percentile(in_transaction, 50) * 1000:>10.1f}")
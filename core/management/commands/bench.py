@@ -0,0 +1,191 @@
+import itertools
+import json
+import platform
+import random
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+from apps.users.dao import UserDAO
+from apps.users.models import User
+from core.dao import bump_generation
+from core.management.benchmark import throwaway_database, seed_users, test_environment, measure, peak_memory, summarize
+from core.management.benchmark.async_views import AsyncViewsSuite
+from core.management.benchmark.auth import AuthSuite
+from core.management.benchmark.loader import LoaderSuite
+from core.management.benchmark.login import LoginSuite
+from core.management.benchmark.pagination import PaginationSuite
+from core.management.benchmark.response_cache import ResponseCacheSuite
+from core.management.benchmark.rows import RowsSuite
+from core.management.benchmark.serializers import SerializersSuite
+from core.management.benchmark.sqlite import SqliteSuite
+from core.management.benchmark.unit_of_work import UnitOfWorkSuite
+
+METRICS = ('p50_ms', 'p95_ms', 'p99_ms')
+SUITES = {suite.name: suite for suite in (
+    AsyncViewsSuite,
+    AuthSuite,
+    LoaderSuite,
+    LoginSuite,
+    PaginationSuite,
+    ResponseCacheSuite,
+    RowsSuite,
+    SerializersSuite,
+    SqliteSuite,
+    UnitOfWorkSuite,
+)}
+
+
+class Command(BaseCommand):
+    help = ('Benchmarks Dao operations and the user endpoints on a throwaway database and emits JSON; '
+            'optionally fails when results regress against a saved baseline. request.users misses the '
+            'response cache on every run, request.users.warm hits it. "bench <suite> --help" describes the '
+            'focused suites, which print a comparison table instead')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help='Number of users to seed')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed runs per DAO operation')
+        parser.add_argument('--request-repeat', type=int, default=10, help='Timed runs per endpoint')
+        parser.add_argument('--batch-size', type=int, default=500, help='Objects per *_batch call')
+        parser.add_argument('--object-cache', action='store_true',
+                            help="Keep the DAO's object cache on (off by default so reads hit the database)")
+        parser.add_argument('--output', type=str, help='Write the JSON report to this file instead of stdout')
+        parser.add_argument('--baseline', type=str, help='JSON report of a previous run to compare against')
+        parser.add_argument('--threshold', type=float, default=0.10,
+                            help='Allowed relative slowdown before a result counts as a regression')
+        parser.add_argument('--metric', choices=METRICS, default='p50_ms', help='Latency used for comparison')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for lookups')
+
+        # The report options above come before a suite name, the suite's own after it
+        suites = parser.add_subparsers(dest='suite', metavar='suite', title='suites',
+                                       help='Run one focused suite instead of the report')
+        for name, suite in SUITES.items():
+            suite.add_arguments(suites.add_parser(name, help=suite.help, description=suite.help,
+                                                  called_from_command_line=parser.called_from_command_line))
+
+    def handle(self, *args, **kwargs):
+        if kwargs['suite']:
+            SUITES[kwargs['suite']](self).handle(**kwargs)
+            return
+
+        random.seed(kwargs['seed'])
+        with test_environment(), throwaway_database():
+            seed_users(kwargs['rows'])
+            results = self.bench_dao(kwargs)
+            results.update(self.bench_requests(kwargs))
+
+        report = {
+            'meta': {
+                'rows': kwargs['rows'],
+                'repeat': kwargs['repeat'],
+                'batch_size': kwargs['batch_size'],
+                'object_cache': kwargs['object_cache'],
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'created_at': timezone.now().isoformat(),
+            },
+            'results': results,
+        }
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if kwargs['output']:
+            with open(kwargs['output'], 'w') as report_file:
+                report_file.write(output + '\n')
+            self.stderr.write(f"Report written to {kwargs['output']}")
+        else:
+            self.stdout.write(output)
+
+        if kwargs['baseline']:
+            self.compare(results, kwargs['baseline'], kwargs['metric'], kwargs['threshold'])
+
+    def bench_dao(self, kwargs) -> dict:
+        dao_cls = UserDAO if kwargs['object_cache'] else type('BenchUserDAO', (UserDAO,), {'CACHE_ENABLED': False})
+        dao = dao_cls()
+        repeat, batch_size = kwargs['repeat'], kwargs['batch_size']
+        users = list(dao.find_queryset().values_list('pk', 'email'))
+        hashed = make_password('bench-password')
+        counter = itertools.count()
+
+        def new_users():
+            return [dao.model(email=f'new{next(counter):08d}@bench.local', password=hashed,
+                              last_pass_change=timezone.now()) for _ in range(batch_size)]
+
+        def changed_users():
+            objs = list(dao.find_queryset()[:batch_size])
+            for obj in objs:
+                obj.first_name = f'Bench{next(counter)}'
+            return objs
+
+        def inserted_users():
+            objs = new_users()
+            dao.model.objects.bulk_create(objs)
+            return objs
+
+        operations = {
+            'get': (lambda pk: dao.get(pk), lambda: random.choice(users)[0]),
+            'find_one': (lambda email: dao.find_one({'email': email}), lambda: random.choice(users)[1]),
+            'find_all_model_objs': (lambda _: dao.find_all_model_objs(), lambda: None),
+            'save_batch': (dao.save_batch, new_users),
+            'update_batch': (dao.update_batch, changed_users),
+            'delete_batch': (dao.delete_batch, inserted_users),
+            'count': (lambda _: dao.get_count(), lambda: None),
+            'exists': (lambda email: dao.does_exist({'email': email}), lambda: random.choice(users)[1]),
+        }
+        results = {}
+        for name, (fn, setup) in operations.items():
+            self.stderr.write(f'dao.{name} ...')
+            results[f'dao.{name}'] = self.result(fn, setup, repeat)
+        return results
+
+    def bench_requests(self, kwargs) -> dict:
+        client = Client()
+        login_payload = {'email': 'user00000001@bench.local', 'password': 'bench-password'}
+
+        def login(_):
+            response = client.post(reverse('login'), login_payload, content_type='application/json')
+            assert response.status_code == 200, response.content
+
+        def users(_):
+            response = client.get(reverse('users'), {'limit': 50})
+            assert response.status_code == 200, response.content
+
+        def retire_cached_responses():
+            # As after a write: the response cache misses and the view runs
+            bump_generation(User)
+
+        results = {}
+        for name, fn, setup in (('login', login, lambda: None),
+                                ('users', users, retire_cached_responses),
+                                ('users.warm', users, lambda: None)):
+            self.stderr.write(f'request.{name} ...')
+            results[f'request.{name}'] = self.result(fn, setup, kwargs['request_repeat'])
+        return results
+
+    @staticmethod
+    def result(fn, setup, repeat) -> dict:
+        result = summarize(measure(fn, repeat, setup=setup))
+        result['peak_kb'] = peak_memory(fn, setup=setup) / 1024
+        return result
+
+    def compare(self, results: dict, baseline_path: str, metric: str, threshold: float) -> None:
+        with open(baseline_path) as baseline_file:
+            baseline = json.load(baseline_file)['results']
+
+        regressions = []
+        for name, result in sorted(results.items()):
+            if name not in baseline:
+                continue
+            before, after = baseline[name][metric], result[metric]
+            change = (after - before) / before if before else 0.0
+            line = f'{name:<28} {before:>10.3f} -> {after:>10.3f} {metric} ({change:+.1%})'
+            if change > threshold:
+                regressions.append(name)
+                self.stderr.write(self.style.ERROR(line))
+            else:
+                self.stderr.write(line)
+
+        if regressions:
+            raise CommandError(f"{len(regressions)} regression(s) above {threshold:.0%}: {', '.join(regressions)}")
+        self.stderr.write(self.style.SUCCESS('No regressions against baseline'))
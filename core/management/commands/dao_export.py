@@ -0,0 +1,52 @@
+import csv
+from django.core.management.base import BaseCommand
+from core.management.transfer import (FORMATS, resolve_model, dao_for_model, detect_format, open_stream, column_names,
+                                      encode_ndjson, write_csv, Progress)
+
+
+class Command(BaseCommand):
+    help = ("Streams a model's rows, soft-deleted ones included so dao_import restores them, to NDJSON "
+            "or CSV, reading through its DAO in keyset (pk-ordered) chunks")
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', help='app_label.ModelName, e.g. users.User')
+        parser.add_argument('file', help="Output file, or '-' for stdout")
+        parser.add_argument('--format', choices=FORMATS, help='Output format (default: from the file extension)')
+        parser.add_argument('--fields', type=str, help='Comma separated fields to export (default: every column)')
+        parser.add_argument('--batch-size', type=int, help='Rows per query (default: the DAO ITERATOR_CHUNK_SIZE)')
+        parser.add_argument('--live-only', action='store_true', help='Leave out soft-deleted rows')
+        parser.add_argument('--progress', type=int, default=100000, help='Report progress every N rows (0: off)')
+
+    def handle(self, *args, **kwargs):
+        model = resolve_model(kwargs['model'])
+        dao = dao_for_model(model)
+        fmt = detect_format(kwargs['file'], kwargs['format'])
+        batch_size = kwargs['batch_size'] or dao.ITERATOR_CHUNK_SIZE
+        columns = column_names(model, kwargs['fields'].split(',') if kwargs['fields'] else None)
+        pk_name = model._meta.pk.attname
+        # The pk is selected even when not exported, it is the keyset
+        selected = columns if pk_name in columns else [*columns, pk_name]
+        pk_index = selected.index(pk_name)
+        qs = dao.all(include_deleted=not kwargs['live_only']).order_by('pk')
+
+        progress = Progress(self.stderr.write, 'Exported', kwargs['progress'])
+        with open_stream(kwargs['file'], 'w') as stream:
+            writer = csv.writer(stream) if fmt == 'csv' else None
+            if writer:
+                writer.writerow(columns)
+            last_pk = None
+            while True:
+                chunk_qs = qs if last_pk is None else qs.filter(pk__gt=last_pk)
+                rows = list(chunk_qs.values_list(*selected)[:batch_size])
+                if not rows:
+                    break
+                last_pk = rows[-1][pk_index]
+                if len(selected) != len(columns):
+                    rows = [row[:-1] for row in rows]
+                if writer:
+                    write_csv(writer, rows)
+                else:
+                    stream.write(encode_ndjson(columns, rows))
+                progress.add(len(rows))
+
+        self.stderr.write(self.style.SUCCESS(progress.line()))
@@ -0,0 +1,74 @@
+import functools
+from concurrent.futures import ProcessPoolExecutor
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from core.dao import Dao
+from core.management.transfer import (FORMATS, resolve_model, dao_for_model, detect_format, open_stream, read_blocks,
+                                      parse_block, init_worker, bounded_map, auto_timestamp_fields,
+                                      preserve_auto_timestamps, Progress)
+
+
+class Command(BaseCommand):
+    help = ("Streams NDJSON or CSV rows into a model through its DAO's save_batch (or upsert_batch), "
+            "chunk by chunk, optionally parsing in parallel worker processes")
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', help='app_label.ModelName, e.g. users.User')
+        parser.add_argument('file', help="Input file, or '-' for stdin")
+        parser.add_argument('--format', choices=FORMATS, help='Input format (default: from the file extension)')
+        parser.add_argument('--batch-size', type=int, help='Rows per chunk (default: the DAO SAVE_BATCH_SIZE)')
+        parser.add_argument('--workers', type=int, default=0, help='Parse worker processes (0 parses inline)')
+        parser.add_argument('--transaction', choices=(Dao.TRANSACTION_CHUNK, Dao.TRANSACTION_RUN),
+                            default=Dao.TRANSACTION_CHUNK, help='One transaction per chunk or for the whole run')
+        parser.add_argument('--upsert', type=str,
+                            help='Comma separated unique fields; conflicting rows are updated instead of failing')
+        parser.add_argument('--update-fields', type=str,
+                            help='Comma separated fields written on conflict (default: the CSV columns, '
+                                 'or every column for NDJSON)')
+        parser.add_argument('--hash-passwords', action='store_true',
+                            help='Hash plain-text password values (by default they are stored as given, '
+                                 'i.e. already hashed as dao_export writes them)')
+        parser.add_argument('--progress', type=int, default=100000, help='Report progress every N rows (0: off)')
+
+    def handle(self, *args, **kwargs):
+        model = resolve_model(kwargs['model'])
+        dao = dao_for_model(model)
+        fmt = detect_format(kwargs['file'], kwargs['format'])
+        batch_size = kwargs['batch_size'] or dao.SAVE_BATCH_SIZE
+        if kwargs['hash_passwords'] and not any(f.name == 'password' for f in model._meta.concrete_fields):
+            raise CommandError(f'{model._meta.label} has no password field')
+
+        # Read before preserve_auto_timestamps clears the flags (workers fork later)
+        timestamps = tuple(field.attname for field in auto_timestamp_fields(model))
+        progress = Progress(self.stderr.write, 'Imported', kwargs['progress'])
+        workers = kwargs['workers']
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=init_worker) if workers else None
+        try:
+            with open_stream(kwargs['file'], 'r') as stream, preserve_auto_timestamps(model):
+                header, blocks = read_blocks(stream, fmt, batch_size)
+                parse = functools.partial(parse_block, model._meta.label, fmt, header, kwargs['hash_passwords'],
+                                          timestamps)
+
+                def objects():
+                    for values in bounded_map(executor, parse, blocks, window=max(2, workers * 2)):
+                        yield from (model(**row) for row in values)
+                        progress.add(len(values))
+
+                try:
+                    if kwargs['upsert']:
+                        unique_fields = kwargs['upsert'].split(',')
+                        update_fields = kwargs['update_fields'].split(',') if kwargs['update_fields'] else None
+                        if update_fields is None and header:
+                            update_fields = [model._meta.get_field(column).name for column in header
+                                             if column not in unique_fields and column != model._meta.pk.attname]
+                        dao.upsert_batch(objects(), unique_fields, update_fields, batch_size=batch_size,
+                                         transaction_mode=kwargs['transaction'])
+                    else:
+                        dao.save_batch(objects(), batch_size=batch_size, transaction_mode=kwargs['transaction'])
+                except (ValueError, ValidationError) as e:
+                    raise CommandError(f'Invalid input after {progress.count} rows: {e}')
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+        self.stderr.write(self.style.SUCCESS(progress.line()))
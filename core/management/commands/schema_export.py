@@ -0,0 +1,26 @@
+import hashlib
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from core.http.schema import FORMATS, compress, render_schema, schema_path
+
+
+class Command(BaseCommand):
+    help = ('Generates the OpenAPI schema once and writes it, gzipped too, as versioned JSON and YAML files '
+            'for SchemaView to serve (run at build or deploy time)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output-dir', type=str, help='Directory to write to (default: SCHEMA_DIR)')
+
+    def handle(self, *args, **kwargs):
+        directory = Path(kwargs['output_dir'] or settings.SCHEMA_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        for fmt, content in render_schema().items():
+            path = schema_path(fmt, directory)
+            # Write then rename, so a serving process never reads a half-written file
+            for target, data in ((path, content), (path.with_name(f'{path.name}.gz'), compress(content))):
+                partial = target.with_name(f'{target.name}.tmp')
+                partial.write_bytes(data)
+                partial.replace(target)
+            self.stdout.write(f'{path} ({len(content)} bytes, sha256 {hashlib.sha256(content).hexdigest()[:12]}, '
+                              f'{FORMATS[fmt]})')
@@ -0,0 +1,237 @@
+import csv
+import datetime
+import importlib
+import inspect
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import Executor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, IO, Iterable, Iterator, List, Optional, Tuple, Type
+import django
+from django.apps import apps
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Model
+from django.utils import timezone
+from core.dao import Dao
+
+"""
+Module: transfer.py
+Description: Shared helpers for the dao_import / dao_export management commands.
+
+Rows travel as NDJSON objects or CSV records keyed by the model's concrete
+column attnames. CSV writes NULL as \\N so it stays distinct from ''.
+Datetimes keep full microsecond precision, and imports keep the file's
+auto_now / auto_now_add values so a round trip is lossless.
+"""
+
+FORMATS = ('ndjson', 'csv')
+CSV_NULL = r'\N'
+
+
+def resolve_model(label: str) -> Type[Model]:
+    try:
+        return apps.get_model(label)
+    except (LookupError, ValueError) as e:
+        raise CommandError(f'Unknown model {label!r}, expected app_label.ModelName: {e}')
+
+
+def dao_for_model(model: Type[Model]) -> Dao:
+    """
+    The Dao subclass serving ``model``, looked up after importing the app's
+    dao module; models without one get a plain Dao.
+    """
+    try:
+        importlib.import_module(f'{model._meta.app_config.name}.dao')
+    except ModuleNotFoundError:
+        pass
+    pending = list(Dao.__subclasses__())
+    while pending:
+        dao_cls = pending.pop(0)
+        pending.extend(dao_cls.__subclasses__())
+        if not inspect.isabstract(dao_cls):
+            dao = dao_cls()
+            if dao.model is model:
+                return dao
+    return type(f'{model.__name__}Dao', (Dao,), {'model_cls': model})()
+
+
+def detect_format(path: str, fmt: Optional[str]) -> str:
+    if fmt:
+        return fmt
+    if path.endswith('.csv'):
+        return 'csv'
+    if path.endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    raise CommandError(f'Cannot infer the format of {path!r}, pass --format')
+
+
+@contextmanager
+def open_stream(path: str, mode: str) -> Iterator[IO]:
+    """Open ``path`` for text I/O, with '-' meaning stdin / stdout"""
+    if path == '-':
+        yield sys.stdin if 'r' in mode else sys.stdout
+        return
+    with open(path, mode, newline='', encoding='utf-8') as stream:
+        yield stream
+
+
+def column_names(model: Type[Model], fields: Optional[List[str]] = None) -> List[str]:
+    opts = model._meta
+    if not fields:
+        return [field.attname for field in opts.concrete_fields]
+    return [opts.get_field(name).attname for name in fields]
+
+
+# Export
+
+class _Encoder(DjangoJSONEncoder):
+    """DjangoJSONEncoder without its truncation of datetimes to milliseconds"""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encode_ndjson(columns: List[str], rows: Iterable[tuple]) -> str:
+    encoder = _Encoder(separators=(',', ':'))
+    return ''.join(encoder.encode(dict(zip(columns, row))) + '\n' for row in rows)
+
+
+def write_csv(writer, rows: Iterable[tuple]) -> None:
+    writer.writerows([CSV_NULL if value is None else value for value in row] for row in rows)
+
+
+# Import
+
+def read_blocks(stream: IO, fmt: str, block_size: int) -> Tuple[List[str], Iterator[list]]:
+    """
+    The file's columns (CSV header, or None for NDJSON) and an iterator of
+    raw blocks: lists of NDJSON lines or CSV records, ``block_size`` each
+    """
+    if fmt == 'csv':
+        reader = csv.reader(stream)
+        header = next(reader, None) or []
+        source = reader
+    else:
+        header = None
+        source = (line for line in stream if line.strip())
+
+    def blocks():
+        block = []
+        for item in source:
+            block.append(item)
+            if len(block) >= block_size:
+                yield block
+                block = []
+        if block:
+            yield block
+
+    return header, blocks()
+
+
+def auto_timestamp_fields(model: Type[Model]) -> list:
+    return [field for field in model._meta.concrete_fields
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)]
+
+
+@contextmanager
+def preserve_auto_timestamps(model: Type[Model]) -> Iterator[None]:
+    """
+    Stop auto_now / auto_now_add fields from overwriting imported values while
+    the block runs. The flags live on the shared field objects, so this is
+    only meant for a single-purpose process such as a management command.
+    """
+    saved = [(field, field.auto_now, field.auto_now_add) for field in auto_timestamp_fields(model)]
+    for field, _, _ in saved:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def parse_block(label: str, fmt: str, header: Optional[List[str]], hash_passwords: bool,
+                timestamps: Tuple[str, ...], block: list) -> List[Dict[str, Any]]:
+    """
+    Decode one block into dicts of python values (Field.to_python applied),
+    stamping ``timestamps`` columns missing from the input and hashing
+    plain-text passwords when asked. Runs in parse workers.
+    """
+    model = apps.get_model(label)
+    now = timezone.now()
+    fields = {}
+    for field in model._meta.concrete_fields:
+        fields[field.attname] = fields[field.name] = field
+
+    parsed = []
+    for item in block:
+        if fmt == 'csv':
+            record = {column: None if value == CSV_NULL else value for column, value in zip(header, item)}
+        else:
+            record = json.loads(item)
+        values = {}
+        for column, value in record.items():
+            field = fields.get(column)
+            if field is None:
+                raise ValueError(f'{label} has no column {column!r}')
+            values[field.attname] = field.to_python(value) if value is not None else None
+        for attname in timestamps:
+            if values.get(attname) is None:
+                values[attname] = now
+        if hash_passwords and values.get('password'):
+            values['password'] = make_password(values['password'])
+        parsed.append(values)
+    return parsed
+
+
+def init_worker() -> None:
+    """Process pool initializer for platforms that spawn rather than fork"""
+    if not apps.ready:
+        django.setup()
+
+
+def bounded_map(executor: Optional[Executor], fn: Callable, items: Iterable, window: int) -> Iterator:
+    """
+    Ordered executor.map that keeps at most ``window`` items in flight, so a
+    large input is never queued up front. Runs inline without an executor.
+    """
+    if executor is None:
+        yield from map(fn, items)
+        return
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+class Progress:
+    """Reports rows processed and throughput every ``every`` rows"""
+
+    def __init__(self, write: Callable[[str], None], verb: str, every: int):
+        self.write = write
+        self.verb = verb
+        self.every = every
+        self.count = 0
+        self.started = time.perf_counter()
+        self.next_report = every
+
+    def add(self, rows: int) -> None:
+        self.count += rows
+        if self.every and self.count >= self.next_report:
+            self.write(self.line())
+            while self.next_report <= self.count:
+                self.next_report += self.every
+
+    def line(self) -> str:
+        elapsed = time.perf_counter() - self.started
+        rate = self.count / elapsed if elapsed else 0.0
+        return f'{self.verb} {self.count} rows in {elapsed:.1f}s ({rate:.0f} rows/s)'
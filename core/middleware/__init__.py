@@ -0,0 +1,3 @@
+from .identity_map import IdentityMapMiddleware
+from .replica import ReplicaStickinessMiddleware
+from .instrumentation import QueryInstrumentationMiddleware
@@ -0,0 +1,23 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from core.dao.identity_map import identity_map_scope
+
+
+class IdentityMapMiddleware:
+    """Opens a request-scoped identity map so repeated Dao.get / find_one calls reuse loaded rows"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with identity_map_scope():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with identity_map_scope():
+            return await self.get_response(request)
@@ -0,0 +1,43 @@
+import logging
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from core.instrumentation import profile_scope
+
+logger = logging.getLogger('core.instrumentation')
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Profiles each request's Dao/Service calls and SQL, reports them in a
+    Server-Timing header and logs SQL shapes repeated more than
+    N_PLUS_ONE_THRESHOLD times. Enabled by DAO_INSTRUMENTATION (default: DEBUG).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'DAO_INSTRUMENTATION', settings.DEBUG):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold = getattr(settings, 'N_PLUS_ONE_THRESHOLD', 10)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with profile_scope(self.threshold) as profile:
+            response = self.get_response(request)
+        return self.report(request, response, profile)
+
+    async def __acall__(self, request):
+        with profile_scope(self.threshold) as profile:
+            response = await self.get_response(request)
+        return self.report(request, response, profile)
+
+    def report(self, request, response, profile):
+        response['Server-Timing'] = profile.server_timing()
+        for shape, count in profile.n_plus_one():
+            logger.warning('Possible N+1 on %s %s: %d x %s', request.method, request.path, count, shape)
+        return response
@@ -0,0 +1,49 @@
+import math
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core.exceptions import MiddlewareNotUsed
+from core.db.routing import routing_scope, replica_databases, sticky_seconds
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Carries read-your-writes stickiness across requests: after a request writes,
+    a signed cookie keeps the client's ReadService reads on the primary for
+    REPLICA_STICKY_SECONDS.
+    """
+    sync_capable = True
+    async_capable = True
+    cookie_name = 'primary_until'
+
+    def __init__(self, get_response):
+        if not replica_databases():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        pinned_until = self.read_cookie(request)
+        with routing_scope(pinned_until) as state:
+            response = self.get_response(request)
+        return self.write_cookie(response, pinned_until, state.pinned_until)
+
+    async def __acall__(self, request):
+        pinned_until = self.read_cookie(request)
+        with routing_scope(pinned_until) as state:
+            response = await self.get_response(request)
+        return self.write_cookie(response, pinned_until, state.pinned_until)
+
+    def read_cookie(self, request) -> float:
+        try:
+            return float(request.get_signed_cookie(self.cookie_name, default=0))
+        except ValueError:
+            return 0.0
+
+    def write_cookie(self, response, before: float, after: float):
+        if after > before:
+            max_age = max(1, math.ceil(min(after - time.time(), sticky_seconds())))
+            response.set_signed_cookie(self.cookie_name, str(after), max_age=max_age, httponly=True, samesite='Lax')
+        return response
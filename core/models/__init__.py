@@ -1 +1,2 @@
+from .managers import SoftDeleteManager, SoftDeleteQuerySet
 from .model import BaseModel
@@ -0,0 +1,42 @@
+from django.db import models
+
+"""
+Module: managers.py
+Description: Soft-delete aware manager and queryset for BaseModel.
+
+The default manager hides soft-deleted rows, so every ORM read (and every
+Dao finder) sees live rows only unless it asks otherwise:
+
+    Model.objects.all()                 live rows
+    Model.objects.with_deleted()        every row
+    Model.objects.only_deleted()        soft-deleted rows
+    queryset.alive() / .only_deleted()  narrow an unrestricted queryset
+
+Related-object access and Model.save() go through the model's base manager,
+which is unfiltered, so a live row can still reach a deleted author and a
+deleted row can still be saved.
+"""
+
+ALIVE = {'deleted': False}
+
+
+class SoftDeleteQuerySet(models.QuerySet):
+
+    def alive(self) -> 'SoftDeleteQuerySet':
+        return self.filter(**ALIVE)
+
+    def only_deleted(self) -> 'SoftDeleteQuerySet':
+        return self.filter(deleted=True)
+
+
+class SoftDeleteManager(models.Manager.from_queryset(SoftDeleteQuerySet)):
+
+    def get_queryset(self) -> SoftDeleteQuerySet:
+        return super().get_queryset().alive()
+
+    def with_deleted(self) -> SoftDeleteQuerySet:
+        """Every row, soft-deleted ones included"""
+        return super().get_queryset()
+
+    def only_deleted(self) -> SoftDeleteQuerySet:
+        return self.with_deleted().only_deleted()
@@ -1,6 +1,10 @@
+import copy
 import uuid
+from typing import Optional, Set, Iterable
 from django.db import models
+from django.db.models import DEFERRED
 from django.conf import settings
+from .managers import SoftDeleteManager
 
 
 # Create your models here.
@@ -13,10 +17,10 @@ class BaseModel(models.Model):
 
     inactive = models.BooleanField(default=False, null=True, blank=False)
     deleted = models.BooleanField(default=False, null=True, blank=False)
-    created_at = models.DateTimeField(auto_now=True)
+    created_at = models.DateTimeField(auto_now_add=True)
     created_by = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, db_index=True, editable=False,
                                    on_delete=models.SET_NULL, related_name="%(class)s_created")
-    updated_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     updated_by = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, db_index=True, editable=False,
                                    on_delete=models.SET_NULL, related_name="%(class)s_updated")
 
@@ -24,5 +28,60 @@ class BaseModel(models.Model):
     deleted_by = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, db_index=True, editable=False,
                                    on_delete=models.SET_NULL, related_name="%(class)s_deleted")
 
+    objects = SoftDeleteManager()
+
     class Meta:
         abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = {name: cls._snapshot(value)
+                                   for name, value in zip(field_names, values) if value is not DEFERRED}
+        return instance
+
+    @staticmethod
+    def _snapshot(value):
+        # Mutable values (e.g. JSON) are copied so in-place edits still show up as changes
+        return copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+
+    def __getstate__(self):
+        # Copies (ObjectCache hands them out) and pickles get their own snapshot, like Django's _state
+        state = super().__getstate__()
+        if '_loaded_values' in state:
+            state['_loaded_values'] = dict(state['_loaded_values'])
+        return state
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        self.mark_clean(fields)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.mark_clean(kwargs.get('update_fields'))
+
+    def mark_clean(self, fields: Optional[Iterable[str]] = None) -> None:
+        """Record the current values of ``fields`` (default: all loaded fields) as persisted"""
+        fields = set(fields) if fields is not None else None
+        loaded = self.__dict__.setdefault('_loaded_values', {})
+        for field in self._meta.concrete_fields:
+            if field.attname not in self.__dict__:
+                continue
+            if fields is None or field.name in fields or field.attname in fields:
+                loaded[field.attname] = self._snapshot(getattr(self, field.attname))
+
+    def get_dirty_fields(self) -> Optional[Set[str]]:
+        """
+        Names of fields changed since the object was loaded or last saved.
+        Returns None for unsaved objects, whose state is unknown.
+        """
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None or self._state.adding:
+            return None
+        dirty = set()
+        for field in self._meta.concrete_fields:
+            if field.primary_key or field.attname not in self.__dict__:
+                continue
+            if field.attname not in loaded or loaded[field.attname] != getattr(self, field.attname):
+                dirty.add(field.name)
+        return dirty
@@ -0,0 +1,207 @@
+import datetime
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from rest_framework import fields as drf_fields, relations, serializers, ISO_8601
+from rest_framework.settings import api_settings
+
+"""
+Module: compiled.py
+Description: Compiled read-only fast path for many=True serialization.
+
+Setting ``list_serializer_class = CompiledListSerializer`` on a serializer's
+Meta makes list rendering go through a function generated once per field
+layout. It reads model attributes directly and inlines the conversion of
+common leaf fields, skipping DRF's per-field get_attribute/to_representation
+dispatch. Output is identical to the stock ListSerializer; layouts with
+nested serializers, dotted or '*' sources, non-pk relations or undeclared
+SerializerMethodFields are rendered by DRF as usual.
+"""
+
+# Exact field types whose to_representation is a plain coercion
+_INLINE = {
+    drf_fields.CharField: 'str({v})',
+    drf_fields.EmailField: 'str({v})',
+    drf_fields.SlugField: 'str({v})',
+    drf_fields.URLField: 'str({v})',
+    drf_fields.RegexField: 'str({v})',
+    drf_fields.IPAddressField: 'str({v})',
+    drf_fields.IntegerField: 'int({v})',
+    drf_fields.FloatField: 'float({v})',
+    drf_fields.ReadOnlyField: '{v}',
+}
+
+
+def _iso_datetime(value: Any, tz: Optional[datetime.tzinfo], fallback: Callable) -> Any:
+    """DateTimeField.to_representation for aware datetimes in ISO 8601, without a timezone lookup per value"""
+    if value.__class__ is datetime.datetime and value.tzinfo is not None and tz is not None:
+        try:
+            value = value.astimezone(tz).isoformat()
+        except OverflowError:
+            return fallback(value)
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return fallback(value)
+
+
+def _related_pks(obj: models.Model, name: str) -> List[Any]:
+    """Pks of a many-valued relation, read from the prefetch cache when it is populated"""
+    related = getattr(obj, '_prefetched_objects_cache', {}).get(name)
+    if related is None or related._result_cache is None:
+        related = getattr(obj, name).all()
+    else:
+        related = related._result_cache
+    return [row.pk for row in related]
+
+
+def _field_timezone(field: drf_fields.DateTimeField) -> Optional[datetime.tzinfo]:
+    return field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+
+
+def fast_method(method: Callable) -> Callable:
+    """
+    Declare a ``get_<field>`` method safe for the compiled path: it only reads
+    the object it is given, so it can be called straight from generated code.
+    """
+    method.fast_method = True
+    return method
+
+
+class _Uncompilable(Exception):
+    pass
+
+
+class _Compiler:
+    """Generates the source of one representation function for a field layout"""
+
+    def __init__(self, serializer: serializers.Serializer):
+        self.serializer = serializer
+        self.model = serializer.Meta.model
+        self.lines: List[str] = []
+        self.items: List[str] = []
+        # Per-call arguments of the generated code: (arg name, field name, getter on the bound field)
+        self.args: List[Tuple[str, str, Callable]] = []
+
+    def compile(self) -> Callable:
+        for index, field in enumerate(self.serializer._readable_fields):
+            self.items.append(f'{field.field_name!r}: {self.field(index, field)}')
+        args = ''.join(f', {name}' for name, _, _ in self.args)
+        source = '\n'.join([
+            f'def bind(s{args}):',
+            '    def represent(o):',
+            *(f'        {line}' for line in self.lines),
+            '        return {' + ', '.join(self.items) + '}',
+            '    return represent',
+        ])
+        namespace: Dict[str, Any] = {'_iso_datetime': _iso_datetime, '_related_pks': _related_pks}
+        exec(compile(source, f'<compiled {type(self.serializer).__qualname__}>', 'exec'), namespace)
+        bind = namespace['bind']
+        bind.args = [(field_name, getter) for _, field_name, getter in self.args]
+        bind.source = source
+        return bind
+
+    def model_field(self, field: drf_fields.Field) -> models.Field:
+        if field.source == '*' or len(field.source_attrs) != 1:
+            raise _Uncompilable(field.field_name)
+        try:
+            return self.model._meta.get_field(field.source_attrs[0])
+        except FieldDoesNotExist:
+            raise _Uncompilable(field.field_name)
+
+    def arg(self, name: str, field: drf_fields.Field, getter: Callable) -> str:
+        self.args.append((name, field.field_name, getter))
+        return name
+
+    def converter(self, index: int, field: drf_fields.Field) -> str:
+        return self.arg(f'c{index}', field, lambda bound: bound.to_representation)
+
+    def field(self, index: int, field: drf_fields.Field) -> str:
+        value = f'v{index}'
+
+        if isinstance(field, serializers.SerializerMethodField):
+            method = getattr(type(self.serializer), field.method_name, None)
+            if not getattr(method, 'fast_method', False):
+                raise _Uncompilable(field.field_name)
+            return f's.{field.method_name}(o)'
+
+        if isinstance(field, relations.ManyRelatedField):
+            child = field.child_relation
+            model_field = self.model_field(field)
+            if type(child) is not relations.PrimaryKeyRelatedField or child.pk_field is not None:
+                raise _Uncompilable(field.field_name)
+            # Unsaved instances have no related rows, as in ManyRelatedField.get_attribute
+            return f'_related_pks(o, {model_field.name!r}) if o.pk is not None else []'
+
+        if isinstance(field, relations.PrimaryKeyRelatedField):
+            model_field = self.model_field(field)
+            if type(field) is not relations.PrimaryKeyRelatedField or field.pk_field is not None \
+                    or not model_field.concrete:
+                raise _Uncompilable(field.field_name)
+            # PKOnlyObject optimisation: the local <name>_id column is the output
+            return f'o.{model_field.attname}'
+
+        if isinstance(field, (serializers.BaseSerializer, relations.RelatedField, relations.ManyRelatedField)) \
+                or type(field).get_attribute is not drf_fields.Field.get_attribute:
+            raise _Uncompilable(field.field_name)
+
+        model_field = self.model_field(field)
+        self.lines.append(f'{value} = o.{model_field.attname}')
+        template = _INLINE.get(type(field))
+        if template is None and type(field) is drf_fields.UUIDField and field.uuid_format == 'hex_verbose':
+            template = 'str({v})'
+        if template is None and type(field) is drf_fields.DateTimeField \
+                and (getattr(field, 'format', api_settings.DATETIME_FORMAT) or '').lower() == ISO_8601:
+            tz = self.arg(f'tz{index}', field, _field_timezone)
+            template = '_iso_datetime({v}, ' + tz + ', ' + self.converter(index, field) + ')'
+        if template is None and type(field) is drf_fields.BooleanField:
+            template = '{v} if {v} is True or {v} is False else ' + self.converter(index, field) + '({v})'
+        if template is None:
+            template = self.converter(index, field) + '({v})'
+        return f'None if {value} is None else ' + template.format(v=value)
+
+
+_compiled: Dict[tuple, Optional[Callable]] = {}
+_compile_lock = threading.Lock()
+
+
+def _layout(serializer: serializers.Serializer) -> tuple:
+    return (type(serializer),) + tuple(
+        (field.field_name, type(field), field.source, getattr(field, 'method_name', None),
+         type(getattr(field, 'child_relation', None)))
+        for field in serializer._readable_fields
+    )
+
+
+def compiled_representation(serializer: serializers.Serializer) -> Optional[Callable[[Any], dict]]:
+    """
+    Representation function for ``serializer``'s current field layout, bound
+    to this instance (and its context), or None when DRF must render it.
+    """
+    if type(serializer).to_representation is not serializers.Serializer.to_representation \
+            or not hasattr(getattr(serializer, 'Meta', None), 'model'):
+        return None
+    layout = _layout(serializer)
+    bind = _compiled.get(layout)
+    if bind is None and layout not in _compiled:
+        with _compile_lock:
+            if layout not in _compiled:
+                try:
+                    _compiled[layout] = _Compiler(serializer).compile()
+                except _Uncompilable:
+                    _compiled[layout] = None
+            bind = _compiled[layout]
+    if bind is None:
+        return None
+    fields = serializer.fields
+    return bind(serializer, *(getter(fields[name]) for name, getter in bind.args))
+
+
+class CompiledListSerializer(serializers.ListSerializer):
+    """ListSerializer rendering read-only output through compiled_representation"""
+
+    def to_representation(self, data):
+        represent = compiled_representation(self.child)
+        if represent is None:
+            return super().to_representation(data)
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        return [represent(item) for item in iterable]
@@ -0,0 +1,57 @@
+from typing import Any, Iterable, Optional, Type
+from django.utils.functional import cached_property
+from rest_framework import serializers
+from core.dao import Dao, DataLoader
+
+"""
+Module: loaded.py
+Description: Forward relations rendered through a request-scoped DataLoader.
+
+A LoadedRelatedField reads only the local <name>_id column. When a
+ServiceSerializer renders a list, every row's key is queued before the first
+row is rendered, so all related objects arrive in one Dao.get_many (one
+query per GET_MANY_BATCH_SIZE keys) instead of one query per row, without
+joining the related table into the list query.
+
+    class PostSerializer(ServiceSerializer):
+        created_by = LoadedRelatedField(UserDAO, serializer=AuthorSerializer)
+"""
+
+
+class LoadedRelatedField(serializers.Field):
+    """
+    Read-only foreign key resolved through DataLoader.for_dao(dao_cls), rendered
+    with ``serializer`` (default: str() of the related object)
+    """
+
+    def __init__(self, dao_cls: Type[Dao], serializer: Optional[Type[serializers.BaseSerializer]] = None,
+                 **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+        self.dao_cls = dao_cls
+        self.serializer = serializer
+
+    def bind(self, field_name, parent):
+        super().bind(field_name, parent)
+        model = getattr(getattr(parent, 'Meta', None), 'model', None)
+        if model is not None and len(self.source_attrs) == 1:
+            # Read the foreign key column, never the relation itself
+            self.source = model._meta.get_field(self.source).attname
+            self.source_attrs = [self.source]
+        if self.serializer is not None:
+            self.child = self.serializer()
+            self.child.bind(field_name='', parent=self)
+
+    @cached_property
+    def loader(self) -> DataLoader:
+        return DataLoader.for_dao(self.dao_cls(read_replica=True))
+
+    def prime(self, instances: Iterable[Any]) -> None:
+        """Queue the keys of every instance about to be rendered"""
+        self.loader.load_many(getattr(obj, self.source) for obj in instances)
+
+    def to_representation(self, value):
+        obj = self.loader.get(value)
+        if obj is None:
+            return None
+        return self.child.to_representation(obj) if self.serializer is not None else str(obj)
@@ -1,4 +1,10 @@
+from typing import Set
+from django.core.exceptions import FieldDoesNotExist
 from rest_framework import serializers
+from rest_framework.validators import UniqueValidator
+from core.dao import QueryPlan
+from core.models import SoftDeleteManager
+from .loaded import LoadedRelatedField
 
 
 class ServiceSerializer(serializers.ModelSerializer):
@@ -25,13 +31,108 @@ class ServiceSerializer(serializers.ModelSerializer):
 
         super().__init__(*args, **kwargs)
 
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        # Project columns and load relations up front instead of once per row
+        plan = cls.get_query_plan()
+        if args:
+            args = (plan.prepare(args[0]),) + args[1:]
+        elif kwargs.get('instance') is not None:
+            kwargs['instance'] = plan.prepare(kwargs['instance'])
+        list_serializer = super().many_init(*args, **kwargs)
+        if list_serializer.instance is not None and any(
+                isinstance(field, LoadedRelatedField) for field in cls._declared_fields.values()):
+            # Queue every row's related keys so the first rendered row loads them all at once
+            for field in list_serializer.child.fields.values():
+                if isinstance(field, LoadedRelatedField):
+                    field.prime(list_serializer.instance)
+        return list_serializer
+
+    @classmethod
+    def get_query_plan(cls) -> QueryPlan:
+        """
+        QueryPlan covering what this serializer reads: the columns it renders,
+        forward relations it renders in full and many-valued relations.
+        SerializerMethodFields read nothing unless listed in Meta.method_sources;
+        a method field without an entry (or a source that is not a model field)
+        turns projection off, while relations are still loaded.
+        """
+        plan = cls.__dict__.get('_query_plan')
+        if plan is None:
+            plan = cls._build_query_plan()
+            cls._query_plan = plan
+        return plan
+
+    @classmethod
+    def _build_query_plan(cls) -> QueryPlan:
+        serializer = cls()
+        model = serializer.Meta.model
+        method_sources = getattr(serializer.Meta, 'method_sources', {})
+        only: Set[str] = set()
+        select_related: Set[str] = set()
+        prefetch_related: Set[str] = set()
+        project = True
+
+        for field in serializer.fields.values():
+            if field.write_only:
+                continue
+            if isinstance(field, serializers.SerializerMethodField):
+                if field.field_name in method_sources:
+                    only.update(method_sources[field.field_name])
+                else:
+                    project = False
+                continue
+            if field.source == '*':
+                project = False
+                continue
+
+            name = field.source_attrs[0]
+            try:
+                model_field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                project = False
+                continue
+
+            if not model_field.is_relation or name != model_field.name:
+                # Plain columns, and foreign keys read through their <name>_id column without a join
+                only.add(model_field.name)
+            elif not model_field.concrete or model_field.many_to_many:
+                prefetch_related.add(name)
+            elif isinstance(field, serializers.PrimaryKeyRelatedField) and len(field.source_attrs) == 1:
+                # Rendering the pk only needs the local <name>_id column, not a join
+                only.add(name)
+            else:
+                only.add(name)
+                select_related.add(name)
+
+        return QueryPlan(only=tuple(sorted(only)) if project else None,
+                         select_related=tuple(sorted(select_related)),
+                         prefetch_related=tuple(sorted(prefetch_related)))
+
+    def build_standard_field(self, field_name, model_field):
+        field_class, field_kwargs = super().build_standard_field(field_name, model_field)
+        # Unique columns stay unique across soft-deleted rows, which the default manager hides
+        manager = model_field.model._default_manager
+        if isinstance(manager, SoftDeleteManager) and 'validators' in field_kwargs:
+            field_kwargs['validators'] = [
+                UniqueValidator(queryset=manager.with_deleted(), message=validator.message, lookup=validator.lookup)
+                if isinstance(validator, UniqueValidator) else validator
+                for validator in field_kwargs['validators']
+            ]
+        return field_class, field_kwargs
+
     def get_service(self):
         if self.service_class:
-            return self.service_class()
+            # Services are stateless, so one instance (and its DAO) is shared per serializer class
+            service = type(self).__dict__.get('_service')
+            if service is None:
+                service = self.service_class()
+                type(self)._service = service
+            return service
         raise NotImplementedError("Must set service_class or pass service instance")
 
     def create(self, validated_data):
         return self.service.create(**validated_data)
 
     def update(self, instance, validated_data):
-        return self.service.update(instance, **validated_data)
\ No newline at end of file
+        return self.service.update(instance, **validated_data)
@@ -0,0 +1,103 @@
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, List, Optional, Type, Union
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Model
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.serializers import BaseSerializer
+
+"""
+Module: streaming.py
+Description: Incremental JSON / NDJSON rendering of Dao.find_chunks / afind_chunks output.
+
+Each chunk is serialized with the regular serializer class and rendered with
+DRF's JSONRenderer, so the bytes match a non-streamed Response while peak
+memory stays at one chunk regardless of the result size.
+
+Under ASGI, Django 4.2 reads a sync streaming iterator to the end before
+sending anything. So when the serializer context's request is an ASGI one,
+sync chunks (Dao.find_chunks, e.g. from a sync view) are pulled one at a
+time on the sync thread and streamed as an async iterator.
+"""
+
+
+class _ChunkEncoder:
+    """Serializes and renders one chunk at a time, tracking array separators"""
+
+    def __init__(self, serializer_class: Type[BaseSerializer], ndjson: bool, context: Optional[dict]):
+        self.serializer_class = serializer_class
+        self.ndjson = ndjson
+        self.context = context or {}
+        self.renderer = JSONRenderer()
+        self.first = True
+
+    def encode(self, chunk: List[Model]) -> bytes:
+        data = self.serializer_class(chunk, many=True, context=self.context).data
+        if not data:
+            return b''
+        if self.ndjson:
+            return b''.join(self.renderer.render(item) + b'\n' for item in data)
+        # Drop the brackets of the rendered chunk and splice it into the open array
+        body = self.renderer.render(data)[1:-1]
+        if not self.first:
+            body = b',' + body
+        self.first = False
+        return body
+
+
+def stream_serialized(chunks: Iterable[List[Model]],
+                      serializer_class: Type[BaseSerializer],
+                      ndjson: bool = False,
+                      context: Optional[dict] = None) -> Iterator[bytes]:
+    """Yield one encoded piece per chunk, forming a JSON array or NDJSON lines"""
+    if not ndjson:
+        yield b'['
+    pieces = _ChunkEncoder(serializer_class, ndjson, context)
+    for chunk in chunks:
+        piece = pieces.encode(chunk)
+        if piece:
+            yield piece
+    if not ndjson:
+        yield b']'
+
+
+async def astream_serialized(chunks: AsyncIterable[List[Model]],
+                             serializer_class: Type[BaseSerializer],
+                             ndjson: bool = False,
+                             context: Optional[dict] = None) -> AsyncIterator[bytes]:
+    """Async variant of stream_serialized for chunks from Dao.afind_chunks"""
+    if not ndjson:
+        yield b'['
+    pieces = _ChunkEncoder(serializer_class, ndjson, context)
+    async for chunk in chunks:
+        # Related fields may query the database, which is only allowed from sync code
+        piece = await sync_to_async(pieces.encode)(chunk)
+        if piece:
+            yield piece
+    if not ndjson:
+        yield b']'
+
+
+async def _pull_sync(chunks: Iterable[List[Model]]) -> AsyncIterator[List[Model]]:
+    """Sync chunks as an async iterator, each read on the sync thread that runs the ORM"""
+    iterator = iter(chunks)
+    pull = sync_to_async(next)
+    while True:
+        chunk = await pull(iterator, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+class StreamingSerializerResponse(StreamingHttpResponse):
+    """StreamingHttpResponse writing serialized chunks as they are read from the database"""
+
+    def __init__(self, chunks: Union[Iterable[List[Model]], AsyncIterable[List[Model]]],
+                 serializer_class: Type[BaseSerializer], ndjson: bool = False, context: Optional[dict] = None,
+                 **kwargs):
+        kwargs.setdefault('content_type', 'application/x-ndjson' if ndjson else 'application/json')
+        request = (context or {}).get('request')
+        if not hasattr(chunks, '__aiter__') and isinstance(getattr(request, '_request', request), ASGIRequest):
+            chunks = _pull_sync(chunks)
+        stream = astream_serialized if hasattr(chunks, '__aiter__') else stream_serialized
+        super().__init__(stream(chunks, serializer_class, ndjson=ndjson, context=context), **kwargs)
@@ -1 +1,2 @@
 from .base_service import ReadService, WriteService
+from .unit_of_work import UnitOfWork, unit_of_work
@@ -1,8 +1,12 @@
 from abc import ABC, abstractmethod
-from typing import Type, Optional, Dict, List, Any
+from typing import Type, Optional, Dict, List, Any, Iterable, Iterator, AsyncIterator, Union
+from asgiref.sync import sync_to_async
 from django.db import transaction
 from django.db.models import Model, QuerySet
-from core.dao import Dao
+from django.utils.functional import cached_property
+from core.dao import Dao, Page, QueryPlan, Version
+from core.instrumentation import instrument_methods
+from .unit_of_work import UnitOfWork
 
 
 """
@@ -23,25 +27,38 @@ class Service(ABC):
     Provides automatic access to dao instance.
     """
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        instrument_methods(cls, 'service')
+
     @property
     @abstractmethod
     def dao_cls(self) -> Type[Dao]:
         """Return the DAO class associated with this service"""
         pass
 
-    @property
+    @cached_property
     def dao(self) -> Dao:
-        """Create a DAO instance automatically"""
+        """DAO instance, created on first access and reused for the service's lifetime"""
         return self.dao_cls()
 
 
 class ReadService(Service, ABC):
     """Base read-only service providing query methods"""
 
+    @cached_property
+    def dao(self) -> Dao:
+        """DAO instance whose reads may be routed to a read replica"""
+        return self.dao_cls(read_replica=True)
+
     def get(self, pk: int) -> Optional[Model]:
         """Get object by primary key"""
         return self.dao.get(pk)
 
+    def get_many(self, pks: Iterable[Any]) -> List[Optional[Model]]:
+        """Objects for pks in input order (None where missing), batched, see Dao.get_many"""
+        return self.dao.get_many(pks)
+
     def list_all(self, include_deleted: bool = False) -> QuerySet[Model]:
         """List all objects"""
         return self.dao.all(include_deleted=include_deleted)
@@ -55,8 +72,38 @@ class ReadService(Service, ABC):
     def find_queryset(self,
                       filter_kwargs: Optional[Dict] = None,
                       exclude_kwargs: Optional[Dict] = None,
-                      order_bys: Optional[List[str]] = None) -> QuerySet[Model]:
-        return self.dao.find_queryset(filter_kwargs, exclude_kwargs, order_bys)
+                      order_bys: Optional[List[str]] = None,
+                      plan: Optional[QueryPlan] = None) -> QuerySet[Model]:
+        return self.dao.find_queryset(filter_kwargs, exclude_kwargs, order_bys, plan)
+
+    def find_page(self,
+                  filter_kwargs: Optional[Dict] = None,
+                  exclude_kwargs: Optional[Dict] = None,
+                  order_bys: Optional[List[str]] = None,
+                  after: Optional[str] = None,
+                  before: Optional[str] = None,
+                  limit: Optional[int] = None,
+                  plan: Optional[QueryPlan] = None) -> Page:
+        """Keyset-paginated query, see Dao.find_page"""
+        return self.dao.find_page(filter_kwargs, exclude_kwargs, order_bys,
+                                  after=after, before=before, limit=limit, plan=plan)
+
+    def find_chunks(self,
+                    filter_kwargs: Optional[Dict] = None,
+                    exclude_kwargs: Optional[Dict] = None,
+                    order_bys: Optional[List[str]] = None,
+                    chunk_size: Optional[int] = None,
+                    plan: Optional[QueryPlan] = None) -> Iterator[List[Model]]:
+        """Stream query results in chunks, see Dao.find_chunks"""
+        return self.dao.find_chunks(filter_kwargs, exclude_kwargs, order_bys, chunk_size=chunk_size, plan=plan)
+
+    def find_rows(self,
+                  filter_kwargs: Optional[Dict] = None,
+                  exclude_kwargs: Optional[Dict] = None,
+                  order_bys: Optional[List[str]] = None,
+                  fields: Optional[List[str]] = None) -> List[tuple]:
+        """Read-only row records instead of model instances, see Dao.find_rows"""
+        return self.dao.find_rows(filter_kwargs, exclude_kwargs, order_bys, fields)
 
     def exists(self,
                filter_kwargs: Optional[Dict] = None,
@@ -65,47 +112,187 @@ class ReadService(Service, ABC):
 
     def count(self,
               filter_kwargs: Optional[Dict] = None,
-              exclude_kwargs: Optional[Dict] = None) -> int:
-        return self.dao.get_count(filter_kwargs, exclude_kwargs)
+              exclude_kwargs: Optional[Dict] = None,
+              mode: str = Dao.COUNT_EXACT) -> int:
+        """Row count; mode is Dao.COUNT_EXACT, COUNT_CACHED or COUNT_ESTIMATED"""
+        return self.dao.get_count(filter_kwargs, exclude_kwargs, mode)
+
+    def version(self,
+                filter_kwargs: Optional[Dict] = None,
+                exclude_kwargs: Optional[Dict] = None) -> Optional[Version]:
+        """Change validator (newest timestamp + count) of a result set, see Dao.get_version"""
+        return self.dao.get_version(filter_kwargs, exclude_kwargs)
+
+    def object_version(self, pk: Any) -> Optional[Version]:
+        return self.dao.get_object_version(pk)
+
+    async def aget(self, pk: int) -> Optional[Model]:
+        return await self.dao.aget(pk)
+
+    async def aget_many(self, pks: Iterable[Any]) -> List[Optional[Model]]:
+        return await self.dao.aget_many(pks)
+
+    async def afind_one(self,
+                        filter_kwargs: Optional[Dict] = None,
+                        exclude_kwargs: Optional[Dict] = None,
+                        order_bys: Optional[List[str]] = None) -> Optional[Model]:
+        return await self.dao.afind_one(filter_kwargs, exclude_kwargs, order_bys)
+
+    async def afind_page(self,
+                         filter_kwargs: Optional[Dict] = None,
+                         exclude_kwargs: Optional[Dict] = None,
+                         order_bys: Optional[List[str]] = None,
+                         after: Optional[str] = None,
+                         before: Optional[str] = None,
+                         limit: Optional[int] = None,
+                         plan: Optional[QueryPlan] = None) -> Page:
+        return await self.dao.afind_page(filter_kwargs, exclude_kwargs, order_bys,
+                                         after=after, before=before, limit=limit, plan=plan)
+
+    def afind_chunks(self,
+                     filter_kwargs: Optional[Dict] = None,
+                     exclude_kwargs: Optional[Dict] = None,
+                     order_bys: Optional[List[str]] = None,
+                     chunk_size: Optional[int] = None,
+                     plan: Optional[QueryPlan] = None) -> AsyncIterator[List[Model]]:
+        return self.dao.afind_chunks(filter_kwargs, exclude_kwargs, order_bys, chunk_size=chunk_size, plan=plan)
+
+    async def afind_rows(self,
+                         filter_kwargs: Optional[Dict] = None,
+                         exclude_kwargs: Optional[Dict] = None,
+                         order_bys: Optional[List[str]] = None,
+                         fields: Optional[List[str]] = None) -> List[tuple]:
+        return await self.dao.afind_rows(filter_kwargs, exclude_kwargs, order_bys, fields)
+
+    async def aexists(self,
+                      filter_kwargs: Optional[Dict] = None,
+                      exclude_kwargs: Optional[Dict] = None) -> bool:
+        return await self.dao.adoes_exist(filter_kwargs, exclude_kwargs)
+
+    async def acount(self,
+                     filter_kwargs: Optional[Dict] = None,
+                     exclude_kwargs: Optional[Dict] = None,
+                     mode: str = Dao.COUNT_EXACT) -> int:
+        return await self.dao.aget_count(filter_kwargs, exclude_kwargs, mode)
+
+    async def aversion(self,
+                       filter_kwargs: Optional[Dict] = None,
+                       exclude_kwargs: Optional[Dict] = None) -> Optional[Version]:
+        return await self.dao.aget_version(filter_kwargs, exclude_kwargs)
+
+    async def aobject_version(self, pk: Any) -> Optional[Version]:
+        return await self.dao.aget_object_version(pk)
 
 
 class WriteService(Service, ABC):
-    """Base write/mutation service"""
+    """
+    Base write/mutation service. Inside core.service.unit_of_work() create,
+    update, delete and soft_delete are recorded and flushed in bulk at the
+    end of the block instead of writing right away.
+    """
 
-    @transaction.atomic
     def create(self, data: Dict[str, Any]) -> Optional[Model]:
         """Create a new object"""
-        return self.dao.save(data)
+        uow = UnitOfWork.current()
+        if uow is not None:
+            return uow.create(self.dao, data)
+        with transaction.atomic():
+            return self.dao.save(data)
 
-    @transaction.atomic
     def update(self, obj: Model, data: Optional[Dict[str, Any]] = None) -> bool:
         """Update an existing object"""
         if data:
             for key, value in data.items():
                 setattr(obj, key, value)
-        return self.dao.update(obj)
+        uow = UnitOfWork.current()
+        if uow is not None:
+            return uow.update(self.dao, obj)
+        with transaction.atomic():
+            return self.dao.update(obj)
 
-    @transaction.atomic
     def delete(self, obj: Model) -> bool:
         """Hard delete"""
-        return self.dao.delete(obj)
+        uow = UnitOfWork.current()
+        if uow is not None:
+            return uow.delete(self.dao, obj)
+        with transaction.atomic():
+            return self.dao.delete(obj)
 
-    @transaction.atomic
-    def soft_delete(self, obj: Model) -> bool:
+    def soft_delete(self, obj: Model, by_user: Optional[Model] = None) -> bool:
         """Soft delete"""
-        return self.dao.soft_delete(obj)
+        uow = UnitOfWork.current()
+        if uow is not None:
+            return uow.soft_delete(self.dao, obj, by_user=by_user)
+        with transaction.atomic():
+            return self.dao.soft_delete(obj, by_user=by_user)
 
     @transaction.atomic
-    def create_batch(self, objs: List[Model], batch_size: Optional[int] = None) -> bool:
-        """Create multiple objects in bulk"""
-        return self.dao.save_batch(objs, batch_size=batch_size)
+    def soft_delete_batch(self, objs_or_filter: Union[List[Model], Dict[str, Any]],
+                          by_user: Optional[Model] = None) -> bool:
+        """Soft delete a list of objects or every row matching a filter in bulk"""
+        return self.dao.soft_delete_batch(objs_or_filter, by_user=by_user)
+
+    # No service-level atomic block here: Dao.save_batch / upsert_batch open
+    # their own transactions according to transaction_mode.
+
+    def create_batch(self, objs: Iterable[Model], batch_size: Optional[int] = None,
+                     transaction_mode: str = Dao.TRANSACTION_RUN) -> bool:
+        """
+        Create objects from any iterable in bulk, chunk by chunk. With the default
+        Dao.TRANSACTION_RUN the whole run is one transaction; Dao.TRANSACTION_CHUNK
+        commits each chunk on its own, so a failing chunk leaves the chunks before
+        it written (for imports too large for one transaction)
+        """
+        return self.dao.save_batch(objs, batch_size=batch_size, transaction_mode=transaction_mode)
+
+    def upsert_batch(self, objs: Iterable[Model], unique_fields: List[str],
+                     update_fields: Optional[List[str]] = None, batch_size: Optional[int] = None,
+                     transaction_mode: str = Dao.TRANSACTION_RUN) -> bool:
+        """Create objects, updating the rows that conflict on unique_fields (transactions as create_batch)"""
+        return self.dao.upsert_batch(objs, unique_fields, update_fields, batch_size=batch_size,
+                                     transaction_mode=transaction_mode)
 
     @transaction.atomic
-    def update_batch(self, objs: List[Model]) -> bool:
-        """Update multiple objects"""
-        return self.dao.update_batch(objs)
+    def update_batch(self, objs: List[Model], batch_size: Optional[int] = None) -> bool:
+        """Update multiple objects, writing only their changed fields"""
+        return self.dao.update_batch(objs, batch_size=batch_size)
 
     @transaction.atomic
-    def delete_batch(self, objs: List[Model]) -> bool:
+    def delete_batch(self, objs: List[Model], batch_size: Optional[int] = None) -> bool:
         """Delete multiple objects"""
-        return self.dao.delete_batch(objs)
+        return self.dao.delete_batch(objs, batch_size=batch_size)
+
+    # Async counterparts. Django has no async transaction API, so each runs its
+    # sync sibling (and its transaction.atomic block) in one thread hop.
+
+    async def acreate(self, data: Dict[str, Any]) -> Optional[Model]:
+        return await sync_to_async(self.create)(data)
+
+    async def aupdate(self, obj: Model, data: Optional[Dict[str, Any]] = None) -> bool:
+        return await sync_to_async(self.update)(obj, data)
+
+    async def adelete(self, obj: Model) -> bool:
+        return await sync_to_async(self.delete)(obj)
+
+    async def asoft_delete(self, obj: Model, by_user: Optional[Model] = None) -> bool:
+        return await sync_to_async(self.soft_delete)(obj, by_user=by_user)
+
+    async def asoft_delete_batch(self, objs_or_filter: Union[List[Model], Dict[str, Any]],
+                                 by_user: Optional[Model] = None) -> bool:
+        return await sync_to_async(self.soft_delete_batch)(objs_or_filter, by_user=by_user)
+
+    async def acreate_batch(self, objs: Iterable[Model], batch_size: Optional[int] = None,
+                            transaction_mode: str = Dao.TRANSACTION_RUN) -> bool:
+        return await sync_to_async(self.create_batch)(objs, batch_size=batch_size, transaction_mode=transaction_mode)
+
+    async def aupsert_batch(self, objs: Iterable[Model], unique_fields: List[str],
+                            update_fields: Optional[List[str]] = None, batch_size: Optional[int] = None,
+                            transaction_mode: str = Dao.TRANSACTION_RUN) -> bool:
+        return await sync_to_async(self.upsert_batch)(objs, unique_fields, update_fields, batch_size=batch_size,
+                                                      transaction_mode=transaction_mode)
+
+    async def aupdate_batch(self, objs: List[Model], batch_size: Optional[int] = None) -> bool:
+        return await sync_to_async(self.update_batch)(objs, batch_size=batch_size)
+
+    async def adelete_batch(self, objs: List[Model], batch_size: Optional[int] = None) -> bool:
+        return await sync_to_async(self.delete_batch)(objs, batch_size=batch_size)
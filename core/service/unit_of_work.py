@@ -0,0 +1,164 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Dict, Any, List, Iterator
+from django.db import transaction
+from django.db.models import Model
+from core.dao import Dao
+
+"""
+Module: unit_of_work.py
+Description: Unit of work for WriteService calls.
+
+Inside ``with unit_of_work():`` WriteService.create / update / delete /
+soft_delete record their objects instead of writing them, one entry per
+object (by pk, or identity while unsaved), and the block's exit flushes
+everything in a single transaction:
+
+    inserts   Dao.save_batch (bulk_create), in the order models were first seen
+    updates   Dao.update_batch (bulk_update, one statement group per distinct
+              set of changed fields); soft deletes are updates of their fields
+    deletes   Dao.delete_batch (pk IN), models in reverse order
+
+Recording collapses sequences: an object created then updated is inserted
+once with its final state, created then deleted never reaches the database,
+and a deleted object's pending update is dropped. Updates through another
+instance of a pending row merge that instance's changed fields onto the
+recorded one (later calls win per field); without change tracking to tell
+which fields changed, a second instance raises ValueError instead. Service calls return as if
+the write had happened, but reads inside the block do not see pending writes
+and database errors (constraints, ...) surface at the flush. A block that
+raises discards its pending writes. Nested blocks join the outer one.
+Ref:
+    1. https://martinfowler.com/eaaCatalog/unitOfWork.html
+"""
+
+_current: ContextVar[Optional['UnitOfWork']] = ContextVar('unit_of_work', default=None)
+
+
+class _ModelWork:
+    """Pending writes of one model"""
+
+    def __init__(self, dao: Dao):
+        self.dao = dao
+        self.new: Dict[Any, Model] = {}
+        self.dirty: Dict[Any, Model] = {}
+        self.deleted: Dict[Any, Model] = {}
+        # Other instances of dirty rows, whose changes were merged onto the recorded one
+        self.merged: List[Model] = []
+
+
+class UnitOfWork:
+    """Writes recorded per model and flushed together"""
+
+    def __init__(self, using: Optional[str] = None):
+        self.using = using
+        # model label -> pending writes, in the order models were first seen
+        self._work: Dict[str, _ModelWork] = {}
+
+    @staticmethod
+    def current() -> Optional['UnitOfWork']:
+        return _current.get()
+
+    @staticmethod
+    def _key(obj: Model) -> Any:
+        return obj.pk if obj.pk is not None else id(obj)
+
+    def _for(self, dao: Dao) -> _ModelWork:
+        label = dao.model._meta.label_lower
+        if label not in self._work:
+            self._work[label] = _ModelWork(dao)
+        return self._work[label]
+
+    def create(self, dao: Dao, data: Dict[str, Any]) -> Optional[Model]:
+        if not data:
+            return None
+        obj = dao.model_cls(**data)
+        self._for(dao).new[self._key(obj)] = obj
+        return obj
+
+    def update(self, dao: Dao, obj: Optional[Model]) -> bool:
+        if not obj:
+            return False
+        work, key = self._for(dao), self._key(obj)
+        if key in work.deleted:
+            return False
+        if key in work.new:
+            return True
+        recorded = work.dirty.setdefault(key, obj)
+        if recorded is not obj:
+            self._merge(recorded, obj)
+            work.merged.append(obj)
+        return True
+
+    @staticmethod
+    def _merge(recorded: Model, obj: Model) -> None:
+        """Copy the fields ``obj`` changed onto ``recorded``, the pending instance of the same row"""
+        get_dirty_fields = getattr(obj, 'get_dirty_fields', None)
+        fields = get_dirty_fields() if get_dirty_fields else None
+        if fields is None:
+            raise ValueError(f'{obj._meta.label} {obj.pk} already has a pending update from another instance, '
+                             f'and without change tracking the two cannot be merged')
+        for name in fields:
+            attname = obj._meta.get_field(name).attname
+            setattr(recorded, attname, getattr(obj, attname))
+
+    def soft_delete(self, dao: Dao, obj: Optional[Model], by_user: Optional[Model] = None) -> bool:
+        return dao.mark_soft_deleted(obj, by_user) and self.update(dao, obj)
+
+    def delete(self, dao: Dao, obj: Optional[Model]) -> bool:
+        if not obj:
+            return False
+        work, key = self._for(dao), self._key(obj)
+        work.dirty.pop(key, None)
+        if work.new.pop(key, None) is None:
+            work.deleted[key] = obj
+        return True
+
+    @property
+    def pending(self) -> Dict[str, int]:
+        """Number of objects waiting to be inserted, updated and deleted"""
+        works = self._work.values()
+        return {
+            'new': sum(len(work.new) for work in works),
+            'dirty': sum(len(work.dirty) for work in works),
+            'deleted': sum(len(work.deleted) for work in works),
+        }
+
+    def flush(self) -> None:
+        """Write everything recorded so far in one transaction"""
+        works: List[_ModelWork] = list(self._work.values())
+        self._work = {}
+        with transaction.atomic(using=self.using):
+            for work in works:
+                if work.new:
+                    work.dao.save_batch(work.new.values())
+            for work in works:
+                if work.dirty:
+                    work.dao.update_batch(list(work.dirty.values()))
+                for obj in work.merged:
+                    obj.mark_clean()
+            for work in reversed(works):
+                if work.deleted:
+                    work.dao.delete_batch(list(work.deleted.values()))
+
+    def discard(self) -> None:
+        self._work = {}
+
+
+@contextmanager
+def unit_of_work(using: Optional[str] = None) -> Iterator[UnitOfWork]:
+    """Record WriteService writes made in the block and flush them on exit"""
+    outer = _current.get()
+    if outer is not None:
+        yield outer
+        return
+    uow = UnitOfWork(using)
+    token = _current.set(uow)
+    try:
+        yield uow
+    except BaseException:
+        uow.discard()
+        raise
+    finally:
+        _current.reset(token)
+    uow.flush()
@@ -0,0 +1,39 @@
+from typing import List
+from django.contrib.auth.hashers import make_password
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from apps.users.models import User
+from core.dao import ObjectCache
+
+PASSWORD = 'test-password'
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class DaoTestCase(TestCase):
+    """
+    TestCase for code backed by the DAO layer. Object caches, counters and
+    generations live outside the test transaction, so they are cleared around
+    every test; passwords use a fast hasher.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.clear_caches()
+        self.addCleanup(self.clear_caches)
+
+    @staticmethod
+    def clear_caches() -> None:
+        for cache in caches.all():
+            cache.clear()
+        for cache in ObjectCache.all_for_model(User):
+            cache.clear()
+
+    @staticmethod
+    def make_users(count: int, prefix: str = 'user') -> List[User]:
+        """``count`` users named <prefix>NNN@test.local, in email order"""
+        hashed, now = make_password(PASSWORD), timezone.now()
+        User.objects.bulk_create([User(email=f'{prefix}{index:03d}@test.local', first_name='First',
+                                       last_name=str(index), password=hashed, last_pass_change=now)
+                                  for index in range(count)])
+        return list(User.objects.filter(email__startswith=prefix).order_by('email'))
@@ -0,0 +1,100 @@
+from asgiref.sync import sync_to_async
+from django.urls import reverse
+from apps.users.dao import UserDAO
+from apps.users.services import UserReadService, UserWriteService
+from core.tests import PASSWORD
+from . import DaoTestCase
+
+
+class AsyncDaoTests(DaoTestCase):
+    """The async DAO and service methods return what their sync siblings do"""
+
+    def setUp(self):
+        super().setUp()
+        self.dao = UserDAO()
+        self.users = self.make_users(5)
+
+    async def test_reads_match_the_sync_methods(self):
+        user = self.users[0]
+        self.assertEqual(await self.dao.aget(user.pk), user)
+        self.assertEqual(await self.dao.afind_one({'email': user.email}), user)
+        self.assertTrue(await self.dao.adoes_exist({'pk': user.pk}))
+        self.assertEqual(await self.dao.aget_count(), 5)
+        self.assertEqual(await self.dao.afind_rows(order_bys=['email'], fields=['email']),
+                         await sync_to_async(self.dao.find_rows)(order_bys=['email'], fields=['email']))
+
+        page = await self.dao.afind_page(order_bys=['email'], limit=3)
+        self.assertEqual(list(page), self.users[:3])
+        page = await self.dao.afind_page(order_bys=['email'], after=page.next_cursor, limit=3)
+        self.assertEqual(list(page), self.users[3:])
+
+    async def test_chunks(self):
+        chunks = [chunk async for chunk in self.dao.afind_chunks(order_bys=['email'], chunk_size=2)]
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        self.assertEqual(sum(chunks, []), self.users)
+
+    async def test_service_reads(self):
+        service = UserReadService()
+        self.assertEqual(await service.aget(self.users[1].pk), self.users[1])
+        self.assertEqual(await service.acount({'last_name': '1'}), 1)
+        self.assertEqual((await service.aget_users_page(limit=2)).objects, self.users[:2])
+        self.assertEqual(await service.aversion(), await sync_to_async(service.version)())
+
+    async def test_writes(self):
+        service = UserWriteService()
+        user = self.users[0]
+        self.assertTrue(await service.aupdate(user, {'first_name': 'Changed'}))
+        self.assertEqual((await self.dao.aget(user.pk)).first_name, 'Changed')
+        self.assertTrue(await service.asoft_delete(user))
+        self.assertIsNone(await self.dao.aget(user.pk))
+        self.assertTrue(await service.adelete_batch(self.users[1:3]))
+        self.assertEqual(await self.dao.aget_count(), 2)
+
+
+class AsyncViewTests(DaoTestCase):
+    """The /async/ views answer like their DRF counterparts"""
+
+    def setUp(self):
+        super().setUp()
+        self.users = self.make_users(3)
+
+    async def test_users_page_matches_the_sync_view(self):
+        for params in ({'limit': 2}, {}):
+            response = await self.async_client.get(reverse('users-async'), params)
+            self.assertEqual(response.status_code, 200)
+            expected = await sync_to_async(self.client.get)(reverse('users'), params)
+            self.assertEqual(response.json(), expected.json())
+
+    async def test_bad_parameters(self):
+        for params in ({'limit': 'ten'}, {'after': 'garbage'}, {'stream': 'xml'}):
+            response = await self.async_client.get(reverse('users-async'), params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn('detail', response.json())
+
+    async def test_not_modified(self):
+        etag = (await self.async_client.get(reverse('users-async')))['ETag']
+        response = await self.async_client.get(reverse('users-async'), headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+    async def test_login(self):
+        url = reverse('login-async')
+        response = await self.async_client.post(url, {'email': self.users[0].email, 'password': PASSWORD},
+                                                content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()), {'access_token', 'refresh_token'})
+
+        response = await self.async_client.post(url, {'email': self.users[0].email, 'password': 'wrong'},
+                                                content_type='application/json')
+        self.assertEqual(response.status_code, 401)
+
+    async def test_login_rejects_bad_bodies(self):
+        url = reverse('login-async')
+        for body in (b'{', b'[]', b'{"email": "a@test.local"}'):
+            response = await self.async_client.post(url, body, content_type='application/json')
+            self.assertEqual(response.status_code, 400, body)
+
+    async def test_login_needs_no_csrf_token(self):
+        self.async_client.handler.enforce_csrf_checks = True
+        response = await self.async_client.post(reverse('login-async'), {'email': 'x', 'password': 'y'},
+                                                content_type='application/json')
+        self.assertEqual(response.status_code, 401)
@@ -0,0 +1,122 @@
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from apps.users.dao import UserDAO
+from apps.users.models import User
+from apps.users.services import UserWriteService
+from core.dao import Dao, ObjectCache
+from . import DaoTestCase
+
+
+class BatchWriteTests(DaoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.dao = UserDAO()
+        self.existing = self.make_users(2)
+        self.now = timezone.now()
+
+    def new_users(self, count, start=0, prefix='new'):
+        for index in range(start, start + count):
+            yield User(email=f'{prefix}{index:03d}@test.local', first_name='New', last_pass_change=self.now)
+
+    def inserts(self, queries):
+        return [query['sql'] for query in queries.captured_queries if query['sql'].startswith('INSERT')]
+
+    def count(self):
+        # The read commits, as in autocommit, which primes the live-row counter
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.dao.get_count()
+
+    def assertCountsMatch(self):
+        self.assertEqual(self.count(), User.objects.count())
+
+    def test_exactly_one_chunk(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(self.dao.save_batch(self.new_users(3), batch_size=3))
+        self.assertEqual(len(self.inserts(queries)), 1)
+        self.assertEqual(User.objects.filter(email__startswith='new').count(), 3)
+
+    def test_one_past_a_chunk(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(self.dao.save_batch(self.new_users(4), batch_size=3))
+        self.assertEqual(len(self.inserts(queries)), 2)
+        self.assertEqual(User.objects.filter(email__startswith='new').count(), 4)
+
+    def test_empty_input_writes_nothing(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertFalse(self.dao.save_batch(self.new_users(0), batch_size=3))
+        self.assertEqual(self.inserts(queries), [])
+
+    def test_generators_are_consumed_chunk_by_chunk(self):
+        consumed, seen_at_write = [], []
+
+        def users():
+            for user in self.new_users(5):
+                consumed.append(user)
+                yield user
+
+        insert = self.dao._insert_chunk
+        self.dao._insert_chunk = lambda chunk: seen_at_write.append(len(consumed)) or insert(chunk)
+        self.dao.save_batch(users(), batch_size=2)
+        self.assertEqual(seen_at_write, [2, 4, 5])
+
+    def test_inserted_objects_are_clean(self):
+        users = list(self.new_users(2))
+        self.dao.save_batch(users, batch_size=1)
+        self.assertTrue(all(user.get_dirty_fields() == set() for user in users))
+
+    def test_upsert_updates_conflicting_rows(self):
+        conflicting = User(email=self.existing[0].email, first_name='Upserted', last_name='Upserted',
+                           last_pass_change=self.now)
+        self.dao.upsert_batch([conflicting, *self.new_users(2)], unique_fields=['email'], batch_size=2)
+        row = User.objects.get(pk=self.existing[0].pk)
+        self.assertEqual((row.first_name, row.last_name), ('Upserted', 'Upserted'))
+        self.assertGreater(row.updated_at, self.existing[0].updated_at)
+        self.assertEqual(User.objects.count(), 4)
+
+    def test_upsert_limited_to_update_fields(self):
+        conflicting = User(email=self.existing[0].email, first_name='Upserted', last_name='Upserted',
+                           last_pass_change=self.now)
+        self.dao.upsert_batch([conflicting], unique_fields=['email'], update_fields=['first_name'])
+        row = User.objects.get(pk=self.existing[0].pk)
+        self.assertEqual((row.first_name, row.last_name), ('Upserted', '0'))
+
+    def test_chunked_writes_keep_counts_and_caches_current(self):
+        cached = self.dao.get(self.existing[0].pk)
+        self.assertEqual(self.count(), 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dao.save_batch(self.new_users(5), batch_size=2)
+        self.assertCountsMatch()
+        # A multi-chunk run drops the model's whole cache
+        self.assertIsNone(ObjectCache.registered(User).get('pk', cached.pk))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dao.upsert_batch([User(email=self.existing[1].email, last_pass_change=self.now),
+                                   *self.new_users(3, start=5)], unique_fields=['email'], batch_size=2)
+        self.assertCountsMatch()
+
+    def test_failing_chunk_rolls_back_the_run(self):
+        self.count()
+        users = [*self.new_users(2), *self.new_users(1, prefix='dup'), *self.new_users(1, prefix='dup')]
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(IntegrityError):
+                UserWriteService().create_batch(users, batch_size=2)
+        self.assertEqual(User.objects.count(), 2)
+        self.assertCountsMatch()
+
+    def test_failing_chunk_keeps_earlier_chunks_per_chunk(self):
+        self.count()
+        users = [*self.new_users(2), *self.new_users(1, prefix='dup'), *self.new_users(1, prefix='dup'),
+                 *self.new_users(2, start=2)]
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(IntegrityError):
+                UserWriteService().create_batch(users, batch_size=2, transaction_mode=Dao.TRANSACTION_CHUNK)
+        # The first chunk stays, the failing one and those after it are not written
+        self.assertEqual(sorted(User.objects.filter(first_name='New').values_list('email', flat=True)),
+                         ['new000@test.local', 'new001@test.local'])
+        self.assertCountsMatch()
+
+    def test_unknown_transaction_mode(self):
+        with self.assertRaises(ValueError):
+            self.dao.save_batch(self.new_users(1), transaction_mode='never')
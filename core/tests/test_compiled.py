@@ -0,0 +1,113 @@
+import datetime
+from django.contrib.auth.models import Group
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework import serializers
+from apps.users.models import User
+from apps.users.serializers import UserSerializer
+from apps.users.services import UserReadService
+from core.serializers.compiled import CompiledListSerializer, compiled_representation, fast_method
+from core.serializers.service_serializer import ServiceSerializer
+from . import DaoTestCase
+
+
+class SlowMethodSerializer(ServiceSerializer):
+    service_class = UserReadService
+    initials = serializers.SerializerMethodField()
+
+    class Meta:
+        fields = ('id', 'email', 'initials')
+        list_serializer_class = CompiledListSerializer
+
+    def get_initials(self, obj):
+        return obj.first_name[:1] + obj.last_name[:1]
+
+
+class NestedSerializer(ServiceSerializer):
+    service_class = UserReadService
+    created_by = SlowMethodSerializer(read_only=True)
+
+    class Meta:
+        fields = ('id', 'email', 'created_by')
+        list_serializer_class = CompiledListSerializer
+
+
+class ConvertedFieldsSerializer(ServiceSerializer):
+    service_class = UserReadService
+    joined = serializers.DateTimeField(source='date_joined', format='%Y-%m-%d')
+    expires = serializers.DecimalField(source='access_expiration_delta', max_digits=6, decimal_places=1)
+    flag = serializers.BooleanField(source='inactive', allow_null=True)
+    hex_username = serializers.UUIDField(source='username', format='hex')
+    label = serializers.SerializerMethodField()
+
+    class Meta:
+        fields = ('id', 'joined', 'expires', 'flag', 'hex_username', 'label', 'last_login', 'profile_picture')
+        list_serializer_class = CompiledListSerializer
+
+    @fast_method
+    def get_label(self, obj):
+        return self.context.get('prefix', '') + obj.email
+
+
+class CompiledListSerializerTests(DaoTestCase):
+    """The compiled fast path renders exactly what DRF's ListSerializer does"""
+
+    def setUp(self):
+        super().setUp()
+        self.users = self.make_users(4)
+        group = Group.objects.create(name='staff')
+        self.users[0].groups.add(group)
+        User.objects.filter(pk=self.users[1].pk).update(
+            last_login=datetime.datetime(2024, 3, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+            inactive=None, auth_token='token', created_by=self.users[0], profile_picture='profile_pictures/a.png')
+        User.objects.filter(pk=self.users[2].pk).update(
+            date_joined=datetime.datetime(2024, 6, 1, 8, 0, tzinfo=datetime.timezone(datetime.timedelta(hours=5))))
+
+    def rows(self):
+        return list(User.objects.with_deleted().order_by('email').prefetch_related('groups', 'user_permissions'))
+
+    def assertMatchesDrf(self, serializer_class, instance, **kwargs):
+        compiled = serializer_class(instance, many=True, **kwargs)
+        stock = serializers.ListSerializer(instance, child=serializer_class(**kwargs), **kwargs)
+        self.assertEqual(compiled.data, stock.data)
+        return compiled
+
+    def test_user_serializer_is_compiled(self):
+        compiled = self.assertMatchesDrf(UserSerializer, self.rows())
+        self.assertIsNotNone(compiled_representation(compiled.child))
+        self.assertEqual(compiled.data[0]['groups'], list(self.users[0].groups.values_list('pk', flat=True)))
+        self.assertEqual(compiled.data[1]['last_login'], '2024-03-01T12:30:15.123456Z')
+        self.assertIsNone(compiled.data[1]['inactive'])
+
+    def test_querysets_without_prefetching(self):
+        self.assertMatchesDrf(UserSerializer, User.objects.order_by('email'))
+
+    @override_settings(TIME_ZONE='Asia/Kolkata')
+    def test_other_time_zones(self):
+        timezone.activate('America/New_York')
+        self.addCleanup(timezone.deactivate)
+        compiled = self.assertMatchesDrf(UserSerializer, self.rows())
+        self.assertTrue(compiled.data[1]['last_login'].endswith('-05:00'))
+
+    def test_converted_fields_and_context(self):
+        compiled = self.assertMatchesDrf(ConvertedFieldsSerializer, self.rows(), context={'prefix': '> '})
+        self.assertIsNotNone(compiled_representation(compiled.child))
+        self.assertEqual(compiled.data[0]['label'], '> ' + self.users[0].email)
+
+    def test_unsaved_instances(self):
+        self.assertMatchesDrf(UserSerializer, [User(email='new@test.local', last_pass_change=timezone.now())])
+
+    def test_related_managers(self):
+        creator = self.users[0]
+        self.assertMatchesDrf(UserSerializer, creator.user_created)
+
+    def test_uncompilable_layouts_fall_back_to_drf(self):
+        for serializer_class in (SlowMethodSerializer, NestedSerializer):
+            compiled = self.assertMatchesDrf(serializer_class, self.rows())
+            self.assertIsNone(compiled_representation(compiled.child), serializer_class.__name__)
+
+    def test_layouts_compile_once(self):
+        first = compiled_representation(UserSerializer(many=True).child)
+        second = compiled_representation(UserSerializer(many=True).child)
+        self.assertIsNot(first, second)  # bound per serializer
+        self.assertIs(first.__code__, second.__code__)
@@ -0,0 +1,49 @@
+from django.contrib.auth.models import Group
+from django.urls import reverse
+from apps.users.dao import UserDAO
+from apps.users.models import User
+from . import DaoTestCase
+
+
+class ConditionalGetTests(DaoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.dao = UserDAO()
+        self.user, self.other = self.make_users(2)
+        self.group = Group.objects.create(name='staff')
+        self.list_url = reverse('users')
+        self.detail_url = reverse('user-detail', args=[self.user.pk])
+
+    def assertStatusAfter(self, status_code, change):
+        list_etag = self.client.get(self.list_url)['ETag']
+        detail_etag = self.client.get(self.detail_url)['ETag']
+        change()
+        self.assertEqual(self.client.get(self.list_url, HTTP_IF_NONE_MATCH=list_etag).status_code, status_code)
+        self.assertEqual(self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=detail_etag).status_code, status_code)
+
+    def test_unchanged_rows_are_not_modified(self):
+        self.assertStatusAfter(304, lambda: None)
+
+    def test_field_change(self):
+        self.assertStatusAfter(200, lambda: self.dao.update_batch_by_query({'pk': self.user.pk}, {},
+                                                                           {'first_name': 'Changed'}))
+
+    def test_relation_added(self):
+        user = User.objects.get(pk=self.user.pk)
+        self.assertStatusAfter(200, lambda: user.groups.add(self.group))
+        self.assertEqual(user.get_dirty_fields(), set())
+        self.assertEqual(user.updated_at, User.objects.get(pk=user.pk).updated_at)
+
+    def test_relation_added_from_the_other_side(self):
+        self.assertStatusAfter(200, lambda: self.group.user_set.add(self.user))
+
+    def test_relations_cleared_from_the_other_side(self):
+        self.group.user_set.add(self.user)
+        before = User.objects.get(pk=self.other.pk).updated_at
+        self.assertStatusAfter(200, self.group.user_set.clear)
+        self.assertEqual(User.objects.get(pk=self.other.pk).updated_at, before)
+
+    def test_adding_an_existing_relation_changes_nothing(self):
+        self.user.groups.add(self.group)
+        self.assertStatusAfter(304, lambda: self.user.groups.add(self.group))
@@ -0,0 +1,139 @@
+from django.db import connection, transaction
+from django.utils import timezone
+from apps.users.dao import UserDAO
+from apps.users.models import User
+from core.dao.counts import COUNT_CACHED, COUNT_ESTIMATED, COUNT_EXACT, estimate_count
+from . import DaoTestCase
+
+MODES = (COUNT_EXACT, COUNT_CACHED, COUNT_ESTIMATED)
+
+
+class CountModeTests(DaoTestCase):
+    """Every count mode of the counted live-row filter agrees with COUNT(*) after every write path"""
+
+    def setUp(self):
+        super().setUp()
+        self.dao = UserDAO()
+        self.users = self.make_users(6)
+        self.counter_key = self.dao.count_cache._key('counter', next(iter(self.dao.count_cache.counters)))
+        self.assertCountsMatch()  # primes the counter
+
+    def new_users(self, count, prefix='new'):
+        now = timezone.now()
+        return [User(email=f'{prefix}{index:03d}@test.local', last_pass_change=now) for index in range(count)]
+
+    def assertCountsMatch(self):
+        expected = User.objects.count()
+        # The reads commit, as in autocommit, so counters get primed and later writes move them
+        with self.captureOnCommitCallbacks(execute=True):
+            for mode in MODES:
+                self.assertEqual(self.dao.get_count(mode=mode), expected, mode)
+        self.assertEqual(self.dao.count_cache.backend.get(self.counter_key), expected)
+        self.assertEqual(self.dao.get_count({'last_name': '1'}), User.objects.filter(last_name='1').count())
+
+    def write(self, fn, *args, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            fn(*args, **kwargs)
+        self.assertCountsMatch()
+
+    def rolled_back(self, fn, *args, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError):
+                with transaction.atomic():
+                    fn(*args, **kwargs)
+                    raise RuntimeError
+        self.assertCountsMatch()
+
+    def test_save_batch(self):
+        self.write(self.dao.save_batch, self.new_users(5), batch_size=2)
+        self.rolled_back(self.dao.save_batch, self.new_users(3, prefix='gone'), batch_size=2)
+
+    def test_upsert_batch(self):
+        self.write(self.dao.upsert_batch, [*self.new_users(2), User(email=self.users[0].email)],
+                   unique_fields=['email'], update_fields=['first_name'])
+        self.rolled_back(self.dao.upsert_batch, self.new_users(2, prefix='gone'), unique_fields=['email'])
+
+    def test_update_batch(self):
+        for user in self.users[:2]:
+            user.deleted = True
+        self.rolled_back(self.dao.update_batch, self.users[:2])
+        self.users = list(User.objects.order_by('email'))
+        for user in self.users[:2]:
+            user.deleted = True
+        self.users[2].first_name = 'Renamed'
+        self.write(self.dao.update_batch, self.users[:3])
+
+    def test_update_batch_by_query(self):
+        self.write(self.dao.update_batch_by_query, {'last_name__in': ['0', '1']}, {}, {'deleted': True})
+        self.rolled_back(self.dao.update_batch_by_query, {'last_name': '2'}, {}, {'deleted': True})
+
+    def test_delete_batch(self):
+        self.rolled_back(self.dao.delete_batch, self.users[:2])
+        self.write(self.dao.delete_batch, self.users[:2], batch_size=1)
+
+    def test_delete_batch_by_query(self):
+        self.rolled_back(self.dao.delete_batch_by_query, {'last_name__in': ['0', '1']})
+        self.write(self.dao.delete_batch_by_query, {'last_name__in': ['0', '1']})
+
+    def test_soft_delete_batch(self):
+        self.rolled_back(self.dao.soft_delete_batch, self.users[:2])
+        self.write(self.dao.soft_delete_batch, self.users[:2], batch_size=1)
+        self.write(self.dao.soft_delete_batch, {'last_name__in': ['2', '3']})
+
+    def test_soft_delete_batch_with_stale_instances(self):
+        stale = User.objects.get(pk=self.users[0].pk)
+        self.write(self.dao.soft_delete, self.users[0])
+        # Alive in memory, already deleted in the database
+        self.write(self.dao.soft_delete_batch, [stale, self.users[1]])
+
+    def test_counter_primed_in_a_rolled_back_transaction(self):
+        self.clear_caches()
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError):
+                with transaction.atomic():
+                    self.dao.save_batch(self.new_users(2))
+                    self.assertEqual(self.dao.get_count(), 8)
+                    raise RuntimeError
+        self.assertCountsMatch()
+
+    def test_counter_primed_in_a_committed_transaction(self):
+        self.clear_caches()
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.dao.save_batch(self.new_users(2))
+                self.assertEqual(self.dao.get_count(), 8)
+                self.dao.save_batch(self.new_users(1, prefix='later'))
+        self.assertCountsMatch()
+
+
+class CountCacheTests(DaoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.dao = UserDAO()
+        self.users = self.make_users(3)
+
+    def test_cached_counts_are_bounded_by_the_ttl(self):
+        self.assertEqual(self.dao.get_count({'first_name': 'First'}, mode=COUNT_CACHED), 3)
+        User.objects.filter(pk=self.users[0].pk).update(first_name='Other')
+        self.assertEqual(self.dao.get_count({'first_name': 'First'}, mode=COUNT_CACHED), 3)
+        self.assertEqual(self.dao.get_count({'first_name': 'First'}), 2)
+        self.clear_caches()  # as the TTL expiring would
+        self.assertEqual(self.dao.get_count({'first_name': 'First'}, mode=COUNT_CACHED), 2)
+
+    def test_estimates_come_from_sqlite_statistics(self):
+        qs = User.objects.with_deleted()
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TABLE IF EXISTS sqlite_stat1')
+        self.assertIsNone(estimate_count(qs))
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.assertEqual(estimate_count(qs), 3)
+        self.assertIsNone(estimate_count(qs.filter(first_name='First')))
+
+    def test_filtered_estimates_fall_back_to_cached_counts(self):
+        self.assertEqual(self.dao.get_count({'first_name': 'First'}, mode=COUNT_ESTIMATED), 3)
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            self.dao.get_count({'first_name': 'First'}, mode='guess')
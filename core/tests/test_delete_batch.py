@@ -0,0 +1,70 @@
+from unittest import mock
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from apps.users.dao import UserDAO
+from apps.users.models import User
+from apps.users.services import UserWriteService
+from . import DaoTestCase
+
+
+class DeleteBatchTests(DaoTestCase):
+    """delete_batch and soft_delete_batch write one statement per pk chunk"""
+
+    def setUp(self):
+        super().setUp()
+        self.dao = UserDAO()
+        self.users = self.make_users(5)
+
+    def statements(self, queries, verb):
+        table = User._meta.db_table
+        return [query['sql'] for query in queries.captured_queries
+                if query['sql'].startswith(verb) and f'"{table}"' in query['sql'].split('WHERE')[0]]
+
+    def test_delete_batch_deletes_by_pk_chunk(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(self.dao.delete_batch(self.users[:4], batch_size=3))
+        self.assertEqual(len(self.statements(queries, 'DELETE')), 2)
+        self.assertEqual(list(User.objects.with_deleted()), [self.users[4]])
+
+    def test_delete_batch_skips_missing_and_unsaved_objects(self):
+        self.assertFalse(self.dao.delete_batch([]))
+        self.assertTrue(self.dao.delete_batch([None, User(id=None), self.users[0]]))
+        self.assertEqual(User.objects.with_deleted().count(), 4)
+
+    def test_chunks_are_capped_at_the_parameter_limit(self):
+        with mock.patch.object(connection.features, 'max_query_params', 2):
+            with CaptureQueriesContext(connection) as queries:
+                self.dao.delete_batch(self.users, batch_size=100)
+        self.assertEqual(len(self.statements(queries, 'DELETE')), 3)
+        self.assertEqual(User.objects.with_deleted().count(), 0)
+
+    def test_soft_delete_batch_updates_by_pk_chunk(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(self.dao.soft_delete_batch(self.users[:4], by_user=self.users[4], batch_size=2))
+        self.assertEqual(len(self.statements(queries, 'UPDATE')), 2)
+        rows = User.objects.only_deleted()
+        self.assertEqual(len(rows), 4)
+        self.assertEqual({row.deleted_by_id for row in rows}, {self.users[4].pk})
+        self.assertEqual(len({row.deleted_at for row in rows}), 1)
+
+    def test_soft_deleted_instances_are_updated_and_clean(self):
+        self.dao.soft_delete_batch(self.users[:2])
+        for user in self.users[:2]:
+            self.assertTrue(user.deleted)
+            self.assertIsNotNone(user.deleted_at)
+            self.assertEqual(user.get_dirty_fields(), set())
+        self.assertEqual(User.objects.with_deleted().get(pk=self.users[0].pk).updated_at, self.users[0].updated_at)
+
+    def test_soft_delete_batch_by_filter_is_one_update(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.dao.soft_delete_batch({'last_name__in': ['1', '2']})
+        self.assertEqual(len(self.statements(queries, 'UPDATE')), 1)
+        self.assertEqual(sorted(User.objects.only_deleted().values_list('last_name', flat=True)), ['1', '2'])
+
+    def test_nothing_to_soft_delete(self):
+        self.assertFalse(self.dao.soft_delete_batch([]))
+        self.assertFalse(self.dao.soft_delete_batch({}))
+
+    def test_service_passes_the_deleting_user(self):
+        UserWriteService().soft_delete_batch(self.users[:1], by_user=self.users[1])
+        self.assertEqual(User.objects.with_deleted().get(pk=self.users[0].pk).deleted_by_id, self.users[1].pk)
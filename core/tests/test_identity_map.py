@@ -0,0 +1,125 @@
+from asgiref.sync import async_to_sync, sync_to_async
+from django.http import HttpResponse
+from django.test import RequestFactory
+from apps.users.dao import UserDAO
+from apps.users.models import User
+from apps.users.serializers import UserSerializer
+from apps.users.services import UserReadService
+from core.dao.identity_map import IdentityMap, identity_map_scope
+from core.middleware import IdentityMapMiddleware
+from . import DaoTestCase
+
+
+class IdentityMapTests(DaoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.dao = UserDAO()
+        self.user, self.other = self.make_users(2)
+        scope = identity_map_scope()
+        self.identity_map = scope.__enter__()
+        self.addCleanup(scope.__exit__, None, None, None)
+
+    def test_lookups_return_the_loaded_instance(self):
+        user = self.dao.get(self.user.pk)
+        self.assertIs(self.dao.get(self.user.pk), user)
+        self.assertIs(self.dao.find_one({'email': self.user.email}), user)
+        self.assertIs(self.dao.find_one({'pk': str(self.user.pk)}), user)
+        self.assertIsNot(self.dao.get(self.other.pk), user)
+
+    def test_other_lookups_bypass_the_map(self):
+        user = self.dao.get(self.user.pk)
+        self.assertIsNot(self.dao.find_one({'email': self.user.email}, order_bys=['email']), user)
+        self.assertIsNot(self.dao.find_one({'first_name': 'First', 'last_name': '0'}), user)
+
+    def test_instances_differ_outside_a_scope(self):
+        with identity_map_scope() as inner:
+            user = self.dao.get(self.user.pk)
+            self.assertIs(IdentityMap.current(), inner)
+        self.assertIs(IdentityMap.current(), self.identity_map)
+        self.assertIsNot(self.dao.get(self.user.pk), user)
+
+    def test_stale_alias_misses(self):
+        user = self.dao.get(self.user.pk)
+        old_email = user.email
+        user.email = 'moved@test.local'
+        self.assertIsNone(self.identity_map.get(User, 'email', old_email))
+        self.assertIsNot(self.dao.find_one({'email': old_email}), user)
+
+    def test_writes_keep_the_written_instance(self):
+        user = self.dao.get(self.user.pk)
+        user.first_name = 'Changed'
+        self.dao.update(user)
+        self.assertIs(self.dao.get(self.user.pk), user)
+
+    def test_soft_deleted_instances_leave_the_map(self):
+        user = self.dao.get(self.user.pk)
+        self.dao.soft_delete(user)
+        self.assertIsNone(self.dao.get(self.user.pk))
+        self.assertIsNone(self.dao.find_one({'email': self.user.email}))
+        self.assertEqual(self.dao.get_many([self.user.pk]), [None])
+
+    def test_writes_drop_other_copies(self):
+        user = self.dao.get(self.user.pk)
+        self.dao.update_batch_by_query({'pk': self.user.pk}, {}, {'first_name': 'Changed'})
+        reloaded = self.dao.get(self.user.pk)
+        self.assertIsNot(reloaded, user)
+        self.assertEqual(reloaded.first_name, 'Changed')
+
+        copy = User.objects.get(pk=self.user.pk)
+        self.dao.delete(copy)
+        self.assertIsNone(self.dao.get(self.user.pk))
+
+    def test_clear(self):
+        user = self.dao.get(self.user.pk)
+        self.identity_map.clear(User)
+        self.assertIsNone(self.identity_map.get(User, 'pk', user.pk))
+
+
+class IdentityMapMiddlewareTests(DaoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user, = self.make_users(1)
+        self.seen = []
+
+    def get_response(self, request):
+        dao = UserDAO()
+        self.seen.append((IdentityMap.current(), dao.get(self.user.pk), dao.get(self.user.pk)))
+        return HttpResponse()
+
+    def assertOneScopePerRequest(self):
+        (first_map, first, again), (second_map, second, _) = self.seen
+        self.assertIsNotNone(first_map)
+        self.assertIsNot(first_map, second_map)
+        self.assertIs(first, again)
+        self.assertIsNot(first, second)
+        self.assertIsNone(IdentityMap.current())
+
+    def test_each_request_gets_its_own_map(self):
+        middleware = IdentityMapMiddleware(self.get_response)
+        middleware(RequestFactory().get('/'))
+        middleware(RequestFactory().get('/'))
+        self.assertOneScopePerRequest()
+
+    def test_async_requests(self):
+        async def get_response(request):
+            # The ORM runs on the sync thread, which sees the request's scope
+            return await sync_to_async(self.get_response)(request)
+
+        middleware = IdentityMapMiddleware(get_response)
+        async_to_sync(middleware)(RequestFactory().get('/'))
+        async_to_sync(middleware)(RequestFactory().get('/'))
+        self.assertOneScopePerRequest()
+
+
+class DaoReuseTests(DaoTestCase):
+
+    def test_services_keep_their_dao(self):
+        service = UserReadService()
+        self.assertIs(service.dao, service.dao)
+        self.assertIsNot(UserReadService().dao, service.dao)
+
+    def test_serializers_share_one_service(self):
+        self.assertIs(UserSerializer().get_service(), UserSerializer().get_service())
+        self.assertIsInstance(UserSerializer().get_service(), UserReadService)
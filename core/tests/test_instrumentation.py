@@ -0,0 +1,121 @@
+from asgiref.sync import async_to_sync
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from apps.users.dao import UserDAO
+from apps.users.models import User
+from apps.users.services import UserReadService
+from core.instrumentation import current_profile, profile_scope
+from core.instrumentation.profiler import query_counter, sql_shape
+from core.middleware import QueryInstrumentationMiddleware
+from . import DaoTestCase
+
+
+class ProfilerTests(DaoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.dao = UserDAO()
+        self.users = self.make_users(4)
+
+    def test_sql_shapes_ignore_parameter_lists_and_spacing(self):
+        self.assertEqual(sql_shape('SELECT *  FROM t\n WHERE id IN (%s, %s, %s)'),
+                         'SELECT * FROM t WHERE id IN (...)')
+        self.assertEqual(sql_shape('SELECT * FROM t WHERE id IN (%s)'), sql_shape('SELECT * FROM t WHERE id IN (%s, %s)'))
+
+    def test_every_connection_counts_queries(self):
+        connection.ensure_connection()
+        self.assertIn(query_counter, connection.execute_wrappers)
+
+    def test_nothing_is_recorded_outside_a_scope(self):
+        with profile_scope() as profile:
+            pass
+        self.assertIsNone(current_profile())
+        self.assertEqual(len(self.dao.find_all_model_objs()), 4)
+        self.assertEqual((profile.queries, profile.methods), (0, {}))
+
+    def test_calls_are_recorded_per_layer_and_model(self):
+        with profile_scope() as profile:
+            UserReadService().get_users_page(limit=10)
+            self.dao.get(self.users[0].pk)
+            self.dao.get(self.users[0].pk)  # served by the object cache
+        methods = profile.summary()['methods']
+        self.assertEqual(methods['service.users.user.get_users_page']['rows'], 4)
+        self.assertEqual(methods['dao.users.user.find_page']['queries'], 1)
+        self.assertEqual(methods['dao.users.user.get']['calls'], 2)
+        self.assertEqual(methods['dao.users.user.get']['queries'], 1)
+        self.assertEqual(profile.queries, 2)
+        self.assertIsNone(current_profile())
+
+    def test_async_calls_are_recorded(self):
+        async def read():
+            with profile_scope() as profile:
+                await self.dao.aget(self.users[0].pk)
+            return profile
+
+        methods = async_to_sync(read)().summary()['methods']
+        self.assertEqual(methods['dao.users.user.aget']['rows'], 1)
+        self.assertEqual(methods['dao.users.user.aget']['queries'], 1)
+
+    def test_generators_are_not_wrapped(self):
+        with profile_scope() as profile:
+            list(self.dao.find_chunks())
+        self.assertNotIn('dao.users.user.find_chunks', profile.methods)
+        self.assertEqual(profile.queries, 1)
+
+    def test_repeated_shapes_are_flagged(self):
+        with profile_scope(n_plus_one_threshold=3) as profile:
+            for user in self.users[:3]:
+                User.objects.filter(pk=user.pk).first()
+        self.assertEqual(profile.n_plus_one(), [])
+        with profile_scope(n_plus_one_threshold=3) as profile:
+            for user in self.users:
+                User.objects.filter(pk=user.pk).first()
+            User.objects.filter(pk__in=[user.pk for user in self.users]).count()
+        (shape, count), = profile.n_plus_one()
+        self.assertEqual(count, 4)
+        self.assertIn(f'FROM "{User._meta.db_table}" WHERE', shape)
+        self.assertIn('n-plus-one;desc="1 repeated shapes, max 4x"', profile.server_timing())
+
+    def test_server_timing(self):
+        with profile_scope() as profile:
+            self.dao.find_all_model_objs()
+        header = profile.server_timing()
+        self.assertTrue(header.startswith('sql;dur='))
+        self.assertIn('dao.users.user.find_all_model_objs;dur=', header)
+        self.assertIn('desc="1 calls, 1 queries, 4 rows"', header)
+        self.assertIn('total;dur=', header)
+
+
+class QueryInstrumentationMiddlewareTests(DaoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.users = self.make_users(3)
+
+    def view(self, request):
+        for user in self.users:
+            User.objects.filter(pk=user.pk).first()
+        return HttpResponse()
+
+    @override_settings(DAO_INSTRUMENTATION=False)
+    def test_disabled(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            QueryInstrumentationMiddleware(self.view)
+
+    @override_settings(DAO_INSTRUMENTATION=True, N_PLUS_ONE_THRESHOLD=2)
+    def test_reports_timings_and_logs_repeated_queries(self):
+        middleware = QueryInstrumentationMiddleware(self.view)
+        with self.assertLogs('core.instrumentation', 'WARNING') as logs:
+            response = middleware(RequestFactory().get('/users/'))
+        self.assertIn('desc="3 queries"', response['Server-Timing'])
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn('Possible N+1 on GET /users/: 3 x', logs.output[0])
+
+    @override_settings(DAO_INSTRUMENTATION=True)
+    def test_quiet_below_the_threshold(self):
+        middleware = QueryInstrumentationMiddleware(self.view)
+        with self.assertNoLogs('core.instrumentation', 'WARNING'):
+            response = middleware(RequestFactory().get('/users/'))
+        self.assertNotIn('n-plus-one', response['Server-Timing'])
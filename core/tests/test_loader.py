@@ -0,0 +1,175 @@
+import contextvars
+import uuid
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from apps.users.dao import UserDAO
+from apps.users.models import User
+from apps.users.services import UserReadService
+from core.dao import DataLoader
+from core.dao.identity_map import identity_map_scope
+from core.serializers.loaded import LoadedRelatedField
+from core.serializers.service_serializer import ServiceSerializer
+from . import DaoTestCase
+
+
+class GetManyTests(DaoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.dao = UserDAO()
+        self.users = self.make_users(5)
+        User.objects.filter(pk=self.users[4].pk).update(deleted=True)
+
+    def test_results_follow_the_input_order(self):
+        first, second, third, _, deleted = self.users
+        missing = uuid.uuid4()
+        pks = [third.pk, str(first.pk), missing, None, 'not-a-uuid', deleted.pk, third.pk, second.pk]
+        with CaptureQueriesContext(connection) as queries:
+            found = self.dao.get_many(pks)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(found, [third, first, None, None, None, None, third, second])
+        self.assertIs(found[0], found[6])
+
+    def test_one_query_per_chunk(self):
+        with CaptureQueriesContext(connection) as queries:
+            found = self.dao.get_many([user.pk for user in self.users[:4]], batch_size=3)
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(found, self.users[:4])
+
+    def test_cached_rows_are_not_queried(self):
+        self.dao.get(self.users[0].pk)
+        with CaptureQueriesContext(connection) as queries:
+            self.dao.get_many([self.users[0].pk, self.users[1].pk])
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn(str(self.users[0].pk).replace('-', ''), queries.captured_queries[0]['sql'])
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.dao.get_many([self.users[1].pk, self.users[0].pk]), self.users[1::-1])
+        self.assertEqual(len(queries), 0)
+
+    def test_identity_map_instances_are_reused(self):
+        with identity_map_scope():
+            user = self.dao.get(self.users[0].pk)
+            self.assertIs(self.dao.get_many([self.users[1].pk, self.users[0].pk])[1], user)
+            self.assertIs(self.dao.get(self.users[1].pk), self.dao.get_many([self.users[1].pk])[0])
+
+    def test_empty_input(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.dao.get_many([]), [])
+            self.assertEqual(self.dao.get_many([None]), [None])
+        self.assertEqual(len(queries), 0)
+
+    def test_async_and_service(self):
+        pks = [self.users[1].pk, uuid.uuid4(), self.users[0].pk]
+        self.assertEqual(async_to_sync(self.dao.aget_many)(pks), [self.users[1], None, self.users[0]])
+        self.assertEqual(UserReadService().get_many(pks), [self.users[1], None, self.users[0]])
+
+
+class DataLoaderTests(DaoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.dao = UserDAO()
+        self.users = self.make_users(4)
+        scope = identity_map_scope()
+        scope.__enter__()
+        self.addCleanup(scope.__exit__, None, None, None)
+
+    def test_queued_keys_resolve_in_one_batch(self):
+        loader = DataLoader(self.dao)
+        missing = uuid.uuid4()
+        handles = loader.load_many([user.pk for user in self.users[:3]] + [missing, None])
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual([handle.get() for handle in handles], self.users[:3] + [None, None])
+        self.assertEqual((len(queries), loader.batches), (1, 1))
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertIsNone(loader.get(missing))  # misses are memoized too
+            self.assertEqual(loader.get(self.users[0].pk), self.users[0])
+        self.assertEqual(len(queries), 0)
+
+    def test_unqueued_keys_load_on_their_own(self):
+        loader = DataLoader(self.dao)
+        self.assertEqual(loader.get(self.users[3].pk), self.users[3])
+        self.assertEqual(loader.get_many([self.users[1].pk, self.users[3].pk]), [self.users[1], self.users[3]])
+        self.assertEqual(loader.batches, 2)
+
+    def test_one_loader_per_scope_and_model(self):
+        loader = DataLoader.for_dao(self.dao)
+        self.assertIs(DataLoader.for_dao(UserDAO()), loader)
+        with identity_map_scope():
+            self.assertIsNot(DataLoader.for_dao(self.dao), loader)
+
+    def test_unscoped_loaders_are_not_shared(self):
+        unscoped = contextvars.Context()
+        self.assertIsNot(unscoped.run(DataLoader.for_dao, self.dao), unscoped.run(DataLoader.for_dao, self.dao))
+
+    def test_writes_drop_memoized_rows(self):
+        loader = DataLoader.for_dao(self.dao)
+        user = loader.get(self.users[0].pk)
+        self.dao.soft_delete(user)
+        self.assertIsNone(loader.get(user.pk))
+
+        user = loader.get(self.users[1].pk)
+        self.dao.update_batch_by_query({'pk': user.pk}, {}, {'first_name': 'Changed'})
+        # Writes without keys drop the scope's loader altogether
+        self.assertIsNot(DataLoader.for_dao(self.dao), loader)
+        self.assertEqual(DataLoader.for_dao(self.dao).get(user.pk).first_name, 'Changed')
+
+
+class CreatorSerializer(ServiceSerializer):
+    service_class = UserReadService
+
+    class Meta:
+        fields = ('id', 'email')
+
+
+class LoadedCreatorSerializer(ServiceSerializer):
+    service_class = UserReadService
+    created_by = LoadedRelatedField(UserDAO, serializer=CreatorSerializer)
+    updated_by = LoadedRelatedField(UserDAO)
+
+    class Meta:
+        fields = ('id', 'created_by', 'updated_by')
+
+
+class NestedCreatorSerializer(ServiceSerializer):
+    service_class = UserReadService
+    created_by = CreatorSerializer(read_only=True)
+
+    class Meta:
+        fields = ('id', 'created_by')
+
+
+class LoadedRelatedFieldTests(DaoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.users = self.make_users(6)
+        for user in self.users[1:]:
+            user.created_by = self.users[0] if user.last_name in ('1', '2', '3') else self.users[1]
+        self.users[2].updated_by = self.users[0]
+        User.objects.bulk_update(self.users, ['created_by', 'updated_by'])
+
+    def test_related_rows_load_in_one_query(self):
+        with identity_map_scope(), CaptureQueriesContext(connection) as queries:
+            data = LoadedCreatorSerializer(User.objects.order_by('email'), many=True).data
+        # The list, then one get_many: both fields queue their keys on the scope's user loader
+        self.assertEqual(len(queries), 2)
+        nested = NestedCreatorSerializer(User.objects.order_by('email'), many=True).data
+        self.assertEqual([row['created_by'] for row in data], [row['created_by'] for row in nested])
+        self.assertEqual([row['updated_by'] for row in data],
+                         [None, None, str(self.users[0]), None, None, None])
+
+    def test_queries_do_not_grow_with_rows(self):
+        counts = []
+        for rows in (2, 6):
+            with identity_map_scope(), CaptureQueriesContext(connection) as queries:
+                LoadedCreatorSerializer(User.objects.order_by('email')[:rows], many=True).data
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_single_objects(self):
+        data = LoadedCreatorSerializer(User.objects.get(pk=self.users[3].pk)).data
+        self.assertEqual(data['created_by'], {'id': str(self.users[0].pk), 'email': self.users[0].email})
+        self.assertIsNone(data['updated_by'])
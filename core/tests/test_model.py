@@ -0,0 +1,83 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from apps.users.dao import UserDAO
+from apps.users.models import User
+from . import DaoTestCase
+
+
+class DirtyFieldsTests(DaoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user, = self.make_users(1)
+
+    def test_loaded_object_is_clean(self):
+        self.assertEqual(self.user.get_dirty_fields(), set())
+
+    def test_changed_fields_are_dirty(self):
+        self.user.first_name = 'Changed'
+        self.user.last_name = self.user.last_name  # same value
+        self.assertEqual(self.user.get_dirty_fields(), {'first_name'})
+
+    def test_unsaved_object_is_unknown(self):
+        user = User(email='new@test.local', last_pass_change=timezone.now())
+        self.assertIsNone(user.get_dirty_fields())
+        user.save()
+        self.assertEqual(user.get_dirty_fields(), set())
+
+    def test_save_and_refresh_mark_clean(self):
+        self.user.first_name = 'Changed'
+        self.user.save()
+        self.assertEqual(self.user.get_dirty_fields(), set())
+
+        self.user.last_name = 'Changed'
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.get_dirty_fields(), set())
+        self.assertNotEqual(self.user.last_name, 'Changed')
+
+    def test_deferred_field_set_later_is_dirty(self):
+        user = User.objects.only('email').get(pk=self.user.pk)
+        self.assertEqual(user.get_dirty_fields(), set())
+        user.first_name = 'Changed'
+        self.assertEqual(user.get_dirty_fields(), {'first_name'})
+
+
+class DirtyUpdateTests(DaoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.dao = UserDAO()
+        self.users = self.make_users(3)
+
+    def update_statements(self, queries):
+        return [query['sql'] for query in queries.captured_queries if query['sql'].startswith('UPDATE')]
+
+    def test_update_writes_only_changed_columns(self):
+        user = self.users[0]
+        user.first_name = 'Changed'
+        with CaptureQueriesContext(connection) as queries:
+            self.dao.update(user)
+        statement, = self.update_statements(queries)
+        self.assertIn('"first_name"', statement)
+        self.assertIn('"updated_at"', statement)
+        self.assertNotIn('"last_name"', statement)
+        self.assertEqual(User.objects.get(pk=user.pk).first_name, 'Changed')
+        self.assertEqual(user.get_dirty_fields(), set())
+
+    def test_update_without_changes_writes_nothing(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(self.dao.update(self.users[0]))
+        self.assertEqual(self.update_statements(queries), [])
+
+    def test_update_batch_groups_by_changed_fields(self):
+        first, second, third = self.users
+        first.first_name, second.first_name, third.last_name = 'A', 'B', 'C'
+        with CaptureQueriesContext(connection) as queries:
+            self.dao.update_batch(self.users)
+        statements = self.update_statements(queries)
+        self.assertEqual(len(statements), 2)
+        self.assertEqual(sum('"last_name"' in statement for statement in statements), 1)
+        self.assertEqual(list(User.objects.order_by('email').values_list('first_name', 'last_name')),
+                         [('A', '0'), ('B', '1'), ('First', 'C')])
+        self.assertTrue(all(user.get_dirty_fields() == set() for user in self.users))
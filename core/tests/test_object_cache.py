@@ -0,0 +1,111 @@
+from unittest import mock
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from apps.users.dao import UserDAO
+from apps.users.models import User
+from core.dao import ObjectCache
+from . import DaoTestCase
+
+
+class ObjectCacheTests(DaoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.users = self.make_users(3)
+        self.cache = ObjectCache('tests.user', ttl=10, max_size=4, aliases=('email',))
+
+    def test_get_returns_copies(self):
+        user = self.users[0]
+        self.cache.set(user)
+        first, second = self.cache.get('pk', user.pk), self.cache.get('pk', user.pk)
+        self.assertIsNot(first, second)
+        self.assertEqual(first, user)
+        first.first_name = 'Changed'
+        self.assertEqual(second.first_name, 'First')
+        self.assertEqual(second.get_dirty_fields(), set())
+
+    def test_entries_expire_after_ttl(self):
+        with mock.patch('core.dao.cache.time.monotonic', return_value=100.0):
+            self.cache.set(self.users[0])
+        with mock.patch('core.dao.cache.time.monotonic', return_value=109.0):
+            self.assertIsNotNone(self.cache.get('pk', self.users[0].pk))
+        with mock.patch('core.dao.cache.time.monotonic', return_value=120.0):
+            self.assertIsNone(self.cache.get('pk', self.users[0].pk))
+        self.assertEqual(self.cache.stats()['size'], 1)  # the email alias, dropped when next read
+
+    def test_least_recently_used_entries_are_evicted(self):
+        first, second, third = self.users
+        self.cache.set(first)
+        self.cache.set(second)
+        self.cache.get('pk', first.pk)
+        self.cache.set(third)  # 6 entries (pk + email each) for 4 slots
+        self.assertIsNotNone(self.cache.get('pk', first.pk))
+        self.assertIsNone(self.cache.get('pk', second.pk))
+        self.assertIsNotNone(self.cache.get('pk', third.pk))
+        self.assertEqual(self.cache.stats()['evictions'], 2)
+
+    def test_aliases_resolve_through_the_pk(self):
+        user = self.users[0]
+        self.cache.set(user)
+        self.assertEqual(self.cache.get('email', user.email), user)
+        self.cache.invalidate([user.pk])
+        self.assertIsNone(self.cache.get('email', user.email))
+
+    def test_stale_alias_misses(self):
+        user = self.users[0]
+        old_email = user.email
+        self.cache.set(user)
+        user.email = 'moved@test.local'
+        self.cache.set(user)
+        self.assertIsNone(self.cache.get('email', old_email))
+        self.assertEqual(self.cache.get('email', 'moved@test.local'), user)
+
+    def test_deferred_objects_are_not_cached(self):
+        self.cache.set(User.objects.only('email').get(pk=self.users[0].pk))
+        self.assertIsNone(self.cache.get('pk', self.users[0].pk))
+
+
+class DaoObjectCacheTests(DaoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.dao = UserDAO()
+        self.user, = self.make_users(1)
+
+    def assertCached(self, lookup):
+        with CaptureQueriesContext(connection) as queries:
+            obj = lookup()
+        self.assertEqual(len(queries), 0)
+        return obj
+
+    def test_get_and_find_one_read_through(self):
+        self.dao.get(self.user.pk)
+        self.assertEqual(self.assertCached(lambda: self.dao.get(self.user.pk)), self.user)
+        self.assertEqual(self.assertCached(lambda: self.dao.find_one({'email': self.user.email})), self.user)
+
+    def test_dao_writes_invalidate(self):
+        cached = self.dao.get(self.user.pk)
+        cached.first_name = 'Changed'
+        self.dao.update(cached)
+        self.assertEqual(self.dao.get(self.user.pk).first_name, 'Changed')
+        self.dao.soft_delete(cached)
+        self.assertIsNone(self.dao.get(self.user.pk))
+
+    def test_direct_saves_invalidate(self):
+        self.dao.get(self.user.pk)
+        User.objects.filter(pk=self.user.pk).update(first_name='Unseen')  # bypasses signals and the DAO
+        self.assertEqual(self.dao.get(self.user.pk).first_name, 'First')
+        self.user.first_name = 'Saved'
+        self.user.save()
+        self.assertEqual(self.dao.get(self.user.pk).first_name, 'Saved')
+
+    def test_cache_served_instances_keep_their_own_changes(self):
+        self.dao.get(self.user.pk)
+        first, second = self.dao.get(self.user.pk), self.dao.get(self.user.pk)
+        first.first_name = 'First B'
+        self.dao.update(first)
+        second.last_name = 'Last C'
+        self.assertEqual(second.get_dirty_fields(), {'last_name'})
+        self.dao.update(second)
+        self.assertEqual(User.objects.filter(pk=self.user.pk).values_list('first_name', 'last_name').get(),
+                         ('First B', 'Last C'))
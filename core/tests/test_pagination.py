@@ -0,0 +1,79 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from apps.users.dao import UserDAO
+from core.dao import InvalidCursor
+from . import DaoTestCase
+
+
+class FindPageTests(DaoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.dao = UserDAO()
+        self.users = self.make_users(7)
+
+    def walk(self, order_bys, limit):
+        """Every page forwards from the start, as lists of emails"""
+        pages, cursor = [], None
+        while True:
+            page = self.dao.find_page(order_bys=order_bys, after=cursor, limit=limit)
+            pages.append([user.email for user in page])
+            cursor = page.next_cursor
+            if cursor is None:
+                return pages
+
+    def test_pages_cover_every_row_once(self):
+        pages = self.walk(['email'], 3)
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual(sum(pages, []), [user.email for user in self.users])
+
+    def test_descending(self):
+        pages = self.walk(['-email'], 3)
+        self.assertEqual(sum(pages, []), [user.email for user in reversed(self.users)])
+
+    def test_ties_are_broken_by_pk(self):
+        # Every user has the same first_name
+        pages = self.walk(['first_name'], 2)
+        emails = sum(pages, [])
+        self.assertEqual(sorted(emails), sorted(user.email for user in self.users))
+        self.assertEqual(len(emails), len(set(emails)))
+
+    def test_previous_cursor_returns_the_page_before(self):
+        first = self.dao.find_page(order_bys=['email'], limit=3)
+        self.assertIsNone(first.previous_cursor)
+        second = self.dao.find_page(order_bys=['email'], after=first.next_cursor, limit=3)
+        back = self.dao.find_page(order_bys=['email'], before=second.previous_cursor, limit=3)
+        self.assertEqual(list(back), list(first))
+        self.assertIsNone(back.previous_cursor)
+        self.assertEqual(back.next_cursor, first.next_cursor)
+
+    def test_rows_written_between_pages_are_not_skipped_or_repeated(self):
+        first = self.dao.find_page(order_bys=['email'], limit=3)
+        self.dao.delete(self.users[0])
+        rest = self.dao.find_page(order_bys=['email'], after=first.next_cursor, limit=10)
+        self.assertEqual([user.email for user in rest], [user.email for user in self.users[3:]])
+
+    def test_seeks_instead_of_offset(self):
+        page = self.dao.find_page(order_bys=['email'], limit=3)
+        with CaptureQueriesContext(connection) as queries:
+            self.dao.find_page(order_bys=['email'], after=page.next_cursor, limit=3)
+        sql = queries.captured_queries[-1]['sql']
+        self.assertNotIn('OFFSET', sql)
+        self.assertIn('"email" >', sql)
+
+    def test_malformed_cursor(self):
+        with self.assertRaises(InvalidCursor):
+            self.dao.find_page(order_bys=['email'], after='not a cursor')
+
+    def test_cursor_of_another_ordering(self):
+        page = self.dao.find_page(order_bys=['email'], limit=3)
+        with self.assertRaises(InvalidCursor):
+            self.dao.find_page(order_bys=['-created_at'], after=page.next_cursor)
+
+    def test_nullable_ordering_key_is_refused(self):
+        with self.assertRaisesRegex(ValueError, 'nullable'):
+            self.dao.find_page(order_bys=['last_login'])
+
+    def test_related_ordering_key_is_refused(self):
+        with self.assertRaises(ValueError):
+            self.dao.find_page(order_bys=['created_by__email'])
@@ -0,0 +1,149 @@
+import threading
+from unittest import mock
+from asgiref.sync import async_to_sync
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, check_password, identify_hasher, make_password
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from apps.users.models import User
+from apps.users.services import AuthService
+from core.auth import passwords
+from core.auth.passwords import averify_password, hashing_executor, verify_password
+from . import PASSWORD, DaoTestCase
+
+FAST_PBKDF2 = 'core.tests.test_passwords.FastPBKDF2PasswordHasher'
+MD5 = 'django.contrib.auth.hashers.MD5PasswordHasher'
+
+
+class FastPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    iterations = 2
+
+
+class SlowerPBKDF2PasswordHasher(FastPBKDF2PasswordHasher):
+    iterations = 3
+
+
+class VerifyPasswordTests(DaoTestCase):
+
+    def test_current_hashes_are_not_rehashed(self):
+        check = verify_password(PASSWORD, make_password(PASSWORD))
+        self.assertTrue(check.valid)
+        self.assertIsNone(check.rehashed)
+
+    def test_wrong_or_missing_hashes(self):
+        self.assertFalse(verify_password('wrong', make_password(PASSWORD)).valid)
+        self.assertFalse(verify_password(PASSWORD, None).valid)
+        self.assertFalse(verify_password(PASSWORD, make_password(None)).valid)
+
+    @override_settings(PASSWORD_HASHERS=[FAST_PBKDF2, MD5])
+    def test_older_hashers_are_rehashed(self):
+        with override_settings(PASSWORD_HASHERS=[MD5]):
+            encoded = make_password(PASSWORD)
+        check = verify_password(PASSWORD, encoded)
+        self.assertTrue(check.valid)
+        self.assertEqual(identify_hasher(check.rehashed).algorithm, 'pbkdf2_sha256')
+        self.assertTrue(check_password(PASSWORD, check.rehashed))
+        self.assertIsNone(verify_password('wrong', encoded).rehashed)
+
+    def test_raised_work_factors_are_rehashed(self):
+        with override_settings(PASSWORD_HASHERS=[FAST_PBKDF2]):
+            encoded = make_password(PASSWORD)
+        with override_settings(PASSWORD_HASHERS=['core.tests.test_passwords.SlowerPBKDF2PasswordHasher']):
+            check = verify_password(PASSWORD, encoded)
+        self.assertTrue(check.rehashed.startswith('pbkdf2_sha256$3$'))
+
+    def test_async_checks_run_in_the_hashing_pool(self):
+        threads = []
+
+        def recording_check(*args, **kwargs):
+            threads.append(threading.current_thread().name)
+            return check_password(*args, **kwargs)
+
+        encoded = make_password(PASSWORD)
+        with mock.patch.object(passwords, 'check_password', recording_check):
+            self.assertEqual(async_to_sync(averify_password)(PASSWORD, encoded), verify_password(PASSWORD, encoded))
+        self.assertTrue(threads[0].startswith('password-hashing'))
+        self.assertEqual(threads[1], threading.current_thread().name)
+
+    @override_settings(PASSWORD_HASHING_WORKERS=2)
+    def test_one_pool_per_process(self):
+        original = passwords._executor
+        self.addCleanup(setattr, passwords, '_executor', original)
+        passwords._executor = None
+        executor = hashing_executor()
+        self.addCleanup(executor.shutdown)
+        self.assertIs(hashing_executor(), executor)
+        self.assertEqual(executor._max_workers, 2)
+        with mock.patch('os.getpid', return_value=-1):
+            forked = hashing_executor()
+        self.addCleanup(forked.shutdown)
+        self.assertIsNot(forked, executor)
+
+
+class AuthServiceTests(DaoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.service = AuthService()
+        self.users = self.make_users(3)
+        User.objects.filter(pk=self.users[1].pk).update(is_active=False)
+        User.objects.filter(pk=self.users[2].pk).update(deleted=True)
+
+    def test_candidates_load_only_the_login_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            user = self.service.get_login_candidate(self.users[0].email)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(user, self.users[0])
+        self.assertEqual(user.get_deferred_fields(),
+                         {field.attname for field in User._meta.concrete_fields} - {'id', 'password', 'is_active',
+                                                                                    'last_pass_change'})
+
+    def test_only_live_active_users_with_the_right_password(self):
+        self.assertEqual(self.service.validate_user(self.users[0].email, PASSWORD), self.users[0])
+        self.assertIsNone(self.service.validate_user(self.users[0].email, 'wrong'))
+        self.assertIsNone(self.service.validate_user(self.users[1].email, PASSWORD))  # inactive
+        self.assertIsNone(self.service.validate_user(self.users[2].email, PASSWORD))  # soft-deleted
+        self.assertIsNone(self.service.validate_user('nobody@test.local', PASSWORD))
+
+    def test_async_validation_matches_the_sync_one(self):
+        for email, password in ((self.users[0].email, PASSWORD), (self.users[0].email, 'wrong'),
+                                (self.users[1].email, PASSWORD), (self.users[2].email, PASSWORD)):
+            self.assertEqual(async_to_sync(self.service.avalidate_user)(email, password),
+                             self.service.validate_user(email, password), email)
+
+    @override_settings(PASSWORD_HASHERS=[FAST_PBKDF2, MD5])
+    def test_outdated_hashes_are_upgraded_on_login(self):
+        for validate in (self.service.validate_user, async_to_sync(self.service.avalidate_user)):
+            User.objects.filter(pk=self.users[0].pk).update(password=self.users[0].password)  # MD5 again
+            self.assertEqual(validate(self.users[0].email, PASSWORD), self.users[0])
+            stored = User.objects.get(pk=self.users[0].pk).password
+            self.assertEqual(identify_hasher(stored).algorithm, 'pbkdf2_sha256')
+            self.assertTrue(check_password(PASSWORD, stored))
+
+            # Once upgraded, logins no longer write
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(validate(self.users[0].email, PASSWORD), self.users[0])
+            self.assertFalse([query for query in queries.captured_queries if query['sql'].startswith('UPDATE')])
+
+    def test_failed_logins_do_not_rehash(self):
+        with override_settings(PASSWORD_HASHERS=[FAST_PBKDF2, MD5]):
+            self.assertIsNone(self.service.validate_user(self.users[0].email, 'wrong'))
+        self.assertEqual(User.objects.get(pk=self.users[0].pk).password, self.users[0].password)
+
+
+class LoginViewTests(DaoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user, = self.make_users(1)
+
+    def test_login(self):
+        response = self.client.post(reverse('login'), {'email': self.user.email, 'password': PASSWORD},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()), {'access_token', 'refresh_token'})
+
+        response = self.client.post(reverse('login'), {'email': self.user.email, 'password': 'wrong'},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 401)
@@ -0,0 +1,98 @@
+from django.contrib.auth.models import Group
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+from apps.users.models import User
+from apps.users.serializers import UserSerializer
+from apps.users.services import UserReadService
+from core.dao import QueryPlan
+from core.serializers.service_serializer import ServiceSerializer
+from . import DaoTestCase
+
+
+class CreatorSerializer(ServiceSerializer):
+    service_class = UserReadService
+
+    class Meta:
+        fields = ('id', 'email')
+
+
+class NestedUserSerializer(ServiceSerializer):
+    service_class = UserReadService
+    created_by = CreatorSerializer(read_only=True)
+
+    class Meta:
+        fields = ('id', 'email', 'created_by', 'updated_by', 'groups')
+
+
+class UnlistedMethodSerializer(ServiceSerializer):
+    service_class = UserReadService
+    initials = serializers.SerializerMethodField()
+
+    class Meta:
+        fields = ('id', 'email', 'initials', 'groups')
+
+    def get_initials(self, obj):
+        return obj.first_name[:1] + obj.last_name[:1]
+
+
+class QueryPlanTests(DaoTestCase):
+    """Serializer-derived query plans"""
+
+    def setUp(self):
+        super().setUp()
+        self.users = self.make_users(4)
+        self.group = Group.objects.create(name='staff')
+        for user in self.users:
+            user.groups.add(self.group)
+            user.created_by = self.users[0]
+        User.objects.bulk_update(self.users, ['created_by'])
+
+    def test_plan_projects_rendered_columns(self):
+        plan = UserSerializer.get_query_plan()
+        self.assertNotIn('password', plan.only)  # write-only
+        self.assertTrue({'first_name', 'last_name', 'created_by', 'email'} <= set(plan.only))
+        self.assertEqual(plan.select_related, ())  # foreign keys render their pk from the local column
+        self.assertEqual(plan.prefetch_related, ('groups', 'user_permissions'))
+        self.assertIs(UserSerializer.get_query_plan(), plan)
+
+    def test_nested_relations_are_joined(self):
+        self.assertEqual(NestedUserSerializer.get_query_plan(),
+                         QueryPlan(only=('created_by', 'email', 'id', 'updated_by'),
+                                   select_related=('created_by',), prefetch_related=('groups',)))
+
+    def test_unlisted_method_fields_turn_projection_off(self):
+        plan = UnlistedMethodSerializer.get_query_plan()
+        self.assertIsNone(plan.only)
+        self.assertEqual(plan.prefetch_related, ('groups',))
+
+    def serialize(self, serializer_class, instance):
+        with CaptureQueriesContext(connection) as queries:
+            data = serializer_class(instance, many=True).data
+        return data, len(queries)
+
+    def test_list_queries_do_not_grow_with_rows(self):
+        for serializer_class, expected in ((UserSerializer, 3), (NestedUserSerializer, 2)):
+            _, few = self.serialize(serializer_class, User.objects.order_by('email')[:2])
+            _, many = self.serialize(serializer_class, User.objects.order_by('email'))
+            self.assertEqual((few, many), (expected, expected), serializer_class.__name__)
+
+    def test_projected_output_matches_full_rows(self):
+        for serializer_class in (UserSerializer, NestedUserSerializer):
+            projected, _ = self.serialize(serializer_class, User.objects.order_by('email'))
+            full = [serializer_class(user).data for user in User.objects.order_by('email')]
+            self.assertEqual(projected, full, serializer_class.__name__)
+        self.assertEqual(projected[1]['created_by'], {'id': str(self.users[0].pk), 'email': self.users[0].email})
+        self.assertEqual(projected[1]['groups'], [self.group.pk])
+
+    def test_loaded_lists_are_prefetched(self):
+        users = list(User.objects.order_by('email'))
+        _, queries = self.serialize(NestedUserSerializer, users)
+        self.assertEqual(queries, 2)  # the creators and the groups, one query each
+
+    def test_evaluated_querysets_are_left_alone(self):
+        qs = User.objects.order_by('email')
+        list(qs)
+        self.assertIs(QueryPlan(only=('email',)).prepare(qs), qs)
+        self.assertEqual(QueryPlan(only=('email',)).prepare(User.objects.all()).query.deferred_loading,
+                         ({'email'}, False))
@@ -0,0 +1,107 @@
+from django.contrib.auth.models import Group
+from django.db import connection
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from apps.users.dao import UserDAO
+from apps.users.models import User
+from apps.users.services import UserWriteService
+from core.dao import bump_generation, get_generations
+from core.http import ResponseCache
+from . import DaoTestCase
+
+
+class GenerationTests(DaoTestCase):
+
+    def test_generations_are_stable_until_bumped(self):
+        first = get_generations([User, Group])
+        self.assertEqual(get_generations([User, Group]), first)
+        bump_generation(User)
+        second = get_generations([User, Group])
+        self.assertNotEqual(second['users.user'], first['users.user'])
+        self.assertEqual(second['auth.group'], first['auth.group'])
+
+    def test_lost_counter_restarts_elsewhere(self):
+        first = get_generations([User])
+        self.clear_caches()
+        self.assertNotEqual(get_generations([User]), first)
+
+    def test_dao_writes_bump(self):
+        user, = self.make_users(1)
+        before = get_generations([User])
+        UserDAO().update_batch_by_query({'pk': user.pk}, {}, {'first_name': 'Changed'})
+        self.assertNotEqual(get_generations([User]), before)
+
+
+class ResponseCacheTests(DaoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.users = self.make_users(3)
+        self.url = reverse('users')
+        self.response_cache = ResponseCache.registered('UsersListAPIView')
+        self.response_cache.reset_stats()
+
+    def get(self, url=None, queries=None, **extra):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url or self.url, **extra)
+        if queries is not None:
+            self.assertEqual(len(captured), queries)
+        return response
+
+    def test_hit_runs_no_query(self):
+        first = self.get()
+        second = self.get(queries=0)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(self.response_cache.stats()['hits'], 1)
+
+    def test_write_retires_entries(self):
+        self.get()
+        UserWriteService().update(self.users[0], {'first_name': 'Changed'})
+        response = self.get()
+        self.assertEqual(self.response_cache.stats()['hits'], 0)
+        self.assertContains(response, 'Changed')
+
+    def test_direct_save_and_relation_change_retire_entries(self):
+        self.get()
+        user = User.objects.get(pk=self.users[0].pk)
+        user.first_name = 'Saved'
+        user.save()
+        self.assertContains(self.get(), 'Saved')
+        user.groups.add(Group.objects.create(name='staff'))
+        self.get()
+        self.assertEqual(self.response_cache.stats()['hits'], 0)
+
+    def test_entries_are_per_query_and_per_caller(self):
+        self.get()
+        self.get(data={'limit': 1})
+        self.get(HTTP_AUTHORIZATION='Basic c29tZW9uZTplbHNl')
+        self.assertEqual(self.response_cache.stats()['hits'], 0)
+        self.get(data={'limit': 1}, queries=0)
+
+    def test_conditional_hit_is_not_modified(self):
+        etag = self.get()['ETag']
+        response = self.get(queries=0, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_head_is_answered_from_the_get_entry(self):
+        self.get()
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.head(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(captured), 0)
+
+    def test_streams_are_not_stored(self):
+        self.get(data={'stream': 'ndjson'})
+        self.get(data={'stream': 'ndjson'})
+        self.assertEqual(self.response_cache.stats()['stores'], 0)
+
+    async def test_async_view(self):
+        response_cache = ResponseCache.registered('AsyncUsersListAPIView')
+        response_cache.reset_stats()
+        client = AsyncClient()
+        first = await client.get(reverse('users-async'))
+        second = await client.get(reverse('users-async'))
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(response_cache.stats()['hits'], 1)
@@ -0,0 +1,111 @@
+from django.db import router, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TransactionTestCase, override_settings
+from django.utils import timezone
+from apps.users.models import User
+from apps.users.services import UserReadService
+from core.db import routing
+from core.db.routing import choose_read_database, is_pinned, record_write, routing_scope
+from core.middleware.replica import ReplicaStickinessMiddleware
+
+REPLICAS = ['replica1', 'replica2']
+
+
+@override_settings(REPLICA_DATABASES=REPLICAS, REPLICA_SELECTOR='round_robin', REPLICA_STICKY_SECONDS=5)
+class ReplicaRoutingTests(TransactionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        routing._selector = None
+        self.addCleanup(setattr, routing, '_selector', None)
+        scope = routing_scope()
+        scope.__enter__()
+        self.addCleanup(scope.__exit__, None, None, None)
+
+    def test_reads_go_to_the_replicas_in_turn(self):
+        self.assertEqual([choose_read_database() for _ in range(3)], ['replica1', 'replica2', 'replica1'])
+
+    def test_read_service_reads_from_a_replica(self):
+        self.assertIn(UserReadService().dao.read_objects.all().db, REPLICAS)
+
+    def test_reads_inside_a_transaction_stay_on_the_primary(self):
+        with transaction.atomic():
+            self.assertEqual(choose_read_database(), 'default')
+
+    def test_write_pins_the_primary_once_committed(self):
+        with transaction.atomic():
+            record_write()
+            self.assertFalse(is_pinned())
+        self.assertTrue(is_pinned())
+        self.assertEqual(choose_read_database(), 'default')
+        self.assertEqual(UserReadService().dao.read_objects.all().db, 'default')
+        self.assertEqual(router.db_for_read(User), 'default')
+
+    def test_rolled_back_write_pins_nothing(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                record_write()
+                raise RuntimeError
+        self.assertFalse(is_pinned())
+
+    def test_writes_that_bypass_the_dao_pin(self):
+        User.objects.create(email='direct@test.local', last_pass_change=timezone.now())
+        self.assertTrue(is_pinned())
+
+    def test_asking_for_the_write_alias_pins_nothing(self):
+        self.assertEqual(router.db_for_write(User), 'default')
+        self.assertFalse(is_pinned())
+
+    @override_settings(REPLICA_DATABASES=[])
+    def test_without_replicas_everything_uses_the_primary(self):
+        record_write()
+        self.assertFalse(is_pinned())
+        self.assertEqual(choose_read_database(), 'default')
+
+
+@override_settings(REPLICA_DATABASES=REPLICAS, REPLICA_STICKY_SECONDS=5)
+class ReplicaStickinessMiddlewareTests(TransactionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        routing._selector = None
+        self.addCleanup(setattr, routing, '_selector', None)
+        self.factory = RequestFactory()
+        self.seen = []
+
+    def view(self, write=False):
+        def get_response(request):
+            if write:
+                record_write()
+            self.seen.append(choose_read_database())
+            return HttpResponse()
+        return ReplicaStickinessMiddleware(get_response)
+
+    def test_writing_request_sets_a_signed_cookie(self):
+        response = self.view(write=True)(self.factory.post('/'))
+        cookie = response.cookies[ReplicaStickinessMiddleware.cookie_name]
+        self.assertTrue(cookie['httponly'])
+        self.assertLessEqual(int(cookie['max-age']), 5)
+
+        request = self.factory.get('/')
+        request.COOKIES[cookie.key] = cookie.value
+        self.assertGreater(float(request.get_signed_cookie(cookie.key)), 0)
+        self.view()(request)
+        self.assertEqual(self.seen[-1], 'default')
+
+    def test_reading_request_sets_no_cookie(self):
+        response = self.view()(self.factory.get('/'))
+        self.assertNotIn(ReplicaStickinessMiddleware.cookie_name, response.cookies)
+        self.assertIn(self.seen[-1], REPLICAS)
+
+    def test_tampered_cookie_is_ignored(self):
+        cookie = self.view(write=True)(self.factory.post('/')).cookies[ReplicaStickinessMiddleware.cookie_name]
+        value, signature = cookie.value.split(':', 1)
+        request = self.factory.get('/')
+        request.COOKIES[cookie.key] = f'{float(value) + 3600}:{signature}'
+        self.view()(request)
+        self.assertIn(self.seen[-1], REPLICAS)
+
+    def test_pinning_ends_with_the_request(self):
+        self.view(write=True)(self.factory.post('/'))
+        self.assertFalse(is_pinned())
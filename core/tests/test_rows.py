@@ -0,0 +1,60 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+from apps.users.dao import UserDAO
+from apps.users.models import User
+from core.dao.rows import row_class, row_fields
+from . import DaoTestCase
+
+
+class RowSerializer(serializers.Serializer):
+    id = serializers.UUIDField()
+    email = serializers.EmailField()
+    created_by = serializers.PrimaryKeyRelatedField(read_only=True)
+
+
+class FindRowsTests(DaoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.dao = UserDAO()
+        self.users = self.make_users(4)
+        User.objects.filter(pk=self.users[1].pk).update(created_by=self.users[0])
+        User.objects.filter(pk=self.users[3].pk).update(deleted=True)
+
+    def test_rows_carry_every_column_by_default(self):
+        with CaptureQueriesContext(connection) as queries:
+            rows = self.dao.find_rows(order_bys=['email'])
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(len(rows), 3)  # soft-deleted rows stay hidden
+        for row, user in zip(rows, User.objects.order_by('email')):
+            self.assertEqual(row.pk, user.pk)
+            self.assertEqual(row._asdict(), {field.attname: getattr(user, field.attname)
+                                             for field in User._meta.concrete_fields})
+
+    def test_fields_narrow_the_columns_and_keep_the_pk(self):
+        rows = self.dao.find_rows({'last_name': '1'}, fields=['email', 'created_by'])
+        self.assertEqual(rows, [(self.users[1].pk, self.users[1].email, self.users[0].pk)])
+        self.assertEqual(rows[0]._fields, ('id', 'email', 'created_by_id'))
+        self.assertEqual(row_fields(User, ['created_by_id', 'id', 'email', 'created_by']),
+                         ('created_by_id', 'id', 'email'))
+
+    def test_rows_are_immutable_and_compact(self):
+        row, = self.dao.find_rows({'pk': self.users[0].pk}, fields=['email'])
+        with self.assertRaises(AttributeError):
+            row.email = 'changed@test.local'
+        with self.assertRaises(AttributeError):
+            row.first_name
+        self.assertFalse(hasattr(row, '__dict__'))
+
+    def test_row_classes_are_shared(self):
+        attnames = row_fields(User, ['email'])
+        self.assertIs(row_class(User, attnames), row_class(User, attnames))
+        self.assertIsNot(row_class(User, attnames), row_class(User, row_fields(User)))
+        self.assertIs(row_class(User, attnames).model, User)
+
+    def test_drf_serializers_read_rows(self):
+        rows = self.dao.find_rows(order_bys=['email'], fields=['email', 'created_by'])
+        expected = RowSerializer(User.objects.order_by('email')[:3], many=True).data
+        self.assertEqual(RowSerializer(rows, many=True).data, expected)
+        self.assertEqual(rows[1].serializable_value('created_by'), self.users[0].pk)
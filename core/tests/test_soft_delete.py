@@ -0,0 +1,155 @@
+import io
+import os
+import tempfile
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from apps.users.dao import UserDAO
+from apps.users.models import User
+from . import DaoTestCase
+
+
+class SoftDeleteManagerTests(DaoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.dao = UserDAO()
+        self.users = self.make_users(4)
+        self.deleted = self.users[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dao.soft_delete(self.deleted, by_user=self.users[1])
+
+    def test_soft_delete_stamps_the_row(self):
+        row = User.objects.with_deleted().get(pk=self.deleted.pk)
+        self.assertTrue(row.deleted)
+        self.assertIsNotNone(row.deleted_at)
+        self.assertEqual(row.deleted_by_id, self.users[1].pk)
+
+    def test_manager_hides_deleted_rows(self):
+        self.assertEqual(User.objects.count(), 3)
+        self.assertEqual(User.objects.with_deleted().count(), 4)
+        self.assertEqual(list(User.objects.only_deleted()), [self.deleted])
+        self.assertEqual(User.objects.with_deleted().alive().count(), 3)
+        self.assertEqual(User._base_manager.count(), 4)
+
+    def test_dao_reads_hide_deleted_rows(self):
+        self.assertIsNone(self.dao.get(self.deleted.pk))
+        self.assertIsNone(self.dao.find_one({'email': self.deleted.email}))
+        self.assertFalse(self.dao.does_exist({'pk': self.deleted.pk}))
+        self.assertNotIn(self.deleted, list(self.dao.find_queryset()))
+        self.assertIn(self.deleted, list(self.dao.all(include_deleted=True)))
+
+    def test_cached_object_is_dropped_on_soft_delete(self):
+        user = self.users[2]
+        self.assertEqual(self.dao.get(user.pk), user)
+        self.dao.soft_delete(user)
+        self.assertIsNone(self.dao.get(user.pk))
+
+    def test_writes_still_reach_deleted_rows(self):
+        self.deleted.first_name = 'Changed'
+        self.dao.update(self.deleted)
+        self.assertEqual(User.objects.with_deleted().get(pk=self.deleted.pk).first_name, 'Changed')
+        self.dao.delete(self.deleted)
+        self.assertFalse(User.objects.with_deleted().filter(pk=self.deleted.pk).exists())
+
+    def test_soft_delete_batch_keeps_earlier_deletions(self):
+        deleted_at = User.objects.with_deleted().get(pk=self.deleted.pk).deleted_at
+        self.dao.soft_delete_batch(self.users[:3])
+        self.assertEqual(User.objects.count(), 1)
+        self.assertEqual(User.objects.with_deleted().get(pk=self.deleted.pk).deleted_at, deleted_at)
+
+    def test_soft_delete_batch_by_filter(self):
+        self.dao.soft_delete_batch({'email__in': [user.email for user in self.users[1:3]]})
+        self.assertEqual([user.email for user in User.objects.all()], [self.users[3].email])
+
+
+class CounterTests(DaoTestCase):
+    """UserDAO keeps the live-row count ({'deleted': False}) as a counter moved by writes"""
+
+    def setUp(self):
+        super().setUp()
+        self.dao = UserDAO()
+        self.users = self.make_users(5)
+
+    def assertCount(self, expected, queries=0):
+        # Counters are primed when the reading transaction commits, as it does in autocommit
+        with CaptureQueriesContext(connection) as captured, self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.dao.get_count(), expected)
+        self.assertEqual(len(captured), queries)
+
+    def test_counter_is_primed_once(self):
+        self.assertCount(5, queries=1)
+        self.assertCount(5)
+
+    def test_writes_move_the_counter(self):
+        self.assertCount(5, queries=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dao.save({'email': 'new@test.local', 'last_pass_change': self.users[0].last_pass_change})
+        self.assertCount(6)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dao.soft_delete(self.users[0])
+        self.assertCount(5)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dao.soft_delete_batch(self.users[1:3])
+        self.assertCount(3)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dao.delete(self.users[3])
+        self.assertCount(2)
+
+    def test_direct_saves_move_the_counter(self):
+        self.assertCount(5, queries=1)
+        user = User.objects.get(pk=self.users[0].pk)
+        user.deleted = True
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save()
+        self.assertCount(4)
+
+    def test_rolled_back_writes_leave_the_counter(self):
+        self.assertCount(5, queries=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self.dao.soft_delete(self.users[0])
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertCount(5)
+
+    def test_writes_by_query_reset_the_counter(self):
+        self.assertCount(5, queries=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dao.update_batch_by_query({'pk': self.users[0].pk}, {}, {'deleted': True})
+        self.assertCount(4, queries=1)
+
+    def test_filtered_counts_hide_deleted_rows(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dao.soft_delete(self.users[0])
+        self.assertEqual(self.dao.get_count({'first_name': 'First'}), 4)
+        self.assertEqual(self.dao.get_count({'first_name': 'First'}, mode=self.dao.COUNT_CACHED), 4)
+
+
+class ExportTests(DaoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.dao = UserDAO()
+        self.users = self.make_users(3)
+        self.dao.soft_delete(self.users[0])
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'users.ndjson')
+
+    def export(self, **options):
+        call_command('dao_export', 'users.User', self.path, progress=0, stderr=io.StringIO(), **options)
+        with open(self.path) as exported:
+            return sum(1 for _ in exported)
+
+    def test_export_round_trip_keeps_deleted_rows(self):
+        self.assertEqual(self.export(), 3)
+        User._base_manager.all().delete()
+        call_command('dao_import', 'users.User', self.path, progress=0, stderr=io.StringIO())
+        self.assertEqual(User.objects.with_deleted().count(), 3)
+        self.assertEqual(list(User.objects.only_deleted().values_list('email', flat=True)), [self.users[0].email])
+
+    def test_live_only_export(self):
+        self.assertEqual(self.export(live_only=True), 2)
@@ -0,0 +1,244 @@
+import os
+import tempfile
+import threading
+import time
+from django.db import OperationalError, connection, connections, transaction
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+from core.db.backends.sqlite3 import base
+from core.db.backends.sqlite3.base import DEFAULT_PRAGMAS, DatabaseWrapper
+from core.db.backends.sqlite3.write_queue import WriteQueue
+
+ALIAS = 'sqlite_backend_test'
+
+
+class SqliteBackendTestCase(SimpleTestCase):
+    """Connections to a throwaway database file through the tuned backend"""
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.name = os.path.join(directory.name, 'test.sqlite3')
+        self.wrappers = []
+        self.addCleanup(self.close_all)
+
+    def close_all(self):
+        for db in self.wrappers:
+            if db._thread_ident == threading.get_ident():  # others are closed by their threads
+                db.close()
+        # Pooled raw connections outlive the wrappers
+        for pool_key in [key for key in list(base._pools) if key[1] == self.name]:
+            pool = base._pools.pop(pool_key)
+            while not pool.empty():
+                pool.get_nowait().close()
+        WriteQueue._queues.pop(self.name, None)
+
+    def database(self, **options):
+        settings = {**connection.settings_dict, 'NAME': self.name, 'OPTIONS': options, 'CONN_MAX_AGE': 0,
+                    'TEST': {}}
+        db = DatabaseWrapper(settings, alias=ALIAS)
+        self.wrappers.append(db)
+        return db
+
+    def use(self, db):
+        """Make ``db`` the ALIAS connection of the calling thread, for transaction.atomic(using=ALIAS)"""
+        connections[ALIAS] = db
+
+    def pragma(self, db, name):
+        with db.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+
+class PragmaTests(SqliteBackendTestCase):
+
+    def test_defaults_apply_to_new_connections(self):
+        db = self.database()
+        self.assertEqual(self.pragma(db, 'journal_mode'), 'wal')
+        self.assertEqual(self.pragma(db, 'synchronous'), 1)  # NORMAL
+        self.assertEqual(self.pragma(db, 'cache_size'), DEFAULT_PRAGMAS['cache_size'])
+        self.assertEqual(self.pragma(db, 'busy_timeout'), 5000)
+        self.assertEqual(self.pragma(db, 'temp_store'), 2)  # MEMORY
+
+    def test_options_override_the_defaults(self):
+        db = self.database(pragmas={'cache_size': -2000, 'foreign_keys': 'OFF'})
+        self.assertEqual(self.pragma(db, 'cache_size'), -2000)
+        self.assertEqual(self.pragma(db, 'foreign_keys'), 0)
+        self.assertEqual(self.pragma(db, 'journal_mode'), 'wal')
+
+    def test_options_are_not_passed_to_sqlite(self):
+        params = self.database(pool_size=3, write_queue=False, pragmas={}).get_connection_params()
+        self.assertFalse({'pool_size', 'write_queue', 'pragmas'} & set(params))
+
+
+class ConnectionPoolTests(SqliteBackendTestCase):
+
+    def raw(self, db):
+        db.ensure_connection()
+        return db.connection
+
+    def test_closed_connections_are_reused(self):
+        first = self.database(pool_size=2)
+        raw = self.raw(first)
+        first.close()
+        self.assertIs(self.raw(self.database(pool_size=2)), raw)
+
+    def test_reuse_across_threads(self):
+        first = self.database()
+        raw = self.raw(first)
+        first.close()
+        seen = []
+
+        def connect():
+            db = self.database()
+            seen.append(self.raw(db))
+            db.close()
+
+        thread = threading.Thread(target=connect)
+        thread.start()
+        thread.join()
+        self.assertIs(seen[0], raw)
+
+    def test_pool_is_bounded(self):
+        dbs = [self.database(pool_size=1) for _ in range(2)]
+        raws = [self.raw(db) for db in dbs]
+        for db in dbs:
+            db.close()
+        self.assertIs(self.raw(self.database(pool_size=1)), raws[0])
+        self.assertIsNot(self.raw(self.database(pool_size=1)), raws[1])
+
+    def test_pooling_can_be_disabled(self):
+        first = self.database(pool_size=0)
+        raw = self.raw(first)
+        first.close()
+        self.assertIsNot(self.raw(self.database(pool_size=0)), raw)
+
+    def test_open_transactions_are_rolled_back_before_pooling(self):
+        db = self.database()
+        with db.cursor() as cursor:
+            cursor.execute('CREATE TABLE t (v INTEGER)')
+        db.connection.execute('BEGIN')
+        db.connection.execute('INSERT INTO t VALUES (1)')
+        db.close()
+        other = self.database()
+        self.assertFalse(self.raw(other).in_transaction)
+        with other.cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM t')
+            self.assertEqual(cursor.fetchone()[0], 0)
+
+    def test_broken_connections_are_not_pooled(self):
+        db = self.database()
+        raw = self.raw(db)
+        db.errors_occurred = True
+        db.close()
+        self.assertIsNot(self.raw(self.database()), raw)
+
+
+class WriteQueueTests(SimpleTestCase):
+
+    def test_writers_are_served_in_arrival_order(self):
+        write_queue, order = WriteQueue(), []
+        self.assertTrue(write_queue.acquire())
+
+        def writer(number):
+            write_queue.acquire()
+            order.append(number)
+            write_queue.release()
+
+        threads = []
+        for number in range(5):
+            threads.append(threading.Thread(target=writer, args=(number,)))
+            threads[-1].start()
+            while len(write_queue._waiters) <= number:
+                time.sleep(0.001)
+        write_queue.release()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(order, list(range(5)))
+        self.assertFalse(write_queue._held)
+
+    def test_timeout(self):
+        write_queue = WriteQueue()
+        write_queue.acquire()
+        self.assertFalse(write_queue.acquire(timeout=0.01))
+        self.assertEqual(len(write_queue._waiters), 0)
+        write_queue.release()
+        self.assertTrue(write_queue.acquire(timeout=0.01))
+
+    def test_one_queue_per_database(self):
+        self.assertIs(WriteQueue.for_database('a'), WriteQueue.for_database('a'))
+        self.assertIsNot(WriteQueue.for_database('a'), WriteQueue.for_database('b'))
+
+
+class WriteSerializationTests(SqliteBackendTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.db = self.database(pragmas={'busy_timeout': 100})
+        self.use(self.db)
+        self.addCleanup(connections.__delitem__, ALIAS)
+        with self.db.cursor() as cursor:
+            cursor.execute('CREATE TABLE t (v INTEGER)')
+
+    def test_transactions_begin_immediate_under_the_write_lock(self):
+        with CaptureQueriesContext(self.db) as queries:
+            with transaction.atomic(using=ALIAS):
+                self.assertTrue(self.db.holds_write_lock)
+                with self.db.cursor() as cursor:
+                    cursor.execute('INSERT INTO t VALUES (1)')
+        self.assertEqual(queries.captured_queries[0]['sql'], 'BEGIN IMMEDIATE')
+        self.assertFalse(self.db.holds_write_lock)
+
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic(using=ALIAS):
+                raise RuntimeError
+        self.assertFalse(self.db.holds_write_lock)
+        self.assertFalse(self.db.write_queue._held)
+
+    def test_writes_wait_for_the_queue_and_reads_do_not(self):
+        self.db.write_queue.acquire()
+        self.addCleanup(self.db.write_queue.release)
+        with self.db.cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM t')
+            with self.assertRaisesMessage(OperationalError, 'write queue'):
+                cursor.execute('INSERT INTO t VALUES (1)')
+        with self.assertRaisesMessage(OperationalError, 'write queue'):
+            with transaction.atomic(using=ALIAS):
+                pass
+        self.assertFalse(self.db.holds_write_lock)
+
+    def test_concurrent_writers_do_not_fail(self):
+        errors = []
+
+        def writer():
+            db = self.database(pragmas={'busy_timeout': 5000})
+            self.use(db)
+            try:
+                for value in range(20):
+                    with transaction.atomic(using=ALIAS):
+                        with db.cursor() as cursor:
+                            cursor.execute('SELECT COUNT(*) FROM t')  # a read lock upgraded below
+                            cursor.execute('INSERT INTO t VALUES (%s)', [value])
+                    with db.cursor() as cursor:
+                        cursor.execute('INSERT INTO t VALUES (%s)', [value])
+            except Exception as e:
+                errors.append(e)
+            finally:
+                db.close()
+                del connections[ALIAS]
+
+        threads = [threading.Thread(target=writer) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        with self.db.cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM t')
+            self.assertEqual(cursor.fetchone()[0], 4 * 20 * 2)
+
+    def test_queue_can_be_disabled(self):
+        db = self.database(write_queue=False)
+        self.assertIsNone(db.write_queue)
+        self.assertNotIn(db._serialize_autocommit_write, db.execute_wrappers)
@@ -0,0 +1,129 @@
+import io
+import json
+from unittest import mock
+from asgiref.sync import async_to_sync
+from django.core.handlers.asgi import ASGIRequest
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from apps.users.dao import UserDAO
+from apps.users.models import User
+from apps.users.serializers import UserSerializer
+from core.serializers.streaming import StreamingSerializerResponse, astream_serialized, stream_serialized
+from . import DaoTestCase
+
+
+async def _as_async(chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+async def _read_async(iterator):
+    return [piece async for piece in iterator]
+
+
+class StreamSerializedTests(DaoTestCase):
+    """Streamed bodies are byte-for-byte the buffered DRF ones"""
+
+    def setUp(self):
+        super().setUp()
+        self.users = self.make_users(5)
+        self.renderer = JSONRenderer()
+
+    def buffered(self, users):
+        return self.renderer.render(UserSerializer(users, many=True).data)
+
+    def buffered_ndjson(self, users):
+        return b''.join(self.renderer.render(item) + b'\n' for item in UserSerializer(users, many=True).data)
+
+    def chunked(self, size):
+        return [self.users[start:start + size] for start in range(0, len(self.users), size)]
+
+    def test_json_array_matches_a_buffered_response(self):
+        for size in (1, 2, 5, 10):
+            body = b''.join(stream_serialized(self.chunked(size), UserSerializer))
+            self.assertEqual(body, self.buffered(self.users), size)
+            self.assertEqual(len(json.loads(body)), 5)
+
+    def test_ndjson_lines_match_buffered_items(self):
+        for size in (1, 2, 5):
+            body = b''.join(stream_serialized(self.chunked(size), UserSerializer, ndjson=True))
+            self.assertEqual(body, self.buffered_ndjson(self.users), size)
+
+    def test_empty_results_and_chunks(self):
+        self.assertEqual(b''.join(stream_serialized([], UserSerializer)), b'[]')
+        self.assertEqual(b''.join(stream_serialized([], UserSerializer, ndjson=True)), b'')
+        chunks = [[], self.users[:2], [], self.users[2:]]
+        self.assertEqual(b''.join(stream_serialized(chunks, UserSerializer)), self.buffered(self.users))
+
+    def test_one_piece_per_chunk(self):
+        pieces = list(stream_serialized(self.chunked(2), UserSerializer))
+        self.assertEqual(len(pieces), 2 + 3)  # brackets and three chunks
+
+    def test_async_variant_matches(self):
+        for ndjson, expected in ((False, self.buffered(self.users)), (True, self.buffered_ndjson(self.users))):
+            pieces = async_to_sync(_read_async)(
+                astream_serialized(_as_async(self.chunked(2)), UserSerializer, ndjson=ndjson))
+            self.assertEqual(b''.join(pieces), expected)
+
+
+class StreamingResponseTests(DaoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.users = self.make_users(5)
+        self.renderer = JSONRenderer()
+        patcher = mock.patch.object(UserDAO, 'ITERATOR_CHUNK_SIZE', 2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def buffered(self, ndjson=False):
+        data = UserSerializer(User.objects.order_by('email'), many=True).data
+        if ndjson:
+            return b''.join(self.renderer.render(item) + b'\n' for item in data)
+        return self.renderer.render(data)
+
+    def test_content_types(self):
+        self.assertEqual(StreamingSerializerResponse([], UserSerializer)['Content-Type'], 'application/json')
+        self.assertEqual(StreamingSerializerResponse([], UserSerializer, ndjson=True)['Content-Type'],
+                         'application/x-ndjson')
+
+    def test_list_view_streams_the_buffered_body(self):
+        for stream in ('json', 'ndjson'):
+            response = self.client.get(reverse('users'), {'stream': stream})
+            self.assertTrue(response.streaming)
+            self.assertEqual(b''.join(response.streaming_content), self.buffered(stream == 'ndjson'), stream)
+
+    def test_streamed_json_matches_the_paginated_results(self):
+        page = self.client.get(reverse('users'), {'limit': 10}).json()['results']
+        streamed = json.loads(b''.join(self.client.get(reverse('users'), {'stream': 'json'}).streaming_content))
+        self.assertEqual(streamed, page)
+
+    def test_unknown_format(self):
+        self.assertEqual(self.client.get(reverse('users'), {'stream': 'xml'}).status_code, 400)
+
+    def test_sync_chunks_stream_as_async_under_asgi(self):
+        request = ASGIRequest({'type': 'http', 'method': 'GET', 'path': '/', 'query_string': b'',
+                               'headers': []}, io.BytesIO())
+        read = []
+
+        def chunks():
+            for chunk in UserDAO().find_chunks(order_bys=['email']):
+                read.append(len(chunk))
+                yield chunk
+
+        response = StreamingSerializerResponse(chunks(), UserSerializer, context={'request': request})
+        self.assertTrue(response.is_async)
+        self.assertEqual(read, [])  # nothing is read before the server asks for it
+        self.assertEqual(b''.join(async_to_sync(_read_async)(response.streaming_content)), self.buffered())
+        self.assertEqual(read, [2, 2, 1])
+
+    def test_asgi_views_stream_the_buffered_body(self):
+        async def get(url, stream):
+            response = await self.async_client.get(url, {'stream': stream})
+            return response.is_async, b''.join([piece async for piece in response.streaming_content])
+
+        for url in (reverse('users'), reverse('users-async')):
+            for stream in ('json', 'ndjson'):
+                is_async, body = async_to_sync(get)(url, stream)
+                self.assertTrue(is_async, url)
+                self.assertEqual(body, self.buffered(stream == 'ndjson'), (url, stream))
@@ -0,0 +1,129 @@
+import datetime
+import io
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from django.contrib.auth.hashers import check_password
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from apps.users.models import User
+from core.management.transfer import bounded_map
+from . import DaoTestCase
+
+
+class DaoTransferTests(DaoTestCase):
+    """dao_export / dao_import round trips"""
+
+    def setUp(self):
+        super().setUp()
+        self.users = self.make_users(5)
+        User.objects.filter(pk=self.users[0].pk).update(
+            auth_token='', user_ip='10.0.0.1', created_by=self.users[1],
+            last_login=datetime.datetime(2024, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc))
+        User.objects.filter(pk=self.users[1].pk).update(deleted=True, first_name='Ünïcode, "quoted"\nline')
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def export(self, path, **options):
+        call_command('dao_export', 'users.User', path, progress=0, stderr=io.StringIO(), **options)
+        with open(path, encoding='utf-8') as exported:
+            return exported.read()
+
+    def load(self, path, **options):
+        call_command('dao_import', 'users.User', path, progress=0, stderr=io.StringIO(), **options)
+
+    def snapshot(self):
+        columns = [field.attname for field in User._meta.concrete_fields]
+        return list(User._base_manager.order_by('pk').values_list(*columns))
+
+    def assertRoundTrip(self, name, **import_options):
+        before = self.snapshot()
+        self.export(self.path(name))
+        User._base_manager.all().delete()
+        self.load(self.path(name), **import_options)
+        self.assertEqual(self.snapshot(), before)
+
+    def test_ndjson_round_trip_is_lossless(self):
+        self.assertRoundTrip('users.ndjson')
+
+    def test_csv_round_trip_is_lossless(self):
+        # Including NULL next to '' (auth_token), microseconds and embedded newlines
+        self.assertRoundTrip('users.csv')
+
+    def test_round_trip_through_parse_workers(self):
+        self.assertRoundTrip('users.csv', batch_size=2, workers=2)
+
+    def test_export_reads_keyset_chunks(self):
+        with CaptureQueriesContext(connection) as queries:
+            body = self.export(self.path('users.ndjson'), batch_size=2)
+        self.assertEqual(len(body.splitlines()), 5)
+        selects = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('SELECT')]
+        self.assertEqual(len(selects), 4)  # 2 + 2 + 1 rows, then an empty chunk
+        self.assertNotIn('OFFSET', ' '.join(selects))
+
+    def test_export_fields_and_live_only(self):
+        body = self.export(self.path('users.csv'), fields='email,created_by', live_only=True)
+        lines = body.splitlines()
+        self.assertEqual(lines[0], 'email,created_by_id')
+        self.assertIn(f'{self.users[0].email},{self.users[1].pk}', lines)  # in pk (keyset) order, not email order
+        self.assertEqual(len(lines), 1 + 4)
+        self.assertNotIn(self.users[1].email, body)
+
+    def test_upsert_updates_existing_rows(self):
+        path = self.path('users.csv')
+        with open(path, 'w', encoding='utf-8') as source:
+            source.write(f'email,first_name,last_pass_change\n'
+                         f'{self.users[2].email},Upserted,2024-01-01T00:00:00+00:00\n'
+                         f'fresh@test.local,Fresh,2024-01-01T00:00:00+00:00\n')
+        self.load(path, upsert='email')
+        self.assertEqual(User.objects.get(pk=self.users[2].pk).first_name, 'Upserted')
+        self.assertEqual(User.objects.get(email='fresh@test.local').first_name, 'Fresh')
+        self.assertEqual(User._base_manager.count(), 6)
+
+    def test_plain_text_passwords_can_be_hashed(self):
+        path = self.path('users.ndjson')
+        with open(path, 'w', encoding='utf-8') as source:
+            source.write('{"email": "plain@test.local", "password": "secret", '
+                         '"last_pass_change": "2024-01-01T00:00:00+00:00"}\n')
+        self.load(path, hash_passwords=True)
+        user = User.objects.get(email='plain@test.local')
+        self.assertTrue(check_password('secret', user.password))
+        self.assertIsNotNone(user.created_at)
+
+    def test_bad_input(self):
+        path = self.path('users.ndjson')
+        with open(path, 'w', encoding='utf-8') as source:
+            source.write('{"email": "a@test.local", "last_pass_change": "2024-01-01T00:00:00+00:00"}\n'
+                         '{"email": "b@test.local", "shoe_size": 42}\n')
+        with self.assertRaisesMessage(CommandError, "has no column 'shoe_size'"):
+            self.load(path, batch_size=1)
+        self.assertTrue(User.objects.filter(email='a@test.local').exists())  # earlier chunks are kept
+
+        with self.assertRaisesMessage(CommandError, 'pass --format'):
+            self.load(self.path('users.txt'))
+        with self.assertRaisesMessage(CommandError, 'Unknown model'):
+            call_command('dao_export', 'users.Nope', self.path('x.csv'))
+
+
+class BoundedMapTests(DaoTestCase):
+
+    def test_results_keep_the_input_order(self):
+        consumed = []
+
+        def items():
+            for item in range(10):
+                consumed.append(item)
+                yield item
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            results = bounded_map(executor, lambda item: item * 2, items(), window=3)
+            self.assertEqual(next(results), 0)
+            self.assertLessEqual(len(consumed), 3)
+            self.assertEqual(list(results), [item * 2 for item in range(1, 10)])
+        self.assertEqual(list(bounded_map(None, str, [1, 2], window=1)), ['1', '2'])
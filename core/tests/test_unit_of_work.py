@@ -0,0 +1,138 @@
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+from apps.users.dao import UserDAO
+from apps.users.models import User
+from apps.users.services import UserWriteService
+from core.dao import ObjectCache, get_generations
+from core.service import UnitOfWork, unit_of_work
+from . import DaoTestCase
+
+
+class UnitOfWorkTests(DaoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.service = UserWriteService()
+        self.users = self.make_users(4)
+
+    def create_data(self, name):
+        return {'email': f'{name}@test.local', 'last_pass_change': self.users[0].last_pass_change}
+
+    def writes(self, queries):
+        return [query['sql'] for query in queries.captured_queries
+                if query['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))]
+
+    def test_writes_are_deferred_to_the_end_of_the_block(self):
+        with unit_of_work() as uow:
+            self.service.update(self.users[0], {'first_name': 'Changed'})
+            self.service.create(self.create_data('new'))
+            self.assertIs(UnitOfWork.current(), uow)
+            self.assertEqual(uow.pending, {'new': 1, 'dirty': 1, 'deleted': 0})
+            self.assertEqual(User.objects.get(pk=self.users[0].pk).first_name, 'First')
+            self.assertFalse(User.objects.filter(email='new@test.local').exists())
+        self.assertIsNone(UnitOfWork.current())
+        self.assertEqual(User.objects.get(pk=self.users[0].pk).first_name, 'Changed')
+        self.assertTrue(User.objects.filter(email='new@test.local').exists())
+
+    def test_writes_are_coalesced(self):
+        with CaptureQueriesContext(connection) as queries:
+            with unit_of_work():
+                for user in self.users:
+                    self.service.update(user, {'first_name': 'Changed'})
+                    self.service.update(user, {'last_name': 'Changed'})
+                created = self.service.create(self.create_data('created'))
+                self.service.update(created, {'first_name': 'Final'})
+                dropped = self.service.create(self.create_data('dropped'))
+                self.service.delete(dropped)
+        inserts = [sql for sql in self.writes(queries) if sql.startswith('INSERT')]
+        updates = [sql for sql in self.writes(queries) if sql.startswith('UPDATE')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(User.objects.filter(first_name='Changed', last_name='Changed').count(), 4)
+        self.assertEqual(User.objects.get(email='created@test.local').first_name, 'Final')
+        self.assertFalse(User.objects.filter(email='dropped@test.local').exists())
+
+    def test_updates_through_other_instances_are_merged(self):
+        first, second = User.objects.get(pk=self.users[0].pk), User.objects.get(pk=self.users[0].pk)
+        with unit_of_work() as uow:
+            self.service.update(first, {'first_name': 'First A', 'last_name': 'Last A'})
+            self.service.update(second, {'last_name': 'Last B'})
+            self.assertEqual(uow.pending, {'new': 0, 'dirty': 1, 'deleted': 0})
+        row = User.objects.get(pk=self.users[0].pk)
+        self.assertEqual((row.first_name, row.last_name), ('First A', 'Last B'))
+        self.assertEqual(second.get_dirty_fields(), set())
+
+    def test_deleted_objects_drop_pending_updates(self):
+        with unit_of_work() as uow:
+            self.service.update(self.users[0], {'first_name': 'Changed'})
+            self.service.delete(self.users[0])
+            self.assertFalse(self.service.update(self.users[0], {'first_name': 'Again'}))
+            self.assertEqual(uow.pending, {'new': 0, 'dirty': 0, 'deleted': 1})
+        self.assertFalse(User._base_manager.filter(pk=self.users[0].pk).exists())
+
+    def test_soft_delete_is_an_update(self):
+        with unit_of_work():
+            self.service.soft_delete(self.users[0], by_user=self.users[1])
+        row = User.objects.with_deleted().get(pk=self.users[0].pk)
+        self.assertTrue(row.deleted)
+        self.assertEqual(row.deleted_by_id, self.users[1].pk)
+
+    def test_nested_blocks_join_the_outer_one(self):
+        with unit_of_work() as outer:
+            with unit_of_work() as inner:
+                self.assertIs(inner, outer)
+                self.service.update(self.users[0], {'first_name': 'Changed'})
+            self.assertEqual(User.objects.get(pk=self.users[0].pk).first_name, 'First')
+        self.assertEqual(User.objects.get(pk=self.users[0].pk).first_name, 'Changed')
+
+    def test_exception_discards_pending_writes(self):
+        dao = UserDAO()
+        cached = dao.get(self.users[0].pk)
+        generations = get_generations([User])
+        with CaptureQueriesContext(connection) as queries:
+            with self.assertRaises(RuntimeError):
+                with unit_of_work():
+                    self.service.update(self.users[0], {'first_name': 'Changed'})
+                    self.service.create(self.create_data('new'))
+                    self.service.delete(self.users[1])
+                    raise RuntimeError
+        self.assertEqual(self.writes(queries), [])
+        self.assertIsNone(UnitOfWork.current())
+        self.assertEqual(User.objects.count(), 4)
+        self.assertEqual(User.objects.get(pk=self.users[0].pk).first_name, 'First')
+        # Nothing was written, so nothing was invalidated
+        self.assertEqual(get_generations([User]), generations)
+        self.assertEqual(ObjectCache.registered(User).get('pk', cached.pk).first_name, 'First')
+
+    def test_failed_flush_writes_nothing(self):
+        with self.assertRaises(IntegrityError):
+            with unit_of_work():
+                self.service.update(self.users[0], {'first_name': 'Changed'})
+                self.service.create(self.create_data('new'))
+                self.service.create({**self.create_data('dup'), 'email': self.users[1].email})
+        self.assertFalse(User.objects.filter(email='new@test.local').exists())
+        self.assertEqual(User.objects.get(pk=self.users[0].pk).first_name, 'First')
+
+    def test_invalidation_waits_for_the_flush_and_repeats_on_commit(self):
+        dao = UserDAO()
+        cache = ObjectCache.registered(User)
+        stale = dao.get(self.users[0].pk)
+        generations = get_generations([User])
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            with unit_of_work():
+                self.service.update(self.users[0], {'first_name': 'Changed'})
+                # Recorded only: cached objects and responses are still current
+                self.assertEqual(cache.get('pk', stale.pk).first_name, 'First')
+                self.assertEqual(get_generations([User]), generations)
+            after_flush = get_generations([User])
+            self.assertNotEqual(after_flush, generations)
+            self.assertIsNone(cache.get('pk', stale.pk))
+            # A reader racing the transaction re-caches the row as committed before it
+            cache.set(stale)
+
+        for callback in callbacks:
+            callback()
+        self.assertIsNone(cache.get('pk', stale.pk))
+        self.assertNotEqual(get_generations([User]), after_flush)
+        self.assertEqual(dao.get(self.users[0].pk).first_name, 'Changed')
@@ -42,9 +42,24 @@ INSTALLED_APPS = [
 ]
 
 REST_FRAMEWORK = {
-    'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_SCHEMA_CLASS': 'core.http.openapi.AutoSchema',
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'core.auth.authentication.CachedJWTAuthentication',
+        'rest_framework.authentication.SessionAuthentication',
+        'rest_framework.authentication.BasicAuthentication',
+    ],
 }
 
+# CachedJWTAuthentication: users are resolved through this DAO and cached per
+# process; a deactivation or password change made in another process takes
+# effect within AUTH_USER_CACHE_TTL seconds
+AUTH_USER_DAO = 'apps.users.dao.UserDAO'
+AUTH_USER_CACHE_TTL = 30
+AUTH_USER_CACHE_SIZE = 10000
+# Tokens must carry the credentials version claim (core.auth.tokens); set an
+# aware datetime to keep accepting unversioned tokens until then
+AUTH_UNVERSIONED_TOKENS_UNTIL = None
+
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Restipy API',
     'DESCRIPTION': 'API documentation for Restipy project',
@@ -52,9 +67,17 @@ SPECTACULAR_SETTINGS = {
     'SERVE_INCLUDE_SCHEMA': False,
 }
 
+# /api/schema/ serves SCHEMA_DIR/openapi-<VERSION>.{json,yaml} written by
+# `manage.py schema_export`, generating the schema in-process when missing.
+# API_DOCS_ENABLED mounts Swagger UI and Redoc on top of it, which imports
+# drf_spectacular at startup, so it follows DEBUG.
+SCHEMA_DIR = BASE_DIR / 'schema'
+API_DOCS_ENABLED = DEBUG
+
 AUTH_USER_MODEL = 'users.User'
 
 MIDDLEWARE = [
+    'core.middleware.QueryInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -62,6 +85,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.IdentityMapMiddleware',
+    'core.middleware.ReplicaStickinessMiddleware',
 ]
 
 ROOT_URLCONF = 'restipy.urls'
@@ -87,13 +112,35 @@ WSGI_APPLICATION = 'restipy.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# core.db.backends.sqlite3 adds WAL and tuned PRAGMAs, a connection pool and a
+# single-writer queue to Django's sqlite3 backend (see its module docstring).
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'core.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'pool_size': 10,
+            # 'pragmas': {'mmap_size': 1073741824},
+        },
     }
 }
 
+# Read replicas used by ReadService (see core.db.routing). To try it locally, add
+# SQLite copies of the primary as extra aliases and list them here, e.g.
+#   DATABASES['replica1'] = {'ENGINE': 'core.db.backends.sqlite3', 'NAME': BASE_DIR / 'replica1.sqlite3',
+#                            'TEST': {'MIRROR': 'default'}}
+#   REPLICA_DATABASES = ['replica1']
+DATABASE_ROUTERS = ['core.db.routing.ReplicaRouter']
+REPLICA_DATABASES = []
+REPLICA_SELECTOR = 'round_robin'  # or 'least_outstanding'
+REPLICA_STICKY_SECONDS = 5
+
+# Per-request Dao/Service profiling (Server-Timing header, N+1 warnings), see core.instrumentation
+DAO_INSTRUMENTATION = DEBUG
+N_PLUS_ONE_THRESHOLD = 10
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -112,6 +159,19 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# The first hasher, at its current work factor, is the one passwords are
+# upgraded to on successful login (see core.auth.passwords)
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+# Threads verifying passwords for async logins; None means one per CPU
+PASSWORD_HASHING_WORKERS = None
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
 